@@ -0,0 +1,4 @@
+# PowerCUBE 패키지. Qt는 powercube.gui를 가져올 때만 로드된다
+from .simulation import (Config, SimulationManager, SimulationRunner, FrameRenderer, MaterialDatabase,
+                         ReactionDatabase, Reaction, CellGrid, Cell, Tool, ToolIndex, Beaker, Heater, Cooler,
+                         Stroke, ParseGridSize, LoadSceneFile)
@@ -0,0 +1,147 @@
+import os
+import sys
+import json
+import argparse
+
+from .simulation import Config, ParseGridSize, LoadSceneFile
+
+#--------------------------------------------
+# 명령줄: python -m powercube run|bench|sweep|gui
+#--------------------------------------------
+def ParseValue(text):
+    # 숫자/true/false/null은 JSON으로, 나머지는 문자열 그대로
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+def BuildConfig(args):
+    # 우선순위: 기본값 < 씬 파일 < 명령줄
+    config = Config()
+    scene = None
+    if args.scene:
+        scene = LoadSceneFile(args.scene)
+        config.ApplyScene(scene)
+    if args.grid:
+        config.gridWidth, config.gridHeight = ParseGridSize(args.grid)
+    for item in args.set or []:
+        key, _, value = item.partition("=")
+        config.Apply({key: ParseValue(value)})
+    return config, scene
+
+def RunCommand(args):
+    from .headless import HeadlessRunner
+    config, scene = BuildConfig(args)
+    if args.profile:
+        config.profiling = True
+        config.profileCapacity = max(config.profileCapacity, args.steps)
+    if args.workers:
+        config.distributedWorkers = args.workers
+    runner = HeadlessRunner(config, scene, args.load)
+    metricsOut = None
+    if args.metrics == "-":
+        metricsOut = sys.stdout
+    elif args.metrics:
+        metricsOut = open(args.metrics, "w", encoding="utf-8")
+    try:
+        rate = runner.Run(args.steps, args.dt, metricsEvery=args.metrics_every, metricsOut=metricsOut,
+                          dumpEvery=args.dump_every, dumpDir=args.dump_dir, log=sys.stderr)
+        if args.profile:
+            runner.simManager.profiler.ExportTrace(args.profile)
+        if args.save:
+            from .state import SaveState
+            SaveState(runner.simManager, args.save, background=False)
+    finally:
+        if metricsOut is not None and metricsOut is not sys.stdout:
+            metricsOut.close()
+        runner.Close()
+    sys.stderr.write("%d steps on %dx%d in %.2f s: %.1f steps/s\n"
+                     % (args.steps, config.gridWidth, config.gridHeight, runner.elapsed, rate))
+    return 0
+
+def BenchCommand(args):
+    from . import benchmark
+    scenes = args.scenes.split(",") if args.scenes else benchmark.SCENES
+    sizes = [int(n) for n in args.sizes.split(",")] if args.sizes else benchmark.SIZES
+    overrides = {}
+    for item in args.set or []:
+        key, _, value = item.partition("=")
+        overrides[key] = ParseValue(value)
+    data = benchmark.RunBenchmarks(scenes, sizes, args.steps, args.warmup, args.seed, overrides, log=sys.stderr)
+    if args.out:
+        benchmark.SaveResults(data, args.out)
+    if args.baseline:
+        regressions = benchmark.CompareResults(data, benchmark.LoadResults(args.baseline), args.threshold)
+        for r in regressions:
+            sys.stderr.write("REGRESSION %s %d² %s: %.3f ms -> %.3f ms (x%.2f)\n"
+                             % (r["scene"], r["size"], r["stage"], r["baselineMs"], r["currentMs"], r["ratio"]))
+        if regressions:
+            return 1
+        sys.stderr.write("no regressions over %.0f%%\n" % (args.threshold*100))
+    return 0
+
+def SweepCommand(args):
+    from . import sweep
+    with open(args.spec,"r",encoding="utf-8") as f:
+        spec = json.load(f)
+    out = args.out or os.path.splitext(args.spec)[0]+".results.jsonl"
+    rows = sweep.RunSweep(spec, out, args.workers, resume=not args.fresh, log=sys.stderr)
+    table = args.table or os.path.splitext(out)[0]+".csv"
+    sweep.WriteTable(rows, table)
+    sys.stderr.write("%d results in %s, table %s\n" % (len(rows), out, table))
+    return 0
+
+def GuiCommand(args):
+    from .gui import main
+    config, scene = BuildConfig(args)
+    return main(config, scene)
+
+def ParseArgs(argv=None):
+    parser = argparse.ArgumentParser(prog="powercube")
+    sub = parser.add_subparsers(dest="command")
+    for name in ("run","gui"):
+        p = sub.add_parser(name)
+        p.add_argument("--grid", help="격자 크기, 예: 512x512")
+        p.add_argument("--scene", help="씬 JSON 파일")
+        p.add_argument("--set", action="append", metavar="KEY=VALUE", help="Config 값 덮어쓰기 (여러 번 가능)")
+    run = sub.choices["run"]
+    run.add_argument("--steps", type=int, default=1000)
+    run.add_argument("--dt", type=float, default=0.016, help="스텝당 시간 [s]")
+    run.add_argument("--metrics", help="지표 JSONL 출력 파일 (-: 표준 출력)")
+    run.add_argument("--metrics-every", type=int, default=100)
+    run.add_argument("--dump-every", type=int, default=0, help="N 스텝마다 그리드를 npz로 저장")
+    run.add_argument("--dump-dir", default="dumps")
+    run.add_argument("--load", help="씬 대신 상태 파일(.pcs/.npz)에서 시작")
+    run.add_argument("--save", help="끝난 뒤 상태 파일로 저장 (.pcs: memmap 가능, .npz: 압축)")
+    run.add_argument("--workers", type=int, help="격자를 띠로 나눠 돌릴 작업 프로세스 수 (분산 모드)")
+    run.add_argument("--profile", help="단계별 시간을 Chrome/Perfetto trace JSON으로 저장")
+    sw = sub.add_parser("sweep")
+    sw.add_argument("spec", help="스윕 명세 JSON")
+    sw.add_argument("--workers", type=int, help="작업 프로세스 수 (기본: CPU 수)")
+    sw.add_argument("--out", help="실행별 결과 JSONL (기본: <spec>.results.jsonl). 있으면 이어서 실행")
+    sw.add_argument("--table", help="요약 CSV (기본: 결과 파일 이름.csv)")
+    sw.add_argument("--fresh", action="store_true", help="기존 결과를 지우고 처음부터")
+    bench = sub.add_parser("bench")
+    bench.add_argument("--scenes", help="쉼표로 구분 (idle,reactive,combustion,stratified)")
+    bench.add_argument("--sizes", help="쉼표로 구분한 격자 한 변 길이 (기본 64,256,1024,2048)")
+    bench.add_argument("--steps", type=int, default=20)
+    bench.add_argument("--warmup", type=int, default=3)
+    bench.add_argument("--seed", type=int, default=1234)
+    bench.add_argument("--set", action="append", metavar="KEY=VALUE", help="Config 값 덮어쓰기")
+    bench.add_argument("--out", help="결과 JSON 파일")
+    bench.add_argument("--baseline", help="비교할 기준 결과 JSON")
+    bench.add_argument("--threshold", type=float, default=0.2, help="허용 느려짐 비율 (0.2 = 20%%)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = ParseArgs(argv)
+    if args.command == "run":
+        return RunCommand(args)
+    if args.command == "bench":
+        return BenchCommand(args)
+    if args.command == "sweep":
+        return SweepCommand(args)
+    return GuiCommand(args) if args.command == "gui" else GuiCommand(ParseArgs(["gui"]))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+import time
+import json
+import platform
+import numpy as np
+
+from .simulation import Config, SimulationManager, FrameRenderer
+
+#--------------------------------------------
+# Benchmark: 시드 고정 씬에서 단계별 ms/step, cells/s 측정, 기준 JSON과 비교
+#--------------------------------------------
+SCENES = ("idle","reactive","combustion","stratified")
+SIZES = (64,256,1024,2048)
+STAGES = ("spawners","reactions","fluid","thermal","tools","phase","update","render")
+
+def BuildScene(name, width, height, seed):
+    # 같은 (name, 크기, seed)면 항상 같은 씬
+    rng = np.random.default_rng(seed)
+    scene = {"grid": [width,height], "temperature": 20.0}
+    if name == "idle":
+        scene["fill"] = "N2"
+    elif name == "reactive":
+        # H2SO4 속에 NaOH 덩어리: 계면이 많음
+        scene["fill"] = "H2SO4"
+        block = max(2,width//32)
+        regions = []
+        for y in range(0,height,block*2):
+            for x in range(0,width,block*2):
+                if rng.random() < 0.5:
+                    regions.append({"material":"NaOH","rect":[x,y,block,block],"temperature":float(rng.uniform(20,80))})
+        scene["regions"] = regions
+    elif name == "combustion":
+        # 아래쪽 뜨거운 에탄올 층 위에 O2, 위에서 O2 공급
+        scene["fill"] = "O2"
+        scene["regions"] = [{"material":"Ethanol","rect":[0,height//2,width,height-height//2],"temperature":400.0}]
+        scene["spawners"] = [{"material":"O2","x":int(x),"y":0} for x in rng.choice(width,size=max(1,width//16),replace=False)]
+        scene["tools"] = [{"type":"Heater","rect":[width//4,height-max(2,height//16),width//2,max(2,height//16)]}]
+    elif name == "stratified":
+        # 밀도가 뒤집힌 액체층 (무거운 것이 위): 정렬/부력이 계속 일함
+        layers = ["H2SO4","Water","Ethanol"]
+        scene["fill"] = "Ethanol"
+        regions = []
+        y = 0
+        while y < height:
+            h = int(rng.integers(max(1,height//32),max(2,height//8)))
+            regions.append({"material":layers[len(regions)%3],"rect":[0,y,width,h],"temperature":float(rng.uniform(10,60))})
+            y += h
+        scene["regions"] = regions
+    else:
+        raise KeyError("unknown benchmark scene: %s" % name)
+    return scene
+
+def MakeSimulation(name, size, seed, overrides=None):
+    config = Config()
+    scene = BuildScene(name, size, size, seed)
+    config.ApplyScene(scene)
+    config.seed = seed
+    config.Apply(overrides or {})
+    sim = SimulationManager(config)
+    sim.LoadScene(scene)
+    if name != "idle":
+        # 온도 잡음으로 타일이 모두 잠들지 않게
+        sim.grid.temperature += np.random.default_rng(seed+1).normal(0.0,0.5,sim.grid.temperature.shape)
+    return sim
+
+class StageTimer:
+    # 단계 메서드를 인스턴스에서 감싸 호출 시간을 모은다 (Update 순서는 그대로)
+    def __init__(self):
+        self.times = {}
+
+    def Wrap(self, obj, attr, stage):
+        fn = getattr(obj, attr)
+        times = self.times.setdefault(stage, [0.0])
+        def timed(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                times[-1] += time.perf_counter()-t0
+        setattr(obj, attr, timed)
+
+    def NextStep(self):
+        for t in self.times.values():
+            t.append(0.0)
+
+def BenchmarkScene(name, size, steps=20, warmup=3, seed=1234, dt=0.016, overrides=None):
+    sim = MakeSimulation(name, size, seed, overrides)
+    if name == "idle":
+        # 빈 격자는 타일이 잠든 뒤의 상태를 잰다
+        warmup = max(warmup, sim.config.sleepSteps+2)
+    renderer = FrameRenderer(sim.matDB)
+    timer = StageTimer()
+    timer.Wrap(sim.grid, "UpdateSpawners", "spawners")
+    timer.Wrap(sim.reactionEngine, "ProcessReactions", "reactions")
+    timer.Wrap(sim.fluidSolver, "Solve", "fluid")
+    timer.Wrap(sim.thermalSolver, "Solve", "thermal")
+    timer.Wrap(sim.toolIndex, "Apply", "tools")
+    timer.Wrap(sim.phaseSolver, "Solve", "phase")
+    update = timer.times.setdefault("update", [0.0])
+    render = timer.times.setdefault("render", [0.0])
+    for i in range(warmup+steps):
+        t0 = time.perf_counter()
+        sim.Update(dt)
+        t1 = time.perf_counter()
+        renderer.Render(sim.grid, "Temperature")
+        update[-1] += t1-t0
+        render[-1] += time.perf_counter()-t1
+        sim.pendingDirty[:] = False
+        timer.NextStep()
+    results = []
+    cells = size*size
+    for stage in STAGES:
+        samples = np.array(timer.times[stage][warmup:warmup+steps])*1000.0
+        median = float(np.median(samples))
+        results.append({
+            "scene": name, "size": size, "stage": stage, "steps": steps,
+            "msPerStep": float(samples.mean()), "msMedian": median, "msMin": float(samples.min()),
+            "cellsPerSecond": cells/(median/1000.0) if median>0 else None,
+        })
+    return results
+
+def Environment():
+    import numba
+    return {"python": platform.python_version(), "numpy": np.__version__, "numba": numba.__version__,
+            "platform": platform.platform(), "processor": platform.processor(), "threads": numba.config.NUMBA_NUM_THREADS}
+
+def RunBenchmarks(scenes=SCENES, sizes=SIZES, steps=20, warmup=3, seed=1234, overrides=None, log=None):
+    results = []
+    for size in sizes:
+        for name in scenes:
+            rows = BenchmarkScene(name, size, steps, warmup, seed, overrides=overrides)
+            results.extend(rows)
+            if log is not None:
+                for r in rows:
+                    log.write("%-11s %5d² %-10s %9.3f ms  %12.0f cells/s\n"
+                              % (name, size, r["stage"], r["msMedian"], r["cellsPerSecond"] or 0))
+                log.flush()
+    return {"environment": Environment(), "seed": seed, "steps": steps, "warmup": warmup,
+            "overrides": overrides or {}, "results": results}
+
+def CompareResults(current, baseline, threshold=0.2, floorMs=0.05):
+    # 기준보다 (1+threshold)배 넘게 느려진 항목. floorMs 미만의 아주 짧은 단계는 잡음이라 제외
+    base = {(r["scene"],r["size"],r["stage"]): r for r in baseline["results"]}
+    regressions = []
+    for r in current["results"]:
+        b = base.get((r["scene"],r["size"],r["stage"]))
+        if b is None or max(r["msMedian"],b["msMedian"]) < floorMs:
+            continue
+        ratio = r["msMedian"]/b["msMedian"] if b["msMedian"]>0 else float("inf")
+        if ratio > 1.0+threshold:
+            regressions.append({"scene": r["scene"], "size": r["size"], "stage": r["stage"],
+                                "baselineMs": b["msMedian"], "currentMs": r["msMedian"], "ratio": ratio})
+    return regressions
+
+def SaveResults(data, path):
+    with open(path,"w",encoding="utf-8") as f:
+        json.dump(data, f, indent=1)
+
+def LoadResults(path):
+    with open(path,"r",encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,222 @@
+import threading
+import multiprocessing
+import numpy as np
+
+from .simulation import (Config, MaterialDatabase, ReactionDatabase, Reaction, CellGrid, ReactionEngine,
+                         FluidSolver, ThermalSolver)
+from .shared import SharedArrays
+
+#--------------------------------------------
+# DistributedSimulation: 격자를 가로 띠로 나눠 작업 프로세스마다 한 블록씩
+#--------------------------------------------
+# 필드 배열은 공유 메모리에 있고 주 프로세스의 grid도 그 뷰다 (GUI/헤드리스는 격자 하나만 본다)
+# 작업자 i는 타일 행 블록 i를 맡고, 블록을 위/아래 반쪽으로 나눈다. 각 반쪽은 위아래로 한 타일 행씩
+# 이웃 블록을 겹쳐 보는 뷰(halo)를 쓰는데, 공유 메모리라 halo 교환은 복사 없이 바로 읽기다
+#  - 반응, 유체 정렬: 모든 작업자가 위쪽 반쪽 → 장벽 → 아래쪽 반쪽. 같은 위상의 반쪽끼리는 붙어 있지
+#    않으므로(반쪽은 2 타일 행 이상) 경계를 넘는 반응 열/셀 이동을 이웃 쪽 halo에 바로 써도 경쟁이 없다
+#  - 열 전도: 모두 계산(halo 읽기) → 장벽 → 자기 타일만 반영
+# 스포너, 툴, 명령, 활성 타일 관리는 주 프로세스가 스텝 사이에 한다
+# 오일러 유체/암시적 열 해법은 격자 전체 연립방정식이라 지원하지 않는다
+BARRIER_TIMEOUT = 300.0
+
+def PlanBlocks(tilesY, workers):
+    # 작업자별 (위 반쪽 시작, 경계, 아래 반쪽 끝) 타일 행. 반쪽마다 2 타일 행 이상
+    workers = max(1, min(workers, tilesY//4))
+    if workers < 1 or tilesY < 4:
+        raise ValueError("grid is too small to split (%d tile rows, need at least 4)" % tilesY)
+    edges = np.linspace(0, tilesY, workers+1).astype(int)
+    return [(int(a), int((a+b)//2), int(b)) for a,b in zip(edges[:-1],edges[1:])]
+
+def _Snapshot(simManager):
+    # 작업자에게 보낼 설정/DB (바뀌면 다시 보냄)
+    return {"config": dict(vars(simManager.config)),
+            "materials": simManager.matDB.ToJSON(),
+            "reactions": [[r.reactant1, r.reactant2, list(r.products), r.A, r.Ea, r.deltaH]
+                          for r in simManager.rxDB.reactions]}
+
+class DistributedSimulation:
+    def __init__(self, simManager, workers):
+        config = simManager.config
+        if config.fluidMode == "eulerian" or config.thermalMode == "implicit":
+            raise ValueError("distributed mode supports only fluidMode='settle' and thermalMode='explicit'")
+        self.simManager = simManager
+        grid = simManager.grid
+        ts = grid.activity.tileSize
+        self.blocks = PlanBlocks(grid.activity.tilesY, workers)
+        self.workers = len(self.blocks)
+        tilesShape = grid.activity.touched.shape
+        arrays = {name: getattr(grid,name) for name in grid.FIELDS}
+        arrays["process"] = np.zeros(tilesShape, dtype=np.bool_)
+        arrays["touched"] = np.zeros((self.workers,)+tilesShape, dtype=np.bool_)
+        arrays["counts"] = np.zeros((self.workers,2), dtype=np.int64)  # 반응 수, 이동 수
+        arrays["control"] = np.zeros(4, dtype=np.float64)  # 명령(1 스텝, 0 종료), dt, 설정 버전, 스텝 번호
+        self.shared = SharedArrays.Create(arrays, readonly=False)
+        a = self.shared.arrays
+        # 주 프로세스 grid를 공유 배열 뷰로 교체
+        simManager.SetGrid(CellGrid(grid.width, grid.height, ts, fields={name: a[name] for name in grid.FIELDS}))
+
+        ctx = multiprocessing.get_context("spawn")
+        self.barrier = ctx.Barrier(self.workers+1)
+        self.queues = [ctx.Queue() for _ in self.blocks]
+        self._snapshot = _Snapshot(simManager)
+        self._version = 0
+        self.processes = []
+        for i,block in enumerate(self.blocks):
+            p = ctx.Process(target=_WorkerMain, name="PowerCUBE-worker-%d" % i, daemon=True,
+                            args=(self.shared.shm.name, self.shared.layout, i, block, grid.width, grid.height, ts,
+                                  self.barrier, self.queues[i], self._snapshot))
+            p.start()
+            self.processes.append(p)
+
+    def _Wait(self):
+        try:
+            self.barrier.wait(BARRIER_TIMEOUT)
+        except threading.BrokenBarrierError:
+            dead = [p.name for p in self.processes if not p.is_alive()]
+            raise RuntimeError("distributed worker failed (%s)" % (", ".join(dead) or "barrier broken"))
+
+    def Sync(self):
+        snapshot = _Snapshot(self.simManager)
+        if snapshot != self._snapshot:
+            self._snapshot = snapshot
+            self._version += 1
+            for q in self.queues:
+                q.put((self._version, snapshot))
+
+    def Step(self, dt, prof):
+        a = self.shared.arrays
+        act = self.simManager.grid.activity
+        self.Sync()
+        a["process"][:] = act.process
+        control = a["control"]
+        control[0], control[1], control[2], control[3] = 1.0, dt, self._version, self.simManager.stepCount
+        self._Wait()  # 시작
+        self._Wait()  # 반응: 위 반쪽
+        self._Wait()  # 반응: 아래 반쪽
+        prof.Lap(1)
+        self._Wait()  # 정렬: 위 반쪽
+        self._Wait()  # 정렬: 아래 반쪽
+        prof.Lap(2)
+        self._Wait()  # 열: 계산
+        self._Wait()  # 열: 반영
+        prof.Lap(3)
+        act.touched |= a["touched"].any(axis=0)
+        counts = a["counts"].sum(axis=0)
+        self.simManager.reactionEngine.firedCount = int(counts[0])
+        self.simManager.fluidSolver.swappedCount = int(counts[1])
+
+    def Close(self, copyBack=True):
+        # 작업자 종료. copyBack이면 공유 배열을 일반 배열로 복사해 grid를 되돌린다
+        a = self.shared.arrays
+        a["control"][0] = 0.0
+        try:
+            self.barrier.wait(5.0)
+        except threading.BrokenBarrierError:
+            pass
+        for p in self.processes:
+            p.join(5.0)
+            if p.is_alive():
+                p.terminate()
+        if copyBack:
+            grid = self.simManager.grid
+            fields = {name: np.array(getattr(grid,name)) for name in grid.FIELDS}
+            self.simManager.SetGrid(CellGrid(grid.width, grid.height, grid.activity.tileSize, fields=fields))
+        self.shared.Close(unlink=True)
+
+#--------------------------------------------
+# 작업 프로세스
+#--------------------------------------------
+class _Strip:
+    # 타일 행 [t0,t1)을 맡는 뷰 그리드 (위아래 halo 한 타일 행 포함)
+    def __init__(self, fields, t0, t1, width, height, ts, tilesY):
+        self.t0, self.t1 = t0, t1
+        self.v0, self.v1 = max(0,t0-1), min(tilesY,t1+1)
+        rows = slice(self.v0*ts, min(height,self.v1*ts))
+        self.grid = CellGrid(width, rows.stop-rows.start, ts, fields={name: a[rows] for name,a in fields.items()})
+        self.grid.originY = rows.start
+
+    def Prepare(self, process, halo):
+        # 전역 처리 타일 중 이 띠의 것만. halo=False면 halo 타일은 제외
+        act = self.grid.activity
+        p = process[self.v0:self.v1].copy()
+        if not halo:
+            p[:self.t0-self.v0] = False
+            p[self.t1-self.v0:] = False
+        act.process = act.stencil = p
+        act.processList = act.stencilList = np.argwhere(p)
+        act._cellMask = None
+
+    def ReportTouched(self, touched):
+        touched[self.v0:self.v1] |= self.grid.activity.touched
+        self.grid.activity.touched[:] = False
+
+def _ApplySnapshot(snapshot, config, matDB, rxDB):
+    config.Apply({k: v for k,v in snapshot["config"].items() if hasattr(config,k)})
+    matDB.LoadFromJSON(snapshot["materials"])
+    rxDB.Clear()
+    for r1,r2,products,A,Ea,deltaH in snapshot["reactions"]:
+        rxDB.AddReaction(Reaction(r1,r2,products,A,Ea,deltaH))
+
+def _WorkerMain(shmName, layout, index, block, width, height, ts, barrier, queue, snapshot):
+    shared = SharedArrays.Attach(shmName, layout, readonly=False)
+    a = shared.arrays
+    try:
+        config = Config()
+        matDB = MaterialDatabase()
+        rxDB = ReactionDatabase()
+        _ApplySnapshot(snapshot, config, matDB, rxDB)
+        version = 0
+        reactionEngine = ReactionEngine(matDB, rxDB, config)
+        reactionEngine.wakeByHeap = False  # 띠 시계의 힙은 주 프로세스의 활성 맵과 닿지 않는다
+        fluidSolver = FluidSolver(matDB, config)
+        thermalSolver = ThermalSolver(matDB, config)
+        fields = {name: a[name] for name in CellGrid.FIELDS}
+        tilesY = a["process"].shape[0]
+        t0, tm, t1 = block
+        halves = [_Strip(fields, t0, tm, width, height, ts, tilesY), _Strip(fields, tm, t1, width, height, ts, tilesY)]
+        whole = _Strip(fields, t0, t1, width, height, ts, tilesY)
+        touched = a["touched"][index]
+        counts = a["counts"][index]
+        while True:
+            barrier.wait()
+            if a["control"][0] == 0.0:
+                break
+            dt = float(a["control"][1])
+            # 반응 난수는 (seed, 스텝, 전체 격자 계면)이 키라서 주 프로세스 단일 실행과 같은 값을 뽑는다
+            reactionEngine.step = int(a["control"][3])
+            target = int(a["control"][2])
+            while version < target:
+                version, snapshot = queue.get()
+                _ApplySnapshot(snapshot, config, matDB, rxDB)
+            process = a["process"]
+            touched[:] = False
+            fired = swapped = 0
+
+            for strip in halves:
+                strip.Prepare(process, halo=False)
+                reactionEngine.ProcessReactions(strip.grid, dt)
+                fired += reactionEngine.firedCount
+                strip.ReportTouched(touched)
+                barrier.wait()
+
+            density, fluid = fluidSolver.GetPhaseTables()
+            for strip in halves:
+                strip.Prepare(process, halo=True)
+                fluidSolver.Settle(strip.grid, density, fluid)
+                swapped += fluidSolver.swappedCount
+                strip.ReportTouched(touched)
+                barrier.wait()
+
+            whole.Prepare(process, halo=False)
+            thermalSolver.ComputeNumba(whole.grid, dt)
+            barrier.wait()
+            thermalSolver.CommitNumba(whole.grid)
+            whole.ReportTouched(touched)
+            counts[0], counts[1] = fired, swapped
+            barrier.wait()
+    except BaseException:
+        barrier.abort()
+        raise
+    finally:
+        fields = halves = whole = touched = counts = None
+        shared.Close()
@@ -0,0 +1,651 @@
+import sys
+import time
+import math
+import numpy as np
+
+from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
+                               QMenuBar, QFileDialog, QSlider, QPushButton, QComboBox, QCheckBox,
+                               QDockWidget, QTreeWidget, QTreeWidgetItem, QLineEdit, QTabWidget, QToolBar,
+                               QMessageBox, QGraphicsOpacityEffect)
+from PySide6.QtGui import QPainter, QColor, QAction, QIcon, QImage, QRegion, QKeySequence
+from PySide6.QtCore import QTimer, Qt, QPoint, QRect, QRectF
+from PySide6.QtOpenGLWidgets import QOpenGLWidget
+
+from .simulation import (Config, SimulationManager, SimulationRunner, FrameRenderer, Stroke, BRUSH_SHAPES,
+                         ReadMaterialLibrary)
+from .state import SaveState, ReadState, RestoreState
+
+#--------------------------------------------
+# UI: SimulationView
+#--------------------------------------------
+class SimulationView(QOpenGLWidget):
+    def __init__(self, simManager):
+        super().__init__()
+        self.simManager = simManager
+        self.runner = None
+        self.renderer = FrameRenderer(simManager.matDB)
+        # 바뀐 영역만 다시 그리므로 프레임 버퍼를 지우지 않게 한다
+        self.setUpdateBehavior(QOpenGLWidget.PartialUpdate)
+        self.dirtyRegion = QRegion()
+        self._lastViewState = None
+        self.stroke = None
+        self.setFocusPolicy(Qt.StrongFocus)
+
+    def cellSize(self, grid):
+        cw = self.width()/grid.width*self.simManager.config.viewZoom
+        ch = self.height()/grid.height*self.simManager.config.viewZoom
+        return cw, ch
+
+    def viewState(self):
+        # 이 값들이 바뀌면 화면 전체를 다시 그려야 한다
+        config = self.simManager.config
+        return (self.width(), self.height(), config.viewZoom, config.viewOffsetX, config.viewOffsetY,
+                config.displayMode, config.showActiveTiles, config.showTools, config.showBlocks)
+
+    def updateCells(self, rects):
+        # rects: 셀 좌표 (x0,y0,x1,y1) 목록 → 위젯 좌표 영역만 갱신 요청
+        if self._lastViewState != self.viewState():
+            self.update()
+            return
+        if not rects:
+            return
+        grid = self.simManager.grid
+        cw, ch = self.cellSize(grid)
+        offsetX = self.simManager.config.viewOffsetX
+        offsetY = self.simManager.config.viewOffsetY
+        for x0,y0,x1,y1 in rects:
+            left = int(math.floor((x0+offsetX)*cw))
+            top = int(math.floor((y0+offsetY)*ch))
+            right = int(math.ceil((x1+offsetX)*cw))
+            bottom = int(math.ceil((y1+offsetY)*ch))
+            self.dirtyRegion = self.dirtyRegion.united(QRect(left, top, right-left, bottom-top))
+        self.update(self.dirtyRegion.boundingRect())
+
+    def paintEvent(self, event):
+        # 작업 스레드가 돌고 있으면 게시된 프레임을, 아니면 그리드를 직접 읽는다
+        runner = self.runner
+        t0 = time.perf_counter()
+        frame = runner.AcquireFrame() if runner is not None else None
+        try:
+            self.paintFrame(frame)
+        finally:
+            if runner is not None:
+                runner.ReleaseFrame()
+        self.simManager.profiler.RecordRender(t0, time.perf_counter())
+
+    def paintFrame(self, frame):
+        painter = QPainter(self)
+        grid = frame if frame is not None else self.simManager.grid
+        w,h = grid.width, grid.height
+        cw, ch = self.cellSize(grid)
+        offsetX = self.simManager.config.viewOffsetX
+        offsetY = self.simManager.config.viewOffsetY
+        displayMode = self.simManager.config.displayMode
+
+        viewState = self.viewState()
+        config = self.simManager.config
+        fullRepaint = viewState != self._lastViewState or self.dirtyRegion.isEmpty() or config.showActiveTiles or config.showBlocks or config.showProfiler
+        self._lastViewState = viewState
+        if fullRepaint:
+            area = QRect(0, 0, self.width(), self.height())
+            painter.fillRect(area, QColor(0,0,0))
+        else:
+            area = self.dirtyRegion.boundingRect()
+            painter.setClipRect(area)
+        self.dirtyRegion = QRegion()
+
+        # 화면(또는 갱신 영역)에 보이는 셀 범위만 그린다
+        x0 = max(0, int(math.floor(area.left()/cw - offsetX)))
+        y0 = max(0, int(math.floor(area.top()/ch - offsetY)))
+        x1 = min(w, int(math.ceil((area.right()+1)/cw - offsetX)))
+        y1 = min(h, int(math.ceil((area.bottom()+1)/ch - offsetY)))
+        if x0<x1 and y0<y1:
+            # 버퍼 하나를 QImage로 감싸서(복사 없음) 확대해 한 번에 그림
+            buf = self.renderer.Render(grid, displayMode, (x0,y0,x1,y1))
+            img = QImage(buf.data, x1-x0, y1-y0, buf.strides[0], QImage.Format_RGB32)
+            painter.setRenderHint(QPainter.SmoothPixmapTransform, False)
+            painter.drawImage(QRectF((x0+offsetX)*cw, (y0+offsetY)*ch, (x1-x0)*cw, (y1-y0)*ch), img)
+
+        if self.simManager.config.showActiveTiles:
+            # 활성 타일 오버레이: 타일 해상도 반투명 이미지 하나를 확대
+            if frame is not None:
+                processList, ts = frame.processList, frame.tileSize
+            else:
+                processList, ts = grid.activity.processList, grid.activity.tileSize
+            overlay = np.zeros((-(-h//ts),-(-w//ts)), dtype=np.uint32)
+            overlay[processList[:,0],processList[:,1]] = 0x5000FF00
+            tileImg = QImage(overlay.data, overlay.shape[1], overlay.shape[0], overlay.strides[0], QImage.Format_ARGB32)
+            painter.drawImage(QRectF(offsetX*cw, offsetY*ch, overlay.shape[1]*ts*cw, overlay.shape[0]*ts*ch), tileImg)
+
+        if self.simManager.config.showBlocks:
+            # 균일 블록(4분 트리) 테두리. 작업 스레드 실행 중에는 게시된 프레임의 사본으로
+            if frame is not None:
+                blocks, ts = frame.blocks, frame.tileSize
+            else:
+                blocks, ts = self.simManager.blockMap.blocks, grid.activity.tileSize
+            painter.setPen(QColor(0,200,255,160))
+            for ty,tx,level in blocks.tolist():
+                bx, by, size = tx*ts, ty*ts, ts << level
+                if bx < x1 and by < y1 and bx+size > x0 and by+size > y0:
+                    painter.drawRect(int((bx+offsetX)*cw),int((by+offsetY)*ch),int(size*cw),int(size*ch))
+
+        if self.simManager.config.showTools:
+            painter.setPen(QColor(255,255,255))
+            # 보이는 셀 범위와 겹치는 툴만 (타일 버킷 색인)
+            for tool in self.simManager.toolIndex.Query(x0,y0,x1,y1):
+                painter.drawRect(int((tool.x+offsetX)*cw),int((tool.y+offsetY)*ch),
+                                 int(tool.w*cw),int(tool.h*ch))
+
+        if config.showProfiler:
+            self.paintProfiler(painter)
+
+    def paintProfiler(self, painter):
+        # 왼쪽 위 HUD: FPS, 스텝 속도, 최근 단계별 평균 시간, 카운터
+        summary = self.simManager.profiler.Summary()
+        lines = ["FPS %.1f   steps/s %.1f" % (summary["fps"], summary["stepsPerSecond"])]
+        for name,ms in summary["stageMs"].items():
+            lines.append("%-10s %7.2f ms" % (name, ms))
+        lines.append("%-10s %7.2f ms" % ("render", summary["renderMs"]))
+        sched = self.simManager.scheduler.Stats()
+        lines.append("steps/frame %d   dropped %d" % (sched["lastFrameSteps"], sched["droppedSteps"]))
+        for name,stage in sched["stages"].items():
+            lines.append("%-10s x%d %5.0f%% budget" % (name, stage["substeps"], stage["budgetShare"]*100.0))
+        for name in self.simManager.profiler.COUNTERS:
+            if name in summary:
+                lines.append("%-14s %d" % (name, summary[name]))
+        lineHeight = painter.fontMetrics().height()
+        painter.fillRect(QRect(4, 4, 220, lineHeight*len(lines)+8), QColor(0,0,0,160))
+        painter.setPen(QColor(255,255,255))
+        for i,line in enumerate(lines):
+            painter.drawText(10, 8+lineHeight*(i+1)-painter.fontMetrics().descent(), line)
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            # 획 시작: 샘플은 모았다가 스텝 경계에서 선분으로 이어 한 번에 칠한다
+            config = self.simManager.config
+            self.stroke = Stroke(config.selectedMaterialID, config.brushSize, config.brushShape)
+            self.simManager.Post(self.simManager.BeginStroke, self.stroke)
+            self.paintMaterial(event)
+
+    def mouseMoveEvent(self, event):
+        if event.buttons() & Qt.LeftButton and self.stroke is not None:
+            self.paintMaterial(event)
+
+    def mouseReleaseEvent(self, event):
+        if event.button() == Qt.LeftButton and self.stroke is not None:
+            self.simManager.Post(self.simManager.EndStroke, self.stroke)
+            self.stroke = None
+
+    def paintMaterial(self, event):
+        # 격자 밖 샘플도 넣는다 (밖으로 나갔다 들어오는 선분도 격자 안 부분은 칠해진다)
+        cw, ch = self.cellSize(self.simManager.grid)
+        offsetX = self.simManager.config.viewOffsetX
+        offsetY = self.simManager.config.viewOffsetY
+        gridX = int(math.floor(event.position().x()/cw - offsetX))
+        gridY = int(math.floor(event.position().y()/ch - offsetY))
+        self.simManager.Post(self.stroke.AddPoint, gridX, gridY)
+
+    def wheelEvent(self, event):
+        delta = event.angleDelta().y()/120
+        self.simManager.config.viewZoom *= (1+delta*0.1)
+        self.simManager.config.viewZoom = max(0.1,min(10,self.simManager.config.viewZoom))
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key_W:
+            self.simManager.config.viewOffsetY -= 1
+        elif event.key() == Qt.Key_S:
+            self.simManager.config.viewOffsetY += 1
+        elif event.key() == Qt.Key_A:
+            self.simManager.config.viewOffsetX -= 1
+        elif event.key() == Qt.Key_D:
+            self.simManager.config.viewOffsetX += 1
+
+#--------------------------------------------
+# MaterialDock: 검색, 트리뷰로 물질 선택
+#--------------------------------------------
+class MaterialDock(QDockWidget):
+    def __init__(self, simManager):
+        super().__init__("Materials")
+        self.simManager = simManager
+        w = QWidget()
+        layout = QVBoxLayout(w)
+
+        self.searchEdit = QLineEdit()
+        self.searchEdit.setPlaceholderText("Search material...")
+        self.searchEdit.textChanged.connect(self.filterMaterials)
+        layout.addWidget(self.searchEdit)
+
+        self.tree = QTreeWidget()
+        self.tree.setHeaderHidden(True)
+        layout.addWidget(self.tree)
+
+        self.populateTimer = QTimer(self)
+        self.populateTimer.timeout.connect(self.populateBatch)
+        self.populateMaterials()
+        self.tree.itemClicked.connect(self.selectMaterial)
+
+        self.setWidget(w)
+
+    CATEGORIES = ("Metals","Inorganic","Organic","Gases")
+    POPULATE_BATCH = 256  # 타이머 한 번에 추가하는 항목 수 (큰 라이브러리에서도 UI가 멈추지 않게)
+
+    def categoryOf(self, m):
+        # 라이브러리에 분류가 없으면 물성으로 추정
+        if m.category:
+            return m.category
+        if m.boilingPoint<0:
+            return "Gases"
+        elif m.density>5000:
+            return "Metals"
+        elif "Ethanol" in m.name:
+            return "Organic"
+        return "Inorganic"
+
+    def populateMaterials(self):
+        # 트리를 비우고 물질을 나눠서 채운다 (populateBatch가 타이머로 이어서)
+        self.tree.clear()
+        self.categoryItems = {}
+        for name in self.CATEGORIES:
+            self.categoryItem(name)
+        # LoadLibrary는 시뮬레이션 스레드에서 돌므로 version과 목록을 같은 잠금 안에서 함께 읽는다
+        self.materialVersion, materials = self.simManager.matDB.Snapshot()
+        self.pendingMaterials = list(enumerate(materials))
+        self.populateTimer.start(0)
+
+    def categoryItem(self, name):
+        item = self.categoryItems.get(name)
+        if item is None:
+            item = QTreeWidgetItem([name])
+            self.tree.addTopLevelItem(item)
+            item.setExpanded(True)
+            self.categoryItems[name] = item
+        return item
+
+    def populateBatch(self):
+        batch = self.pendingMaterials[:self.POPULATE_BATCH]
+        del self.pendingMaterials[:self.POPULATE_BATCH]
+        matchText = self.searchEdit.text().lower()
+        groups = {}
+        for i,m in batch:
+            item = QTreeWidgetItem([m.name])
+            item.setData(0, Qt.UserRole, i)
+            item.setHidden(matchText not in m.name.lower())
+            groups.setdefault(self.categoryOf(m), []).append(item)
+        for name,items in groups.items():
+            self.categoryItem(name).addChildren(items)
+        if not self.pendingMaterials:
+            self.populateTimer.stop()
+
+    def refresh(self):
+        # 라이브러리를 불러와 물질 목록이 바뀌었으면 다시 채움 (MainWindow.tick에서 호출)
+        if self.materialVersion != self.simManager.matDB.version:
+            self.populateMaterials()
+
+    def filterMaterials(self, text):
+        # 간단한 필터
+        matchText = text.lower()
+        def filterItem(item):
+            visible = (matchText in item.text(0).lower())
+            for i in range(item.childCount()):
+                c = item.child(i)
+                if filterItem(c):
+                    visible = True
+            item.setHidden(not visible)
+            return visible
+
+        for i in range(self.tree.topLevelItemCount()):
+            root = self.tree.topLevelItem(i)
+            filterItem(root)
+
+    def selectMaterial(self, item, col):
+        matID = item.data(0, Qt.UserRole)
+        if matID is not None:
+            self.simManager.config.selectedMaterialID = int(matID)
+
+#--------------------------------------------
+# ControlDock: 시뮬레이션 제어
+#--------------------------------------------
+class ControlDock(QDockWidget):
+    def __init__(self, simManager):
+        super().__init__("Control")
+        self.simManager = simManager
+        w = QWidget()
+        layout = QVBoxLayout(w)
+
+        self.expertCheck = QCheckBox("Expert Mode")
+        self.expertCheck.setChecked(simManager.config.expertMode)
+        self.expertCheck.stateChanged.connect(self.toggleExpert)
+        layout.addWidget(self.expertCheck)
+
+        self.pauseButton = QPushButton("Pause/Resume")
+        self.pauseButton.clicked.connect(self.togglePause)
+        layout.addWidget(self.pauseButton)
+
+        layout.addWidget(QLabel("Brush Size"))
+        self.brushSlider = QSlider(Qt.Horizontal)
+        self.brushSlider.setRange(1,20)
+        self.brushSlider.setValue(simManager.config.brushSize)
+        self.brushSlider.valueChanged.connect(self.changeBrushSize)
+        layout.addWidget(self.brushSlider)
+        self.brushShapeCombo = QComboBox()
+        self.brushShapeCombo.addItems(list(BRUSH_SHAPES))
+        self.brushShapeCombo.setCurrentText(simManager.config.brushShape)
+        self.brushShapeCombo.currentTextChanged.connect(lambda shape: setattr(self.simManager.config, "brushShape", shape))
+        layout.addWidget(self.brushShapeCombo)
+
+        layout.addWidget(QLabel("Simulation Speed"))
+        self.speedSlider = QSlider(Qt.Horizontal)
+        self.speedSlider.setRange(1,50)
+        self.speedSlider.setValue(int(simManager.config.simulationSpeed*10))
+        self.speedSlider.valueChanged.connect(self.changeSimSpeed)
+        layout.addWidget(self.speedSlider)
+
+        # 타임라인: 기록된 프레임 탐색, 재개, 구간 내보내기
+        self.recordCheck = QCheckBox("Record Timeline")
+        self.recordCheck.setChecked(simManager.config.recordTimeline)
+        self.recordCheck.toggled.connect(lambda on: setattr(self.simManager.config, "recordTimeline", on))
+        layout.addWidget(self.recordCheck)
+
+        self.timelineLabel = QLabel("No frames recorded")
+        layout.addWidget(self.timelineLabel)
+        self.timelineSlider = QSlider(Qt.Horizontal)
+        self.timelineSlider.setRange(0,0)
+        self.timelineSlider.sliderMoved.connect(self.seekTimeline)
+        self.timelineSlider.actionTriggered.connect(lambda action: self.seekTimeline(self.timelineSlider.sliderPosition()))
+        layout.addWidget(self.timelineSlider)
+
+        timelineButtons = QHBoxLayout()
+        self.resumeButton = QPushButton("Resume")
+        self.resumeButton.clicked.connect(self.resumeTimeline)
+        timelineButtons.addWidget(self.resumeButton)
+        self.markInButton = QPushButton("Mark In")
+        self.markInButton.clicked.connect(self.markIn)
+        timelineButtons.addWidget(self.markInButton)
+        self.exportButton = QPushButton("Export...")
+        self.exportButton.clicked.connect(self.exportTimeline)
+        timelineButtons.addWidget(self.exportButton)
+        layout.addLayout(timelineButtons)
+        self.markInIndex = 0
+
+        self.setWidget(w)
+
+    def toggleExpert(self, state):
+        self.simManager.config.expertMode = (state == Qt.Checked)
+
+    def togglePause(self):
+        self.simManager.config.paused = not self.simManager.config.paused
+
+    def changeBrushSize(self, val):
+        self.simManager.config.brushSize = val
+
+    def changeSimSpeed(self, val):
+        self.simManager.config.simulationSpeed = val/10.0
+
+    def refreshTimeline(self):
+        # 매 틱 호출: 기록 길이에 맞춰 슬라이더 범위, 기록 중이면 끝을 따라감
+        recorder = self.simManager.recorder
+        n = len(recorder.frames)
+        if self.timelineSlider.isSliderDown():
+            return
+        self.timelineSlider.setRange(0, max(0,n-1))
+        if recorder.cursor is None and not self.simManager.config.paused:
+            self.timelineSlider.setValue(max(0,n-1))
+        if n == 0:
+            self.timelineLabel.setText("No frames recorded")
+            return
+        i = min(self.timelineSlider.value(), n-1)
+        self.timelineLabel.setText("Step %d  (%d/%d, %.1f MB)" % (recorder.frames[i].step, i+1, n, recorder.nbytes/1048576.0))
+
+    def seekTimeline(self, index):
+        # 탐색하면 일시정지. Resume하면 그 프레임부터 이어서 기록/진행 (이후 기록은 버려짐)
+        if not self.simManager.recorder.frames:
+            return
+        self.simManager.config.paused = True
+        self.simManager.Post(self.simManager.recorder.Seek, self.simManager, index)
+
+    def resumeTimeline(self):
+        self.simManager.config.paused = False
+
+    def markIn(self):
+        self.markInIndex = self.timelineSlider.value()
+
+    def exportTimeline(self):
+        recorder = self.simManager.recorder
+        start, end = sorted((self.markInIndex, self.timelineSlider.value()))
+        if not recorder.frames or start >= len(recorder.frames):
+            QMessageBox.information(self,"Export Timeline","No recorded frames in the selected range.")
+            return
+        path, _ = QFileDialog.getSaveFileName(self,"Export Timeline","timeline.npz","Timeline (*.npz)")
+        if path:
+            recorder.Export(path, start, end)
+
+#--------------------------------------------
+# MainWindow
+#--------------------------------------------
+class MainWindow(QMainWindow):
+    def __init__(self, simManager):
+        super().__init__()
+        self.simManager = simManager
+        if not self.simManager.initialized:
+            self.simManager.Initialize()
+        if self.simManager.config.distributedWorkers > 0 and self.simManager.distributed is None:
+            self.simManager.StartDistributed(self.simManager.config.distributedWorkers)
+
+        self.setWindowTitle("Advanced Laboratory Simulator - Professional Edition")
+        self.view = SimulationView(self.simManager)
+        self.setCentralWidget(self.view)
+
+        # Dock widgets
+        self.materialDock = MaterialDock(self.simManager)
+        self.addDockWidget(Qt.LeftDockWidgetArea, self.materialDock)
+
+        self.controlDock = ControlDock(self.simManager)
+        self.addDockWidget(Qt.RightDockWidgetArea, self.controlDock)
+
+        # Menubar
+        menubar = self.menuBar()
+        fileMenu = menubar.addMenu("File")
+
+        loadScriptAction = QAction("Load Script",self)
+        loadScriptAction.triggered.connect(self.loadScript)
+        fileMenu.addAction(loadScriptAction)
+
+        saveStateAction = QAction("Save State...",self)
+        saveStateAction.triggered.connect(self.saveState)
+        fileMenu.addAction(saveStateAction)
+
+        loadStateAction = QAction("Load State...",self)
+        loadStateAction.triggered.connect(self.loadState)
+        fileMenu.addAction(loadStateAction)
+
+        loadLibraryAction = QAction("Load Material Library...",self)
+        loadLibraryAction.triggered.connect(self.loadMaterialLibrary)
+        fileMenu.addAction(loadLibraryAction)
+
+        loadTimelineAction = QAction("Load Timeline...",self)
+        loadTimelineAction.triggered.connect(self.loadTimeline)
+        fileMenu.addAction(loadTimelineAction)
+
+        saveSnapshotAction = QAction("Save Snapshot",self)
+        saveSnapshotAction.triggered.connect(self.saveSnapshot)
+        fileMenu.addAction(saveSnapshotAction)
+
+        exportTraceAction = QAction("Export Trace...",self)
+        exportTraceAction.triggered.connect(self.exportTrace)
+        fileMenu.addAction(exportTraceAction)
+
+        editMenu = menubar.addMenu("Edit")
+        undoAction = QAction("Undo Stroke",self)
+        undoAction.setShortcut(QKeySequence.Undo)
+        undoAction.triggered.connect(lambda: self.simManager.Post(self.simManager.Undo))
+        editMenu.addAction(undoAction)
+
+        viewMenu = menubar.addMenu("View")
+        displayMaterial = QAction("Show Material View",self)
+        displayMaterial.triggered.connect(lambda: self.setDisplayMode("Material"))
+        viewMenu.addAction(displayMaterial)
+
+        displayTemp = QAction("Show Temperature View",self)
+        displayTemp.triggered.connect(lambda: self.setDisplayMode("Temperature"))
+        viewMenu.addAction(displayTemp)
+
+        displayPress = QAction("Show Pressure View",self)
+        displayPress.triggered.connect(lambda: self.setDisplayMode("Pressure"))
+        viewMenu.addAction(displayPress)
+
+        showTiles = QAction("Show Active Tiles",self)
+        showTiles.setCheckable(True)
+        showTiles.setChecked(self.simManager.config.showActiveTiles)
+        showTiles.toggled.connect(lambda on: setattr(self.simManager.config, "showActiveTiles", on))
+        viewMenu.addAction(showTiles)
+
+        showBlocks = QAction("Show Uniform Blocks",self)
+        showBlocks.setCheckable(True)
+        showBlocks.setChecked(self.simManager.config.showBlocks)
+        showBlocks.toggled.connect(lambda on: setattr(self.simManager.config, "showBlocks", on))
+        viewMenu.addAction(showBlocks)
+
+        showProfiler = QAction("Show Profiler",self)
+        showProfiler.setCheckable(True)
+        showProfiler.setChecked(self.simManager.config.showProfiler)
+        showProfiler.toggled.connect(self.setShowProfiler)
+        viewMenu.addAction(showProfiler)
+
+        simMenu = menubar.addMenu("Simulation")
+        pauseAct = QAction("Pause/Resume",self)
+        pauseAct.triggered.connect(self.togglePause)
+        simMenu.addAction(pauseAct)
+
+        # 작업 스레드 모드에서 타이머는 화면 갱신만 담당
+        self.runner = None
+        if self.simManager.config.threadedSimulation:
+            self.runner = SimulationRunner(self.simManager)
+            self.view.runner = self.runner
+            self.runner.Start()
+
+        # Timer
+        self.timer = QTimer()
+        self.timer.timeout.connect(self.tick)
+        self.timer.start(self.simManager.config.updateIntervalMs)
+        self.prevTime = time.time()
+
+    def setDisplayMode(self, mode):
+        self.simManager.config.displayMode = mode
+
+    def togglePause(self):
+        self.simManager.config.paused = not self.simManager.config.paused
+
+    def setShowProfiler(self, on):
+        # HUD를 켜면 기록도 켠다 (끌 때는 기록을 유지해서 나중에 내보낼 수 있게)
+        self.simManager.config.showProfiler = on
+        if on:
+            self.simManager.config.profiling = True
+
+    def tick(self):
+        currentTime = time.time()
+        dt = currentTime - self.prevTime
+        self.prevTime = currentTime
+        if self.runner is None and self.simManager.running:
+            # 고정 스텝으로 나눠 진행 (느린 프레임이 큰 dt 한 번이 되지 않게)
+            self.simManager.Advance(dt)
+            self.simManager.CommitDirty()
+        # 이번 틱 사이에 바뀐 셀 영역만 다시 그림
+        self.view.updateCells(self.simManager.TakeDirtyRects())
+        self.controlDock.refreshTimeline()
+        self.materialDock.refresh()
+        if self.simManager.config.showProfiler:
+            self.view.update()
+
+    def closeEvent(self, event):
+        if self.runner is not None:
+            self.runner.Stop()
+        self.simManager.StopDistributed()
+        super().closeEvent(event)
+
+    def loadScript(self):
+        path, _ = QFileDialog.getOpenFileName(self,"Load Script","","Python Files (*.py)")
+        if path:
+            with open(path) as f:
+                code = f.read()
+            # 시뮬레이션 스텝 도중에 그리드를 건드리지 않도록 스텝 사이에 실행
+            self.simManager.Post(self.runScript, code)
+
+    def runScript(self, code):
+        grid = self.simManager.grid
+        before = {name: getattr(grid,name).copy() for name in grid.FIELDS}
+        exec(code,{"grid":grid,"matDB":self.simManager.matDB,"rxDB":self.simManager.rxDB})
+        # Cell 뷰는 쓸 때 타일을 깨운다. 배열을 직접 고친 곳은 바뀐 칸의 타일만 깨운다
+        for name,old in before.items():
+            ys, xs = np.nonzero(getattr(grid,name) != old)
+            grid.activity.WakeCells(ys, xs)
+
+    def saveState(self):
+        path, _ = QFileDialog.getSaveFileName(self,"Save State","","State Files (*.pcs);;Compressed State (*.npz)")
+        if path:
+            # 캡처는 스텝 사이에, 파일 쓰기는 백그라운드 스레드에서
+            self.simManager.Post(SaveState, self.simManager, path)
+
+    def loadState(self):
+        path, _ = QFileDialog.getOpenFileName(self,"Load State","","State Files (*.pcs *.npz)")
+        if not path:
+            return
+        try:
+            meta, arrays = ReadState(path)
+        except (OSError, ValueError, KeyError) as e:
+            QMessageBox.warning(self,"Load State","Could not read %s:\n%s" % (path, e))
+            return
+        self.simManager.Post(RestoreState, self.simManager, meta, arrays)
+
+    def loadTimeline(self):
+        # 내보낸 타임라인을 불러와 첫 프레임으로 이동 (슬라이더로 재생)
+        path, _ = QFileDialog.getOpenFileName(self,"Load Timeline","","Timeline (*.npz)")
+        if not path:
+            return
+        self.simManager.config.paused = True
+        def load():
+            recorder = self.simManager.recorder
+            recorder.Import(path)
+            recorder.Seek(self.simManager, 0)
+        self.simManager.Post(load)
+
+    def loadMaterialLibrary(self):
+        path, _ = QFileDialog.getOpenFileName(self,"Load Material Library","","Material Library (*.json)")
+        if not path:
+            return
+        try:
+            # 파싱/검사는 여기서 (결과는 캐시), 물질 추가는 스텝 사이에
+            ReadMaterialLibrary(path)
+        except (OSError, ValueError, KeyError) as e:
+            QMessageBox.warning(self,"Load Material Library",str(e))
+            return
+        self.simManager.Post(self.simManager.matDB.LoadLibrary, path)
+
+    def exportTrace(self):
+        profiler = self.simManager.profiler
+        if profiler.count == 0:
+            QMessageBox.information(self,"Export Trace","No samples recorded yet. Enable View > Show Profiler first.")
+            return
+        path, _ = QFileDialog.getSaveFileName(self,"Export Trace","trace.json","Trace JSON (*.json)")
+        if path:
+            profiler.ExportTrace(path)
+
+    def saveSnapshot(self):
+        img = self.view.grabFramebuffer()
+        path, _ = QFileDialog.getSaveFileName(self,"Save Snapshot","","PNG Files (*.png)")
+        if path:
+            img.save(path)
+
+#--------------------------------------------
+# main
+#--------------------------------------------
+def main(config=None, scene=None):
+    app = QApplication(sys.argv)
+    if config is None:
+        config = Config()
+    simManager = SimulationManager(config)
+    if scene is not None:
+        simManager.LoadScene(scene)
+    window = MainWindow(simManager)
+    window.resize(config.screenWidth, config.screenHeight)
+    window.show()
+    return app.exec()
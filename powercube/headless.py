@@ -0,0 +1,80 @@
+import os
+import time
+import json
+import numpy as np
+
+from .simulation import SimulationManager
+from .state import SaveState, LoadState
+
+#--------------------------------------------
+# Headless runner: Qt 없이 고정 dt로 스텝, 주기적으로 지표/덤프 기록
+#--------------------------------------------
+def CollectMetrics(simManager):
+    grid = simManager.grid
+    T = grid.temperature
+    counts = np.bincount(grid.materialID.ravel().astype(np.int64), minlength=len(simManager.matDB.materials))
+    materials = {m.name: int(counts[i]) for i,m in enumerate(simManager.matDB.materials) if counts[i]}
+    return {
+        "step": simManager.stepCount,
+        "meanTemperature": float(T.mean()),
+        "maxTemperature": float(T.max()),
+        "minTemperature": float(T.min()),
+        "materials": materials,
+        "reactionsFired": int(simManager.reactionEngine.firedCount),
+        "cellsSwapped": int(simManager.fluidSolver.swappedCount),
+        "phaseChanges": int(simManager.phaseSolver.changedCount),
+        "activeTiles": int(len(grid.activity.processList)),
+        "collapsedTiles": int(simManager.blockMap.collapsedTiles),
+    }
+
+class HeadlessRunner:
+    def __init__(self, config, scene=None, statePath=None):
+        self.config = config
+        self.simManager = SimulationManager(config)
+        if statePath is not None:
+            LoadState(self.simManager, statePath)
+        elif scene is not None:
+            self.simManager.LoadScene(scene)
+        else:
+            self.simManager.Initialize()
+        if config.distributedWorkers > 0:
+            self.simManager.StartDistributed(config.distributedWorkers)
+        self.elapsed = 0.0
+        self.saves = []
+
+    def Run(self, steps, dt, metricsEvery=0, metricsOut=None, dumpEvery=0, dumpDir=None, log=None):
+        # 지표는 한 줄에 JSON 하나 (metricsOut 파일 객체), 덤프는 dumpDir/step_000000.npz 상태 파일
+        sim = self.simManager
+        if dumpEvery and dumpDir:
+            os.makedirs(dumpDir, exist_ok=True)
+        simTime = 0.0
+        for i in range(1,steps+1):
+            t0 = time.perf_counter()
+            sim.Update(dt)
+            simTime += time.perf_counter()-t0
+            # 헤드리스에서는 화면이 없으므로 바뀐 타일 기록을 바로 비운다
+            sim.pendingDirty[:] = False
+            if metricsEvery and metricsOut is not None and i % metricsEvery == 0:
+                m = CollectMetrics(sim)
+                m["stepsPerSecond"] = i/simTime if simTime>0 else 0.0
+                metricsOut.write(json.dumps(m)+"\n")
+                metricsOut.flush()
+            if dumpEvery and dumpDir and i % dumpEvery == 0:
+                self.saves.append(SaveState(sim, os.path.join(dumpDir, "step_%06d.npz" % sim.stepCount)))
+            if log is not None and i % max(1,steps//10) == 0:
+                log.write("step %d/%d  %.1f steps/s\n" % (i, steps, i/simTime if simTime>0 else 0.0))
+                log.flush()
+        self.elapsed += simTime
+        self.Flush()
+        return steps/simTime if simTime>0 else 0.0
+
+    def Flush(self):
+        # 백그라운드 저장이 끝날 때까지 대기
+        for thread in self.saves:
+            thread.join()
+        self.saves = []
+
+    def Close(self):
+        # 분산 모드 작업 프로세스 종료 (그리드는 일반 배열로 되돌린다)
+        self.Flush()
+        self.simManager.StopDistributed()
@@ -0,0 +1,41 @@
+from multiprocessing import shared_memory
+import numpy as np
+
+#--------------------------------------------
+# SharedArrays: 이름 있는 배열 묶음을 공유 메모리 블록 하나에 (프로세스 간 복사 없이 공유)
+#--------------------------------------------
+class SharedArrays:
+    def __init__(self, shm, layout, readonly=True):
+        self.shm = shm
+        self.layout = layout  # {이름: (dtype str, shape, offset)}
+        self.arrays = {}
+        for name,(dtype,shape,offset) in layout.items():
+            a = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+            a.flags.writeable = not readonly
+            self.arrays[name] = a
+
+    @classmethod
+    def Create(cls, arrays, readonly=True):
+        layout = {}
+        offset = 0
+        for name,a in arrays.items():
+            layout[name] = (a.dtype.str, a.shape, offset)
+            offset += -(-a.nbytes//64)*64
+        shm = shared_memory.SharedMemory(create=True, size=max(offset,1))
+        for name,a in arrays.items():
+            dtype,shape,off = layout[name]
+            np.ndarray(shape, dtype=a.dtype, buffer=shm.buf, offset=off)[...] = a
+        return cls(shm, layout, readonly)
+
+    @classmethod
+    def Attach(cls, name, layout, readonly=True):
+        return cls(shared_memory.SharedMemory(name=name), layout, readonly)
+
+    def Close(self, unlink=False):
+        self.arrays = {}
+        try:
+            self.shm.close()
+        except BufferError:
+            pass  # 아직 남은 뷰가 있으면 매핑은 그 뷰가 사라질 때 풀린다
+        if unlink:
+            self.shm.unlink()
@@ -0,0 +1,3090 @@
+import sys
+import time
+import math
+import random
+import json
+import threading
+import concurrent.futures
+from collections import deque
+import os
+import zlib
+import heapq
+import weakref
+import numpy as np
+from numba import njit, prange
+
+#--------------------------------------------
+# 전문적 material db 로딩: JSON 파일로부터
+#--------------------------------------------
+MATERIALS_JSON = """
+{
+  "materials": [
+    {
+      "name": "Water",
+      "density": 1000,
+      "specificHeat": 4184,
+      "thermalConductivity": 0.6,
+      "electricalConductivity": 0,
+      "meltingPoint": 0,
+      "boilingPoint": 100,
+      "latentHeatFusion": 334000,
+      "latentHeatVaporization": 2257000,
+      "color": [0.2,0.2,0.8]
+    },
+    {
+      "name": "Ethanol",
+      "density": 789,
+      "specificHeat": 2440,
+      "thermalConductivity": 0.17,
+      "electricalConductivity": 0,
+      "meltingPoint": -114,
+      "boilingPoint": 78,
+      "latentHeatFusion": 108000,
+      "latentHeatVaporization": 841000,
+      "color": [0.8,0.8,0.2]
+    },
+    {
+      "name": "NaCl",
+      "density": 2160,
+      "specificHeat": 850,
+      "thermalConductivity": 6.5,
+      "electricalConductivity": 0,
+      "meltingPoint": 801,
+      "boilingPoint": 1465,
+      "latentHeatFusion": 482000,
+      "latentHeatVaporization": 2910000,
+      "color": [0.9,0.9,0.9]
+    },
+    {
+      "name": "H2SO4",
+      "density": 1840,
+      "specificHeat": 1380,
+      "thermalConductivity": 0.5,
+      "electricalConductivity": 0,
+      "meltingPoint": -10,
+      "boilingPoint": 337,
+      "latentHeatFusion": 109000,
+      "latentHeatVaporization": 511000,
+      "color": [0.8,0.2,0.8]
+    },
+    {
+      "name": "NaOH",
+      "density": 2130,
+      "specificHeat": 1400,
+      "thermalConductivity": 0.2,
+      "electricalConductivity": 0,
+      "meltingPoint": 318,
+      "boilingPoint": 1390,
+      "latentHeatFusion": 165000,
+      "latentHeatVaporization": 4380000,
+      "color": [0.7,0.9,0.7]
+    },
+    {
+      "name": "Fe",
+      "density": 7874,
+      "specificHeat": 449,
+      "thermalConductivity": 80,
+      "electricalConductivity": 10,
+      "meltingPoint": 1538,
+      "boilingPoint": 2862,
+      "latentHeatFusion": 247000,
+      "latentHeatVaporization": 6088000,
+      "color": [0.5,0.5,0.5]
+    },
+    {
+      "name": "Cu",
+      "density": 8960,
+      "specificHeat": 385,
+      "thermalConductivity": 401,
+      "electricalConductivity": 59,
+      "meltingPoint": 1085,
+      "boilingPoint": 2562,
+      "latentHeatFusion": 209000,
+      "latentHeatVaporization": 4730000,
+      "color": [0.7,0.4,0.1]
+    },
+    {
+      "name": "Au",
+      "density": 19300,
+      "specificHeat": 129,
+      "thermalConductivity": 317,
+      "electricalConductivity": 44,
+      "meltingPoint": 1064,
+      "boilingPoint": 2970,
+      "latentHeatFusion": 64000,
+      "latentHeatVaporization": 1645000,
+      "color": [1.0,0.9,0.0]
+    },
+    {
+      "name": "SiO2",
+      "density": 2650,
+      "specificHeat": 700,
+      "thermalConductivity": 1.4,
+      "electricalConductivity": 0,
+      "meltingPoint": 1710,
+      "boilingPoint": 2230,
+      "latentHeatFusion": 156000,
+      "latentHeatVaporization": 11770000,
+      "color": [0.9,0.8,0.7]
+    },
+    {
+      "name": "CO2",
+      "density": 1.977,
+      "specificHeat": 844,
+      "thermalConductivity": 0.0146,
+      "electricalConductivity": 0,
+      "meltingPoint": -78.5,
+      "boilingPoint": -56.6,
+      "latentHeatFusion": 196000,
+      "latentHeatVaporization": 574000,
+      "color": [0.5,0.5,0.5]
+    },
+    {
+      "name": "O2",
+      "density": 1.429,
+      "specificHeat": 918,
+      "thermalConductivity": 0.026,
+      "electricalConductivity": 0,
+      "meltingPoint": -219,
+      "boilingPoint": -183,
+      "latentHeatFusion": 13900,
+      "latentHeatVaporization": 213000,
+      "color": [0.5,0.5,0.6]
+    },
+    {
+      "name": "N2",
+      "density": 1.2506,
+      "specificHeat": 1040,
+      "thermalConductivity": 0.026,
+      "electricalConductivity": 0,
+      "meltingPoint": -210,
+      "boilingPoint": -196,
+      "latentHeatFusion": 25700,
+      "latentHeatVaporization": 199000,
+      "color": [0.5,0.5,0.8]
+    },
+    {
+      "name": "HCl",
+      "density": 1.639,
+      "specificHeat": 1000,
+      "thermalConductivity": 0.010,
+      "electricalConductivity": 0,
+      "meltingPoint": -114,
+      "boilingPoint": -85,
+      "latentHeatFusion": 54600,
+      "latentHeatVaporization": 443000,
+      "color": [0.9,0.5,0.5]
+    },
+    {
+      "name": "CH4",
+      "density": 0.656,
+      "specificHeat": 2220,
+      "thermalConductivity": 0.03,
+      "electricalConductivity": 0,
+      "meltingPoint": -182.5,
+      "boilingPoint": -161.5,
+      "latentHeatFusion": 58700,
+      "latentHeatVaporization": 510000,
+      "color": [0.8,0.7,0.9]
+    }
+  ]
+}
+"""
+
+#--------------------------------------------
+# Core Classes: Material, MaterialDatabase
+#--------------------------------------------
+class Material:
+    def __init__(self, name, density, specificHeat, thermalConductivity, electricalConductivity,
+                 meltingPoint, boilingPoint, color, category=None, curves=None,
+                 latentHeatFusion=0.0, latentHeatVaporization=0.0):
+        self.name = name
+        self.density = density
+        self.specificHeat = specificHeat
+        self.thermalConductivity = thermalConductivity
+        self.electricalConductivity = electricalConductivity
+        self.meltingPoint = meltingPoint
+        self.boilingPoint = boilingPoint
+        self.color = color
+        self.category = category  # 물질 트리 분류 (없으면 물성으로 추정)
+        self.curves = curves or {}  # 물성 이름 → [[온도 °C, 값], ..] 구간 선형, 범위 밖은 끝값
+        self.latentHeatFusion = latentHeatFusion  # 녹음/얼음 잠열 [J/kg] (0이면 바로 상 변화)
+        self.latentHeatVaporization = latentHeatVaporization  # 끓음/응축 잠열 [J/kg]
+
+# 외부 물질 라이브러리: 경로별로 한 번만 파싱해서 (파일이 바뀌면 다시) 프로세스 안에서 공유
+MATERIAL_KEYS = ("name","density","specificHeat","thermalConductivity","electricalConductivity",
+                 "meltingPoint","boilingPoint","color")
+MATERIAL_DEFAULTS = {"electricalConductivity": 0, "color": [0.6,0.6,0.6]}
+LATENT_KEYS = ("latentHeatFusion","latentHeatVaporization")
+_libraryCache = {}
+
+def ReadMaterialLibrary(path):
+    # LoadFromJSON과 같은 형식의 파일 → 물질 항목(dict) 목록
+    path = os.path.realpath(path)
+    st = os.stat(path)
+    cached = _libraryCache.get(path)
+    if cached is not None and cached[0] == (st.st_mtime_ns, st.st_size):
+        return cached[1]
+    with open(path,"r",encoding="utf-8") as f:
+        entries = json.load(f)["materials"]
+    for entry in entries:
+        missing = [k for k in MATERIAL_KEYS if k not in entry and k not in MATERIAL_DEFAULTS]
+        if missing:
+            raise ValueError("material library %s: %s is missing %s" % (path, entry.get("name","?"), ", ".join(missing)))
+    _libraryCache[path] = ((st.st_mtime_ns, st.st_size), entries)
+    return entries
+
+def _MaterialFromEntry(entry):
+    values = [entry.get(k, MATERIAL_DEFAULTS.get(k)) for k in MATERIAL_KEYS]
+    return Material(*values, category=entry.get("category"), curves=entry.get("properties"),
+                    **{k: entry.get(k,0.0) for k in LATENT_KEYS})
+
+class MaterialDatabase:
+    def __init__(self):
+        self.materials = []
+        self.nameToID = {}
+        self._tables = {}
+        self._curves = {}
+        self._json = None
+        self.version = 0  # 물질 목록/물성이 바뀔 때마다 증가 (캐시 무효화용)
+        self._lock = threading.RLock()  # 목록 교체와 version 증가를 한 번에 (GUI 스레드는 Snapshot으로 읽음)
+
+    def LoadFromJSON(self, json_str):
+        data = json.loads(json_str)
+        loaded = [_MaterialFromEntry(mat) for mat in data["materials"]]
+        with self._lock:
+            self.materials.clear()
+            self.nameToID.clear()
+            for i, m in enumerate(loaded):
+                self.materials.append(m)
+                self.nameToID[m.name] = i
+            self.Invalidate()
+
+    def LoadLibrary(self, path):
+        # 외부 라이브러리 추가. 이미 있는 이름은 그 자리(같은 matID)에서 덮어쓴다
+        # 전부 읽고 개수를 확인한 뒤에 바꾼다 (실패하면 DB는 그대로)
+        loaded = [_MaterialFromEntry(entry) for entry in ReadMaterialLibrary(path)]
+        added = {m.name for m in loaded if m.name not in self.nameToID}
+        if len(self.materials)+len(added) > 0x7FFF:
+            raise ValueError("too many materials (%d), matID is int16" % (len(self.materials)+len(added)))
+        with self._lock:
+            for m in loaded:
+                i = self.nameToID.get(m.name)
+                if i is None:
+                    self.nameToID[m.name] = len(self.materials)
+                    self.materials.append(m)
+                else:
+                    self.materials[i] = m
+            self.Invalidate()
+
+    def Invalidate(self):
+        # 컴파일된 물성 배열을 버린다. 스크립트가 Material 값을 직접 고친 뒤에도 호출
+        with self._lock:
+            self._tables.clear()
+            self._curves.clear()
+            self._json = None
+            self.version += 1
+
+    def Snapshot(self):
+        # (version, 물질 목록 복사본). 시뮬레이션 스레드가 LoadLibrary 중이어도 둘이 어긋나지 않음
+        with self._lock:
+            return self.version, list(self.materials)
+
+    def ToJSON(self):
+        # LoadFromJSON과 같은 형식 (버전별로 캐시)
+        if self._json is None:
+            out = []
+            for m in self.materials:
+                entry = {k: getattr(m,k) for k in MATERIAL_KEYS+LATENT_KEYS}
+                if m.category is not None:
+                    entry["category"] = m.category
+                if m.curves:
+                    entry["properties"] = m.curves
+                out.append(entry)
+            self._json = json.dumps({"materials": out}, indent=2)
+        return self._json
+
+    def GetMaterial(self, id):
+        return self.materials[id]
+
+    def GetPropertyTable(self, attr):
+        # matID로 바로 인덱싱할 수 있는 물성 배열 (솔버용)
+        table = self._tables.get(attr)
+        if table is None:
+            table = np.array([getattr(m, attr) for m in self.materials], dtype=np.float64)
+            self._tables[attr] = table
+        return table
+
+    def SetPropertyTables(self, tables):
+        # {속성: 배열}을 GetPropertyTable 결과로 쓴다 (공유 메모리 배열을 복사 없이 넘길 때)
+        # 현재 materials 순서와 맞아야 함. 다음 Invalidate(라이브러리 추가 등)에서 버려지고 다시 만들어진다
+        self._tables.update(tables)
+
+    def GetPropertyCurves(self, attr):
+        # 온도 곡선 배열 (knotT, knotV, counts): [matID, k] 끝을 끝값으로 채운 2차원, 곡선 없는 물질은 counts 0
+        # 어느 물질에도 곡선이 없으면 None
+        if attr not in self._curves:
+            curves = [m.curves.get(attr) for m in self.materials]
+            K = max([len(c) for c in curves if c] or [0])
+            result = None
+            if K:
+                n = len(self.materials)
+                knotT = np.zeros((n,K))
+                knotV = np.zeros((n,K))
+                counts = np.zeros(n, dtype=np.int32)
+                for i,c in enumerate(curves):
+                    if c:
+                        pts = np.array(sorted(c), dtype=np.float64)
+                        counts[i] = len(pts)
+                        knotT[i,:len(pts)], knotV[i,:len(pts)] = pts[:,0], pts[:,1]
+                        knotT[i,len(pts):], knotV[i,len(pts):] = pts[-1,0], pts[-1,1]
+                result = (knotT, knotV, counts)
+            self._curves[attr] = result
+        return self._curves[attr]
+
+    def EvaluateProperty(self, attr, mat, T, out=None):
+        # 셀별 물성 필드 (mat, T 같은 모양). 곡선이 없으면 상수 테이블 조회
+        base = self.GetPropertyTable(attr)
+        curves = self.GetPropertyCurves(attr)
+        if curves is None:
+            return np.take(base, mat, out=out)
+        if out is None:
+            out = np.empty(mat.shape, dtype=np.float64)
+        _propertyCurveKernel(mat, T, base, curves[0], curves[1], curves[2], out)
+        return out
+
+#--------------------------------------------
+# Reaction
+#--------------------------------------------
+class Reaction:
+    def __init__(self, r1, r2, products, A, Ea, deltaH):
+        self.reactant1 = r1
+        self.reactant2 = r2
+        self.products = products
+        self.A = A
+        self.Ea = Ea
+        self.deltaH = deltaH
+
+class ReactionDatabase:
+    def __init__(self):
+        self.reactionMap = {}
+        self.reactions = []
+        self._pairTable = None
+
+    def Clear(self):
+        self.reactionMap.clear()
+        self.reactions.clear()
+        self._pairTable = None
+
+    def AddReaction(self, r):
+        self.reactions.append(r)
+        self._pairTable = None
+        for k in [r.reactant1,r.reactant2]:
+            if k not in self.reactionMap:
+                self.reactionMap[k] = []
+            self.reactionMap[k].append(r)
+
+    def GetReactionsFor(self, matID):
+        return self.reactionMap.get(matID, [])
+
+    def GetPairTable(self, numMaterials):
+        # [matID1, matID2] -> self.reactions 인덱스 (-1: 반응 없음), 대칭
+        # 같은 쌍에 반응이 여러 개면 먼저 등록된 것이 쓰인다
+        table = self._pairTable
+        if table is None or table.shape[0] != numMaterials:
+            table = np.full((numMaterials,numMaterials), -1, dtype=np.int32)
+            for i in range(len(self.reactions)-1,-1,-1):
+                r = self.reactions[i]
+                table[r.reactant1,r.reactant2] = i
+                table[r.reactant2,r.reactant1] = i
+            self._pairTable = table
+        return table
+
+    def GetParameterArrays(self):
+        # 반응 인덱스로 조회하는 (A, Ea, deltaH, 생성물) 배열. 스크립트가 값을 바꿀 수 있으므로 매번 생성
+        A = np.array([r.A for r in self.reactions], dtype=np.float64)
+        Ea = np.array([r.Ea for r in self.reactions], dtype=np.float64)
+        dH = np.array([r.deltaH for r in self.reactions], dtype=np.float64)
+        product = np.array([r.products[0] if r.products else -1 for r in self.reactions], dtype=np.int32)
+        return A, Ea, dH, product
+
+#--------------------------------------------
+# Tools
+#--------------------------------------------
+class Tool:
+    # heatRate: (보통, 전문가 모드) 사각형 안 온도 변화율 [°C/s]
+    # apply를 재정의하지 않은 툴은 ToolIndex가 모아서 한 번에 적용한다
+    heatRate = (0.0, 0.0)
+
+    def __init__(self, name, x,y,w,h):
+        self.name = name
+        self.x = x
+        self.y = y
+        self.w = w
+        self.h = h
+
+    def Clip(self, width, height):
+        # 격자 안으로 자른 반열린 사각형 (x0,y0,x1,y1), 겹치지 않으면 None
+        x0, y0 = max(0,self.x), max(0,self.y)
+        x1, y1 = min(width,self.x+self.w), min(height,self.y+self.h)
+        return (x0,y0,x1,y1) if x0<x1 and y0<y1 else None
+
+    def apply(self, grid, matDB, dt, expertMode):
+        rate = self.heatRate[1 if expertMode else 0]
+        r = self.Clip(grid.width, grid.height)
+        if rate and r is not None:
+            x0,y0,x1,y1 = r
+            grid.temperature[y0:y1,x0:x1] += rate*dt
+            grid.activity.Wake(x0,y0,x1,y1)
+
+class Beaker(Tool):
+    # 벽효과, 외부 셀과 교환금지 등
+    pass
+
+class Heater(Tool):
+    heatRate = (10.0, 20.0)
+
+class Cooler(Tool):
+    heatRate = (-5.0, -10.0)
+
+class ToolIndex:
+    # 툴 사각형의 타일 버킷 색인 + 열 툴 묶음
+    #  - 버킷: 타일 (ty,tx) → 그 타일과 겹치는 툴 번호. Query는 영역이 걸친 타일의 버킷만 본다
+    #  - 묶음: apply를 재정의하지 않은 툴들의 heatRate를 셀별로 합산한 (셀 인덱스, 변화율) 배열.
+    #    스텝마다 팬시 인덱싱 한 번이라 비용이 툴 수/격자 크기가 아니라 영향받는 셀 수에 비례
+    # 툴 목록이나 위치/크기가 바뀌면 (Sync의 서명 비교) 다시 만든다
+    def __init__(self):
+        self.index = ([], {}, 16)  # (툴 목록, 버킷, 타일 크기)
+        self.custom = []
+        self.ys = self.xs = np.zeros(0, dtype=np.int64)
+        self.rates = (np.zeros(0), np.zeros(0))
+        self.tiles = np.zeros((0,2), dtype=np.int64)
+        self._signature = None
+
+    def Sync(self, tools, grid):
+        ts = grid.activity.tileSize
+        signature = (grid.width, grid.height, ts, tuple((id(t),t.x,t.y,t.w,t.h,t.heatRate) for t in tools))
+        if signature != self._signature:
+            self._signature = signature
+            self.Build(list(tools), grid.width, grid.height, ts)
+
+    def Build(self, tools, width, height, ts):
+        buckets = {}
+        custom = []
+        cellChunks, rateChunks = [], ([],[])
+        for i,tool in enumerate(tools):
+            r = tool.Clip(width, height)
+            if type(tool).apply is not Tool.apply:
+                custom.append(tool)
+            if r is None:
+                continue
+            x0,y0,x1,y1 = r
+            for ty in range(y0//ts,(y1-1)//ts+1):
+                for tx in range(x0//ts,(x1-1)//ts+1):
+                    buckets.setdefault((ty,tx),[]).append(i)
+            if type(tool).apply is Tool.apply and any(tool.heatRate):
+                ys, xs = np.mgrid[y0:y1,x0:x1]
+                cells = (ys*width+xs).ravel()
+                cellChunks.append(cells)
+                for k in range(2):
+                    rateChunks[k].append(np.full(len(cells), float(tool.heatRate[k])))
+        if cellChunks:
+            # 겹친 사각형은 변화율을 더한다
+            cells, inverse = np.unique(np.concatenate(cellChunks), return_inverse=True)
+            rates = tuple(np.bincount(inverse, weights=np.concatenate(rateChunks[k]), minlength=len(cells))
+                          for k in range(2))
+            ys, xs = cells//width, cells%width
+            tiles = np.unique(np.stack([ys//ts, xs//ts], axis=1), axis=0)
+        else:
+            ys = xs = np.zeros(0, dtype=np.int64)
+            rates, tiles = (np.zeros(0),np.zeros(0)), np.zeros((0,2), dtype=np.int64)
+        # 한꺼번에 바꿔서 GUI 스레드의 Query가 반쯤 만든 색인을 보지 않게
+        self.index = (tools, buckets, ts)
+        self.custom = custom
+        self.ys, self.xs, self.rates, self.tiles = ys, xs, rates, tiles
+
+    def Query(self, x0, y0, x1, y1):
+        # 셀 사각형 [x0,x1) x [y0,y1)과 겹치는 툴 목록
+        tools, buckets, ts = self.index
+        found = set()
+        for ty in range(max(0,y0)//ts,(y1-1)//ts+1):
+            for tx in range(max(0,x0)//ts,(x1-1)//ts+1):
+                found.update(buckets.get((ty,tx),()))
+        return [t for t in (tools[i] for i in sorted(found))
+                if t.x < x1 and x0 < t.x+t.w and t.y < y1 and y0 < t.y+t.h]
+
+    def Apply(self, grid, matDB, dt, expertMode):
+        if len(self.ys):
+            grid.temperature[self.ys,self.xs] += self.rates[1 if expertMode else 0]*dt
+            grid.activity.WakeTiles(self.tiles)
+        for tool in self.custom:
+            tool.apply(grid, matDB, dt, expertMode)
+
+#--------------------------------------------
+# Cell, CellGrid
+#--------------------------------------------
+# flags 배열 비트 구성: 하위 비트는 상태 플래그, 상위 16비트는 스포너 물질 ID
+FLAG_REACTED = 0x1
+FLAG_SPAWNER = 0x2
+# 상(phase): 2비트. 0은 아직 정해지지 않음 (물질이 바뀐 칸, 다음 상 변화 단계가 온도로 정한다)
+PHASE_SHIFT = 2
+PHASE_MASK = 0x3 << PHASE_SHIFT
+PHASE_UNSET, PHASE_SOLID, PHASE_LIQUID, PHASE_GAS = 0, 1, 2, 3
+PHASE_NAMES = ("unset","solid","liquid","gas")
+NO_PHASE_BITS = np.uint32(~PHASE_MASK & 0xFFFFFFFF)
+SPAWN_SHIFT = 16
+SPAWN_MASK = 0xFFFF << SPAWN_SHIFT
+# 스포너 비트는 셀 내용이 아니라 위치에 붙어 있다 (셀 교환 때 제자리에 남음)
+CELL_BITS = np.uint32(~(FLAG_SPAWNER | SPAWN_MASK) & 0xFFFFFFFF)
+
+class Cell:
+    # CellGrid 배열의 한 칸을 가리키는 뷰 (스크립트 호환용)
+    # 옛 생성자 Cell(matID=0, temperature=20.0, pressure=101325.0)도 받는다: 1x1 그리드 하나를 가진 독립 셀
+    __slots__ = ("grid","x","y")
+
+    def __init__(self, *args, **kwargs):
+        if args and isinstance(args[0], CellGrid):
+            self.grid, self.x, self.y = args
+        else:
+            self.grid, self.x, self.y = Cell._StandaloneGrid(*args, **kwargs), 0, 0
+
+    @staticmethod
+    def _StandaloneGrid(matID=0, temperature=20.0, pressure=101325.0):
+        grid = CellGrid(1, 1)
+        grid.materialID[0,0] = matID
+        grid.temperature[0,0] = temperature
+        grid.pressure[0,0] = pressure
+        return grid
+
+    def _Touch(self):
+        # 값을 쓰면 그 칸의 타일을 깨운다 (잠든 타일은 솔버가 건너뛰므로)
+        self.grid.activity.Wake(self.x, self.y, self.x+1, self.y+1)
+
+    @property
+    def materialID(self):
+        return int(self.grid.materialID[self.y,self.x])
+    @materialID.setter
+    def materialID(self, v):
+        self.grid.materialID[self.y,self.x] = v
+        self.grid.ResetPhase((self.y,self.x))
+        self._Touch()
+
+    @property
+    def phase(self):
+        return PHASE_NAMES[(int(self.grid.flags[self.y,self.x]) & PHASE_MASK) >> PHASE_SHIFT]
+
+    @property
+    def temperature(self):
+        return float(self.grid.temperature[self.y,self.x])
+    @temperature.setter
+    def temperature(self, v):
+        self.grid.temperature[self.y,self.x] = v
+        self._Touch()
+
+    @property
+    def pressure(self):
+        return float(self.grid.pressure[self.y,self.x])
+    @pressure.setter
+    def pressure(self, v):
+        self.grid.pressure[self.y,self.x] = v
+        self._Touch()
+
+    @property
+    def velocityX(self):
+        return float(self.grid.velocityX[self.y,self.x])
+    @velocityX.setter
+    def velocityX(self, v):
+        self.grid.velocityX[self.y,self.x] = v
+        self._Touch()
+
+    @property
+    def velocityY(self):
+        return float(self.grid.velocityY[self.y,self.x])
+    @velocityY.setter
+    def velocityY(self, v):
+        self.grid.velocityY[self.y,self.x] = v
+        self._Touch()
+
+    def _getFlag(self, bit):
+        return bool(self.grid.flags[self.y,self.x] & bit)
+    def _setFlag(self, bit, on):
+        if on:
+            self.grid.flags[self.y,self.x] |= bit
+        else:
+            self.grid.flags[self.y,self.x] &= ~np.uint32(bit)
+        self._Touch()
+
+    @property
+    def recentlyReacted(self):
+        return self._getFlag(FLAG_REACTED)
+    @recentlyReacted.setter
+    def recentlyReacted(self, v):
+        self._setFlag(FLAG_REACTED, v)
+
+    @property
+    def isSpawner(self):
+        return self._getFlag(FLAG_SPAWNER)
+    @isSpawner.setter
+    def isSpawner(self, v):
+        self._setFlag(FLAG_SPAWNER, v)
+        self.grid.InvalidateSpawners()
+
+    @property
+    def spawnMaterialID(self):
+        return int(self.grid.flags[self.y,self.x] >> SPAWN_SHIFT)
+    @spawnMaterialID.setter
+    def spawnMaterialID(self, v):
+        f = int(self.grid.flags[self.y,self.x]) & ~SPAWN_MASK
+        self.grid.flags[self.y,self.x] = f | ((int(v) << SPAWN_SHIFT) & SPAWN_MASK)
+        self._Touch()
+        self.grid.InvalidateSpawners()
+
+class ActivityMap:
+    # 고정 크기 타일별 활성 상태. 변화가 없는 스텝이 이어지면 타일이 잠들고 솔버는 건너뛴다
+    # 한 스텝 동안 처리하는 타일(process) = 활성 타일을 한 타일 팽창 (스텐실/이웃 경계용)
+    def __init__(self, width, height, tileSize=16):
+        self.width = width
+        self.height = height
+        self.tileSize = tileSize
+        self.tilesY = -(-height//tileSize)
+        self.tilesX = -(-width//tileSize)
+        shape = (self.tilesY,self.tilesX)
+        self.enabled = True
+        self.quiet = np.zeros(shape, dtype=np.int32)
+        self.active = np.ones(shape, dtype=bool)
+        self.touched = np.zeros(shape, dtype=bool)
+        self.process = np.ones(shape, dtype=bool)
+        self.processList = np.argwhere(self.process)
+        self.stencil = self.process
+        self.stencilList = self.processList
+        self._cellMask = None
+
+    def Wake(self, x0, y0, x1, y1):
+        # 셀 좌표 반열린 사각형 [x0,x1) x [y0,y1)
+        x0, y0 = max(0,x0), max(0,y0)
+        x1, y1 = min(self.width,x1), min(self.height,y1)
+        if x0<x1 and y0<y1:
+            ts = self.tileSize
+            self.touched[y0//ts:(y1-1)//ts+1, x0//ts:(x1-1)//ts+1] = True
+
+    def WakeCells(self, ys, xs):
+        self.touched[ys//self.tileSize, xs//self.tileSize] = True
+
+    def WakeTiles(self, tiles):
+        # tiles: (n,2) 타일 좌표 배열
+        self.touched[tiles[:,0],tiles[:,1]] = True
+
+    def WakeAll(self):
+        self.touched[:] = True
+
+    def BeginStep(self):
+        if self.enabled:
+            a = self.active | self.touched
+            p = a.copy()
+            p[1:,:] |= a[:-1,:]
+            p[:-1,:] |= a[1:,:]
+            q = p.copy()
+            q[:,1:] |= p[:,:-1]
+            q[:,:-1] |= p[:,1:]
+            self.process = q
+        else:
+            self.process = np.ones_like(self.active)
+        self.processList = np.argwhere(self.process)
+        self.stencil = self.process
+        self.stencilList = self.processList
+        self._cellMask = None
+
+    def Collapse(self, uniform):
+        # 균일 블록(BlockMap) 타일은 스텐실 단계(반응 계면 찾기, 명시적 열)에서 뺀다
+        # 정렬은 한 스텝에 셀을 여러 칸 옮길 수 있어 한 칸 테두리 검사로 보장되지 않으므로 그대로 돈다
+        self.stencil = self.process & ~uniform
+        self.stencilList = np.argwhere(self.stencil)
+
+    def EndStep(self, sleepSteps):
+        self.quiet += 1
+        self.quiet[self.touched] = 0
+        self.active = self.quiet < sleepSteps
+        self.touched[:] = False
+
+    def CellMask(self):
+        # 처리 대상 타일을 셀 단위 불리언 배열로 (스텝마다 한 번 생성)
+        if self._cellMask is None:
+            ts = self.tileSize
+            m = np.repeat(np.repeat(self.process,ts,axis=0),ts,axis=1)
+            self._cellMask = m[:self.height,:self.width]
+        return self._cellMask
+
+    def WakeChanged(self, old, new, threshold, allTiles=False):
+        # 값 변화가 threshold를 넘은 타일을 깨운다 (기본: 스텐실 타일만 검사, 전역 솔버는 allTiles)
+        tiles = np.argwhere(np.ones_like(self.active)) if allTiles else self.stencilList
+        delta = _tileMaxAbsDiff(old, new, tiles, self.tileSize)
+        self.WakeTiles(tiles[delta>threshold])
+
+#--------------------------------------------
+# BlockMap: 균일한 영역을 4분 트리 블록으로 (adaptiveBlocks)
+#--------------------------------------------
+# 타일과 한 칸 테두리가 모두 같은 물질/플래그이고 온도 폭이 blockTolerance 이하, 타일 안 속도가 0이며
+# 그 물질끼리의 반응이 없으면 그 타일은 균일하다. 같은 물질에 평균 온도 차가 허용치 이하인 균일 2x2 블록은
+# 위 단계 블록 하나로 합친다 (k단계 블록 = 2^k x 2^k 타일)
+# 블록은 온도 값 하나만 들고 한 덩어리로 갱신된다: 열 단계에서 블록 바깥 이웃과의 9점 스텐실 플럭스를
+# 테두리 셀에서만 모아 (블록 안쪽 쌍은 같은 값이라 0) 블록 온도를 한 번에 바꾸고, 셀 배열에 다시 채운다
+# 그래서 허용치 이하의 작은 기울기도 블록 사이에서 계속 풀린다
+# 스텝마다 처리 타일을 다시 검사해서 블록을 새로 묶는다: 물질이 섞이거나 기울기가 생기거나 칠한 곳은
+# 바로 세분되고 (불균일 타일은 첫 다른 칸에서 검사를 멈춰 싸다), 새로 묶인 블록은 셀 온도를 평균 값으로
+# 맞춘다 (같은 물질이라 열량 보존). 잠든 타일은 블록에 들지 않는다
+# 셀 필드 배열은 렌더링/스크립트/저장이 읽는 논리 격자로 전체 해상도 그대로 남는다
+class BlockMap:
+    def __init__(self, activity):
+        shape = (activity.tilesY,activity.tilesX)
+        self.tileSize = activity.tileSize
+        self.uniform = np.zeros(shape, dtype=np.bool_)
+        self.material = np.full(shape, -1, dtype=np.int32)
+        self.mean = np.zeros(shape, dtype=np.float64)
+        ts = activity.tileSize
+        rows = np.minimum(ts, activity.height-np.arange(shape[0])*ts)
+        cols = np.minimum(ts, activity.width-np.arange(shape[1])*ts)
+        self.cells = rows[:,None]*cols[None,:]  # 타일별 셀 수 (가장자리 타일은 잘림)
+        self.owner = np.full(shape, -1, dtype=np.int32)  # 타일이 든 블록 번호
+        # 블록 목록: (왼쪽 위 타일 y, x, 단계), 블록 온도
+        self.blocks = np.zeros((0,3), dtype=np.int64)
+        self.blockT = np.zeros(0, dtype=np.float64)
+        self._nextT = None
+        self.tolerance = 0.0
+        self.table = None
+        self.collapsedTiles = 0  # 이번 스텝 처리 타일 중 블록에 든 수
+
+    def Update(self, grid, tolerance, table):
+        # BeginStep 뒤, 솔버 전에 호출. table: 반응 쌍 표 (같은 물질끼리 반응하면 묶지 않는다)
+        act = grid.activity
+        self.tolerance = tolerance
+        self.table = table
+        _uniformTilesKernel(grid.materialID, grid.temperature, grid.flags, grid.velocityX, grid.velocityY,
+                            table, act.processList, act.tileSize, float(tolerance),
+                            self.uniform, self.material, self.mean)
+        self.Build(grid)
+
+    def Refresh(self, grid):
+        # 스텝 도중(단계 사이) 이웃 타일이 바뀌었으면 (touched) 그 옆 균일 타일만 다시 검사하고 다시 묶는다
+        act = grid.activity
+        t = act.touched
+        near = t.copy()
+        near[1:,:] |= t[:-1,:]
+        near[:-1,:] |= t[1:,:]
+        t = near.copy()
+        near[:,1:] |= t[:,:-1]
+        near[:,:-1] |= t[:,1:]
+        tiles = np.argwhere(act.process & self.uniform & near)
+        if len(tiles) == 0:
+            return
+        _uniformTilesKernel(grid.materialID, grid.temperature, grid.flags, grid.velocityX, grid.velocityY,
+                            self.table, tiles, act.tileSize, float(self.tolerance),
+                            self.uniform, self.material, self.mean)
+        self.Build(grid)
+
+    def Build(self, grid):
+        # 처리 타일 중 균일 타일을 아래 단계부터 2x2씩 합치고, 큰 블록부터 겹치지 않게 고른다
+        act = grid.activity
+        u = self.uniform & act.process
+        m = np.where(u, self.material, -1)
+        n = np.where(u, self.cells, 0)
+        heat = np.where(u, self.mean*self.cells, 0.0)
+        lo = hi = np.where(u, self.mean, 0.0)
+        levels = [u]
+        while min(u.shape) > 1:
+            ny, nx = u.shape[0]//2, u.shape[1]//2
+            def Quad(a):
+                return a[:ny*2,:nx*2].reshape(ny,2,nx,2)
+            qm = Quad(m)
+            lo = Quad(lo).min(axis=(1,3))
+            hi = Quad(hi).max(axis=(1,3))
+            u = Quad(u).all(axis=(1,3)) & (qm == qm[:,:1,:,:1]).all(axis=(1,3)) & (hi-lo <= self.tolerance)
+            if not u.any():
+                break
+            m = np.where(u, qm[:,0,:,0], -1)
+            levels.append(u)
+        # 큰 블록부터: 이미 덮인 타일은 건너뛴다
+        owner = np.full(self.owner.shape, -1, dtype=np.int32)
+        blocks = []
+        for k in range(len(levels)-1,-1,-1):
+            size = 1 << k
+            for by,bx in np.argwhere(levels[k]).tolist():
+                ty, tx = by*size, bx*size
+                if owner[ty,tx] < 0:
+                    owner[ty:ty+size,tx:tx+size] = len(blocks)
+                    blocks.append((ty,tx,k))
+        self.owner = owner
+        self.blocks = np.array(blocks, dtype=np.int64).reshape(-1,3)
+        covered = owner >= 0
+        idx = owner[covered]
+        count = np.bincount(idx, weights=n[covered], minlength=len(blocks))
+        total = np.bincount(idx, weights=heat[covered], minlength=len(blocks))
+        self.blockT = total/np.maximum(count,1)
+        # 합친 블록은 셀 온도를 블록 값으로 맞춘다 (평균이라 열량 보존)
+        _fillBlocks(grid.temperature, self.blocks, self.blockT, self.tileSize)
+        self.mean[covered] = self.blockT[idx]
+        act.Collapse(covered)
+        self.collapsedTiles = int(np.count_nonzero(covered))
+
+    def Diffuse(self, mat, T, condLUT):
+        # 열 단계 계산 (셀 커널과 같은 옛 온도 기준): 블록마다 바깥 이웃과의 플럭스로 새 블록 온도
+        if self._nextT is None or len(self._nextT) != len(self.blockT):
+            self._nextT = np.empty_like(self.blockT)
+        _blockFluxKernel(mat, T, condLUT, self.blocks, self.blockT, self.tileSize, self._nextT)
+
+    def Commit(self, grid, threshold):
+        # 새 블록 온도를 셀 배열에 채우고, threshold를 넘게 바뀐 블록의 타일을 깨운다
+        if self._nextT is None or len(self._nextT) != len(self.blockT):
+            return
+        changed = np.abs(self._nextT-self.blockT) > threshold
+        self.blockT, self._nextT = self._nextT, self.blockT
+        _fillBlocks(grid.temperature, self.blocks, self.blockT, self.tileSize)
+        covered = self.owner >= 0
+        self.mean[covered] = self.blockT[self.owner[covered]]
+        if changed.any():
+            grid.activity.WakeTiles(np.argwhere(np.isin(self.owner, np.nonzero(changed)[0])))
+
+class CellGrid:
+    # 필드별 2차원 배열 (struct-of-arrays), 인덱스는 [y,x]
+    FIELDS = ("materialID","temperature","pressure","velocityX","velocityY","flags","latent")
+
+    def __init__(self, width, height, tileSize=16, fields=None):
+        self.width = width
+        self.height = height
+        self.activity = ActivityMap(width, height, tileSize)
+        # 스포너 목록: (y,x) → 물질 ID. flags의 스포너 비트가 원본이고 처음 쓸 때 한 번 찾는다
+        self._spawners = None
+        self._spawnerArrays = None
+        self.spawnCredit = 0.0
+        self.originY = 0  # 전체 격자에서 첫 행의 위치 (분산 모드 띠 그리드만 0이 아니다)
+        shape = (height,width)
+        if fields is not None:
+            # 이미 있는 배열(불러온 상태, memmap)을 그대로 사용
+            for name in self.FIELDS:
+                if fields[name].shape != shape:
+                    raise ValueError("field %s has shape %s, expected %s" % (name, fields[name].shape, shape))
+                setattr(self, name, fields[name])
+            return
+        self.materialID = np.zeros(shape, dtype=np.int16)
+        self.temperature = np.full(shape, 20.0, dtype=np.float64)
+        self.pressure = np.full(shape, 101325.0, dtype=np.float32)
+        self.velocityX = np.zeros(shape, dtype=np.float32)
+        self.velocityY = np.zeros(shape, dtype=np.float32)
+        self.flags = np.zeros(shape, dtype=np.uint32)
+        self.latent = np.zeros(shape, dtype=np.float32)  # 상 변화 중 쌓인 잠열 [J/kg] (+녹음/끓음, -얼음/응축)
+
+    @property
+    def cells(self):
+        # 구 API 호환: 행 우선 순서의 Cell 뷰 목록
+        return [Cell(self, i % self.width, i // self.width) for i in range(self.width*self.height)]
+
+    def GetCell(self,x,y):
+        return Cell(self,x,y)
+
+    def InBounds(self,x,y):
+        return 0<=x<self.width and 0<=y<self.height
+
+    def SetSpawner(self,x,y,matID):
+        if self.InBounds(x,y):
+            f = int(self.flags[y,x]) & ~SPAWN_MASK
+            self.flags[y,x] = f | FLAG_SPAWNER | ((matID << SPAWN_SHIFT) & SPAWN_MASK)
+            self.Spawners()[(y,x)] = matID
+            self._spawnerArrays = None
+            self.activity.Wake(x,y,x+1,y+1)
+
+    def RemoveSpawner(self,x,y):
+        if self.InBounds(x,y):
+            self.flags[y,x] &= np.uint32(~(FLAG_SPAWNER | SPAWN_MASK) & 0xFFFFFFFF)
+            self.Spawners().pop((y,x),None)
+            self._spawnerArrays = None
+
+    def Spawners(self):
+        if self._spawners is None:
+            ys, xs = np.nonzero(self.flags & FLAG_SPAWNER)
+            ids = (self.flags[ys,xs] >> SPAWN_SHIFT).tolist()
+            self._spawners = dict(zip(zip(ys.tolist(),xs.tolist()),ids))
+            self._spawnerArrays = None
+        return self._spawners
+
+    def InvalidateSpawners(self):
+        # flags를 직접 고친 뒤 (타임라인 탐색, Cell 속성) 다음에 쓸 때 다시 찾게
+        self._spawners = None
+
+    def SpawnerArrays(self):
+        spawners = self.Spawners()
+        if self._spawnerArrays is None:
+            yx = np.array(list(spawners), dtype=np.int64).reshape(-1,2)
+            self._spawnerArrays = (yx[:,0].copy(), yx[:,1].copy(), np.array(list(spawners.values()), dtype=np.int16))
+        return self._spawnerArrays
+
+    def UpdateSpawners(self, spawnRate):
+        # spawnRate: 스텝당 방출 비율 (1 = 매 스텝, 0.25 = 네 스텝에 한 번). 한 스텝에 최대 한 번
+        self.spawnCredit += spawnRate
+        if self.spawnCredit < 1.0:
+            return
+        self.spawnCredit -= math.floor(self.spawnCredit)
+        ys, xs, spawnID = self.SpawnerArrays()
+        if not len(ys):
+            return
+        ts = self.activity.tileSize
+        keep = self.activity.process[ys//ts, xs//ts]
+        ys, xs, spawnID = ys[keep], xs[keep], spawnID[keep]
+        changed = (self.materialID[ys,xs] != spawnID) | (self.temperature[ys,xs] != 20.0)
+        if changed.any():
+            self.activity.WakeCells(ys[changed], xs[changed])
+        self.materialID[ys,xs] = spawnID
+        self.temperature[ys,xs] = 20.0
+        self.ResetPhase((ys,xs))
+
+    def AddMaterial(self,x,y,matID,brushSize=1):
+        x0, x1 = max(0,x-brushSize), min(self.width,x+brushSize+1)
+        y0, y1 = max(0,y-brushSize), min(self.height,y+brushSize+1)
+        if x0<x1 and y0<y1:
+            self.materialID[y0:y1,x0:x1] = matID
+            self.temperature[y0:y1,x0:x1] = 20.0
+            self.ResetPhase((slice(y0,y1),slice(x0,x1)))
+            self.activity.Wake(x0,y0,x1,y1)
+
+    def ResetPhase(self, index):
+        # 물질이 바뀐 칸: 상을 미정으로, 쌓인 잠열은 버린다 (index는 배열 인덱스)
+        self.flags[index] &= NO_PHASE_BITS
+        self.latent[index] = 0.0
+
+#--------------------------------------------
+# Brush strokes: 마우스 샘플을 모아 스텝 경계에서 한 번에 칠한다
+#--------------------------------------------
+# 샘플 사이 선분을 이어 칠해서 빠르게 그어도 끊기지 않는다
+# 스텝마다 그 사이에 들어온 선분들을 마스크 하나로 래스터화해 필드마다 배열 대입 한 번으로 적용
+# 바뀐 셀의 원래 값은 획 단위로 모아 되돌리기 항목 하나가 된다
+BRUSH_SHAPES = ("square","circle")
+
+def StrokeMask(points, radius, shape, width, height):
+    # 꺾은선 points [(x,y),..]를 반지름 radius 붓으로 칠한 영역 (x0, y0, mask). 격자 밖이면 None
+    #  square: 선분 위 정수 점마다 (2r+1)² 사각형 (AddMaterial과 같은 붓)
+    #  circle: 선분까지 거리가 r 이하인 셀 (캡슐)
+    pts = np.asarray(points, dtype=np.float64).reshape(-1,2)
+    x0 = max(0, int(pts[:,0].min())-radius)
+    y0 = max(0, int(pts[:,1].min())-radius)
+    x1 = min(width, int(pts[:,0].max())+radius+1)
+    y1 = min(height, int(pts[:,1].max())+radius+1)
+    if x0>=x1 or y0>=y1:
+        return None
+    mask = np.zeros((y1-y0,x1-x0), dtype=bool)
+    segments = list(zip(pts[:-1],pts[1:])) if len(pts)>1 else [(pts[0],pts[0])]
+    if shape == "circle":
+        r2 = (radius+0.5)**2
+        for a,b in segments:
+            # 선분 하나의 바운딩 박스 안에서만 계산
+            sx0, sy0 = max(x0,int(min(a[0],b[0]))-radius), max(y0,int(min(a[1],b[1]))-radius)
+            sx1, sy1 = min(x1,int(max(a[0],b[0]))+radius+1), min(y1,int(max(a[1],b[1]))+radius+1)
+            if sx0>=sx1 or sy0>=sy1:
+                continue
+            ys, xs = np.mgrid[sy0:sy1,sx0:sx1]
+            d = b-a
+            L2 = float(d @ d)
+            t = np.clip(((xs-a[0])*d[0]+(ys-a[1])*d[1])/L2, 0.0, 1.0) if L2>0 else 0.0
+            dist2 = (xs-(a[0]+t*d[0]))**2+(ys-(a[1]+t*d[1]))**2
+            mask[sy0-y0:sy1-y0,sx0-x0:sx1-x0] |= dist2 <= r2
+    elif shape == "square":
+        # 선분을 한 칸 간격 점으로 찍고 (DDA) 가로/세로로 따로 팽창 (사각형 팽창은 분리 가능)
+        centers = []
+        for a,b in segments:
+            n = int(max(abs(b[0]-a[0]),abs(b[1]-a[1])))+1
+            t = np.linspace(0.0,1.0,n)
+            centers.append(np.rint(a+(b-a)*t[:,None]).astype(np.int64))
+        c = np.concatenate(centers)
+        H, W = y1-y0+2*radius, x1-x0+2*radius
+        seeds = np.zeros((H,W), dtype=bool)
+        cy, cx = c[:,1]-y0+radius, c[:,0]-x0+radius
+        inside = (cy>=0)&(cy<H)&(cx>=0)&(cx<W)
+        seeds[cy[inside],cx[inside]] = True
+        for axis in (0,1):
+            cs = np.cumsum(seeds, axis=axis, dtype=np.int32)
+            cs = np.concatenate([np.zeros_like(cs.take([0],axis=axis)), cs], axis=axis)
+            n = seeds.shape[axis]
+            hi = np.minimum(np.arange(n)+radius+1, n)
+            lo = np.maximum(np.arange(n)-radius, 0)
+            seeds = (cs.take(hi,axis=axis)-cs.take(lo,axis=axis)) > 0
+        mask = seeds[radius:radius+y1-y0, radius:radius+x1-x0]
+    else:
+        raise ValueError("unknown brush shape: %s" % shape)
+    return x0, y0, mask
+
+class Stroke:
+    # 한 번 누르고 뗄 때까지의 붓질. 샘플 추가/래스터화는 모두 시뮬레이션 쪽에서 (Post로)
+    def __init__(self, matID, radius, shape="square", temperature=20.0):
+        self.matID = matID
+        self.radius = radius
+        self.shape = shape
+        self.temperature = temperature
+        self.points = []
+        self.drawn = 0  # 이미 칠한 샘플 수
+        self.finished = False
+        self.undo = []  # (ys, xs, 원래 materialID, temperature, flags, latent) 칠한 순서대로
+
+    def AddPoint(self, x, y):
+        self.points.append((x,y))
+
+    def Rasterize(self, grid):
+        # 지난번 마지막 샘플부터 새 샘플까지의 선분을 한 마스크로 칠한다
+        if len(self.points) <= self.drawn:
+            return
+        points = self.points[max(0,self.drawn-1):]
+        self.drawn = len(self.points)
+        r = StrokeMask(points, self.radius, self.shape, grid.width, grid.height)
+        if r is None:
+            return
+        x0, y0, mask = r
+        h, w = mask.shape
+        mat = grid.materialID[y0:y0+h,x0:x0+w]
+        T = grid.temperature[y0:y0+h,x0:x0+w]
+        changed = mask & ((mat != self.matID) | (T != self.temperature))
+        ys, xs = np.nonzero(changed)
+        if not len(ys):
+            return
+        ys, xs = ys+y0, xs+x0
+        self.undo.append((ys, xs, grid.materialID[ys,xs], grid.temperature[ys,xs], grid.flags[ys,xs], grid.latent[ys,xs]))
+        mat[mask] = self.matID
+        T[mask] = self.temperature
+        grid.ResetPhase((ys,xs))
+        grid.activity.WakeCells(ys, xs)
+
+    def Undo(self, grid):
+        # 나중에 칠한 것부터 되돌려 같은 셀을 여러 번 칠했어도 획 이전 값이 남는다
+        for ys, xs, mat, T, flags, latent in reversed(self.undo):
+            grid.materialID[ys,xs] = mat
+            grid.temperature[ys,xs] = T
+            grid.flags[ys,xs] = (grid.flags[ys,xs] & ~CELL_BITS) | (flags & CELL_BITS)  # 스포너 비트는 그대로
+            grid.latent[ys,xs] = latent
+            grid.activity.WakeCells(ys, xs)
+        self.undo = []
+
+#--------------------------------------------
+# Compiled kernels (numba)
+#--------------------------------------------
+@njit(parallel=True, nogil=True, cache=True)
+def _propertyCurveKernel(mat, T, base, knotT, knotV, counts, out):
+    # 셀별 물성: 곡선이 있는 물질은 온도로 구간 선형 보간 (범위 밖은 끝값), 없으면 상수
+    h,w = mat.shape
+    for y in prange(h):
+        for x in range(w):
+            m = mat[y,x]
+            n = counts[m]
+            if n == 0:
+                out[y,x] = base[m]
+                continue
+            t = T[y,x]
+            if t <= knotT[m,0]:
+                out[y,x] = knotV[m,0]
+            elif t >= knotT[m,n-1]:
+                out[y,x] = knotV[m,n-1]
+            else:
+                lo, hi = 0, n-1
+                while hi-lo > 1:
+                    mid = (lo+hi)//2
+                    if knotT[m,mid] <= t:
+                        lo = mid
+                    else:
+                        hi = mid
+                f = (t-knotT[m,lo])/(knotT[m,hi]-knotT[m,lo])
+                out[y,x] = knotV[m,lo]+f*(knotV[m,hi]-knotV[m,lo])
+
+@njit(nogil=True, cache=True)
+def _diffusePoint(mat, T, condLUT, x, y):
+    # (x,y) 한 칸의 전도율 가중 9점 평균
+    h,w = T.shape
+    kc = condLUT[mat[y,x]]
+    Tsum = 0.0
+    weightSum = 0.0
+    for dy in range(-1,2):
+        for dx in range(-1,2):
+            nx, ny = x+dx, y+dy
+            if 0<=nx<w and 0<=ny<h:
+                cond = (kc+condLUT[mat[ny,nx]])*0.5
+                Tsum += T[ny,nx]*cond
+                weightSum += cond
+    if weightSum>0:
+        return Tsum/weightSum
+    return T[y,x]
+
+@njit(parallel=True, nogil=True, cache=True)
+def _thermalKernel(mat, T, vx, vy, condLUT, dt, speed, tiles, ts, out):
+    # 확산 + 대류 융합: 대류 원점 칸의 확산 값을 바로 계산해서 가져온다. tiles에 든 타일만 계산
+    h,w = T.shape
+    for i in prange(len(tiles)):
+        y0, x0 = tiles[i,0]*ts, tiles[i,1]*ts
+        for y in range(y0,min(h,y0+ts)):
+            for x in range(x0,min(w,x0+ts)):
+                sxf = np.rint(x - vx[y,x]*dt*speed)
+                syf = np.rint(y - vy[y,x]*dt*speed)
+                if 0<=sxf<w and 0<=syf<h:
+                    out[y,x] = _diffusePoint(mat, T, condLUT, int(sxf), int(syf))
+                else:
+                    out[y,x] = _diffusePoint(mat, T, condLUT, x, y)
+
+@njit(parallel=True, nogil=True, cache=True)
+def _tileMaxAbsDiff(a, b, tiles, ts):
+    h,w = a.shape
+    out = np.zeros(len(tiles))
+    for i in prange(len(tiles)):
+        y0, x0 = tiles[i,0]*ts, tiles[i,1]*ts
+        m = 0.0
+        for y in range(y0,min(h,y0+ts)):
+            for x in range(x0,min(w,x0+ts)):
+                d = abs(b[y,x]-a[y,x])
+                if d>m:
+                    m = d
+        out[i] = m
+    return out
+
+@njit(parallel=True, nogil=True, cache=True)
+def _copyTiles(src, dst, tiles, ts):
+    h,w = src.shape
+    for i in prange(len(tiles)):
+        y0, x0 = tiles[i,0]*ts, tiles[i,1]*ts
+        for y in range(y0,min(h,y0+ts)):
+            for x in range(x0,min(w,x0+ts)):
+                dst[y,x] = src[y,x]
+
+@njit(parallel=True, nogil=True, cache=True)
+def _advectKernel(T, vx, vy, dt, speed, out):
+    # 반 라그랑지안 대류 (최근접 원점 칸)
+    h,w = T.shape
+    for y in prange(h):
+        for x in range(w):
+            sxf = np.rint(x - vx[y,x]*dt*speed)
+            syf = np.rint(y - vy[y,x]*dt*speed)
+            if 0<=sxf<w and 0<=syf<h:
+                out[y,x] = T[int(syf),int(sxf)]
+            else:
+                out[y,x] = T[y,x]
+
+@njit(parallel=True, nogil=True, cache=True)
+def _implicitApply(a, kx, ky, X, out):
+    # out = (a + L_k) X, L_k는 면 전도도(kx: 좌우, ky: 상하)로 만든 단열 경계 라플라시안
+    h,w = X.shape
+    for y in prange(h):
+        for x in range(w):
+            xc = X[y,x]
+            v = a[y,x]*xc
+            if x>0:
+                v += kx[y,x-1]*(xc-X[y,x-1])
+            if x<w-1:
+                v += kx[y,x]*(xc-X[y,x+1])
+            if y>0:
+                v += ky[y-1,x]*(xc-X[y-1,x])
+            if y<h-1:
+                v += ky[y,x]*(xc-X[y+1,x])
+            out[y,x] = v
+
+@njit(parallel=True, nogil=True, cache=True)
+def _jacobiStep(a, kx, ky, diag, X, B, omega, out):
+    # 가중 야코비 한 번: out = X + omega*(B - A X)/diag
+    h,w = X.shape
+    for y in prange(h):
+        for x in range(w):
+            xc = X[y,x]
+            v = a[y,x]*xc
+            if x>0:
+                v += kx[y,x-1]*(xc-X[y,x-1])
+            if x<w-1:
+                v += kx[y,x]*(xc-X[y,x+1])
+            if y>0:
+                v += ky[y-1,x]*(xc-X[y-1,x])
+            if y<h-1:
+                v += ky[y,x]*(xc-X[y+1,x])
+            out[y,x] = xc + omega*(B[y,x]-v)/diag[y,x]
+
+@njit(nogil=True, cache=True)
+def _coarsenOperator(a, kx, ky):
+    # 2x2 집적의 갈레르킨 조대화: 내부 면은 상쇄되고 경계를 넘는 면만 합산
+    h,w = a.shape
+    hc, wc = (h+1)//2, (w+1)//2
+    ac = np.zeros((hc,wc))
+    kxc = np.zeros((hc,wc-1))
+    kyc = np.zeros((hc-1,wc))
+    for y in range(h):
+        for x in range(w):
+            ac[y//2,x//2] += a[y,x]
+            if x<w-1 and (x & 1):
+                kxc[y//2,x//2] += kx[y,x]
+            if y<h-1 and (y & 1):
+                kyc[y//2,x//2] += ky[y,x]
+    return ac, kxc, kyc
+
+@njit(nogil=True, cache=True)
+def _restrictSum(r, out):
+    out[:] = 0.0
+    h,w = r.shape
+    for y in range(h):
+        for x in range(w):
+            out[y//2,x//2] += r[y,x]
+
+@njit(parallel=True, nogil=True, cache=True)
+def _prolongAdd(ec, X):
+    h,w = X.shape
+    for y in prange(h):
+        for x in range(w):
+            X[y,x] += ec[y//2,x//2]
+
+class MultigridPCG:
+    # (a + L_k) x = b 꼴의 대칭 양정치 5점 시스템용 켤레기울기법
+    # 전처리: 집적 멀티그리드 V-사이클 (앞뒤 같은 횟수의 가중 야코비 → 대칭 유지)
+    def __init__(self, smoothSteps=2, omega=0.8, coarsestSize=4, coarsestSteps=30):
+        self.smoothSteps = smoothSteps
+        self.omega = omega
+        self.coarsestSize = coarsestSize
+        self.coarsestSteps = coarsestSteps
+        self.levels = []
+        self.lastIterations = 0
+
+    def Setup(self, a, kx, ky):
+        self.levels = []
+        while True:
+            diag = a.copy()
+            diag[:,:-1] += kx
+            diag[:,1:] += kx
+            diag[:-1,:] += ky
+            diag[1:,:] += ky
+            # 레벨별 작업 버퍼: tmp, res, 조대 격자용 B/X
+            self.levels.append((a,kx,ky,diag)+tuple(np.empty_like(a) for i in range(4)))
+            if min(a.shape) <= self.coarsestSize:
+                break
+            a,kx,ky = _coarsenOperator(a,kx,ky)
+
+    def VCycle(self, level, B, X):
+        a,kx,ky,diag,tmp,res = self.levels[level][:6]
+        last = level == len(self.levels)-1
+        steps = self.coarsestSteps if last else self.smoothSteps
+        # 0에서 시작하는 첫 야코비는 바로 계산
+        np.multiply(B, self.omega/diag, out=X)
+        for i in range(steps-1):
+            _jacobiStep(a,kx,ky,diag,X,B,self.omega,tmp)
+            X[:] = tmp
+        if last:
+            return
+        _implicitApply(a,kx,ky,X,res)
+        np.subtract(B,res,out=res)
+        Bc, Xc = self.levels[level+1][6:8]
+        _restrictSum(res,Bc)
+        self.VCycle(level+1,Bc,Xc)
+        _prolongAdd(Xc,X)
+        for i in range(steps):
+            _jacobiStep(a,kx,ky,diag,X,B,self.omega,tmp)
+            X[:] = tmp
+
+    def Solve(self, B, X, tol, maxIterations):
+        # X는 초기값(웜 스타트)이자 결과, 반환값은 반복 횟수
+        a,kx,ky = self.levels[0][:3]
+        Ap = np.empty_like(X)
+        z = np.empty_like(X)
+        _implicitApply(a,kx,ky,X,Ap)
+        r = B - Ap
+        threshold = tol*np.linalg.norm(B)
+        it = 0
+        if np.linalg.norm(r) > threshold:
+            self.VCycle(0,r,z)
+            p = z.copy()
+            rz = np.vdot(r,z)
+            while it < maxIterations:
+                _implicitApply(a,kx,ky,p,Ap)
+                alpha = rz/np.vdot(p,Ap)
+                X += alpha*p
+                r -= alpha*Ap
+                it += 1
+                if np.linalg.norm(r) <= threshold:
+                    break
+                self.VCycle(0,r,z)
+                rzNew = np.vdot(r,z)
+                p *= rzNew/rz
+                p += z
+                rz = rzNew
+        self.lastIterations = it
+        return it
+
+@njit(parallel=True, nogil=True, cache=True)
+def _findInterfacesKernel(mat, table, tiles, ts):
+    # 타일별 개수 세기 → 누적합 → 병렬 채우기. 같은 c1의 오른쪽 쌍이 아래 쌍 바로 앞에 온다
+    h,w = mat.shape
+    counts = np.zeros(len(tiles)+1, dtype=np.int64)
+    for i in prange(len(tiles)):
+        y0, x0 = tiles[i,0]*ts, tiles[i,1]*ts
+        n = 0
+        for y in range(y0,min(h,y0+ts)):
+            for x in range(x0,min(w,x0+ts)):
+                m = mat[y,x]
+                if x<w-1 and table[m,mat[y,x+1]]>=0:
+                    n += 1
+                if y<h-1 and table[m,mat[y+1,x]]>=0:
+                    n += 1
+        counts[i+1] = n
+    offsets = np.cumsum(counts)
+    total = offsets[len(tiles)]
+    ys = np.empty(total, dtype=np.int64)
+    xs = np.empty(total, dtype=np.int64)
+    ys2 = np.empty(total, dtype=np.int64)
+    xs2 = np.empty(total, dtype=np.int64)
+    rxIdx = np.empty(total, dtype=np.int32)
+    for i in prange(len(tiles)):
+        y0, x0 = tiles[i,0]*ts, tiles[i,1]*ts
+        k = offsets[i]
+        for y in range(y0,min(h,y0+ts)):
+            for x in range(x0,min(w,x0+ts)):
+                m = mat[y,x]
+                if x<w-1:
+                    r = table[m,mat[y,x+1]]
+                    if r>=0:
+                        ys[k] = y; xs[k] = x; ys2[k] = y; xs2[k] = x+1; rxIdx[k] = r
+                        k += 1
+                if y<h-1:
+                    r = table[m,mat[y+1,x]]
+                    if r>=0:
+                        ys[k] = y; xs[k] = x; ys2[k] = y+1; xs2[k] = x; rxIdx[k] = r
+                        k += 1
+    return ys, xs, ys2, xs2, rxIdx
+
+@njit(parallel=True, nogil=True, cache=True)
+def _uniformTilesKernel(mat, T, flags, vx, vy, table, tiles, ts, tolerance, uniform, material, mean):
+    # 타일 + 한 칸 테두리 검사 (BlockMap). 다른 칸을 만나면 바로 멈춘다. 균일 타일은 물질과 타일 평균 온도도
+    h,w = mat.shape
+    for i in prange(len(tiles)):
+        ty, tx = tiles[i,0], tiles[i,1]
+        y0, x0 = ty*ts, tx*ts
+        y1, x1 = min(h,y0+ts), min(w,x0+ts)
+        m = mat[y0,x0]
+        f = flags[y0,x0]
+        lo = T[y0,x0]
+        hi = lo
+        total = 0.0
+        # 같은 물질끼리 반응하면 균일해도 계면이 있다
+        ok = table[m,m] < 0
+        for y in range(max(0,y0-1),min(h,y1+1)):
+            if not ok:
+                break
+            for x in range(max(0,x0-1),min(w,x1+1)):
+                t = T[y,x]
+                lo = min(lo,t)
+                hi = max(hi,t)
+                if mat[y,x] != m or flags[y,x] != f or hi-lo > tolerance:
+                    ok = False
+                    break
+                if y0<=y<y1 and x0<=x<x1:
+                    if vx[y,x] != 0.0 or vy[y,x] != 0.0:
+                        ok = False
+                        break
+                    total += t
+        uniform[ty,tx] = ok
+        material[ty,tx] = m if ok else -1
+        mean[ty,tx] = total/((y1-y0)*(x1-x0)) if ok else 0.0
+
+@njit(parallel=True, nogil=True, cache=True)
+def _fillBlocks(T, blocks, blockT, ts):
+    h,w = T.shape
+    for b in prange(len(blocks)):
+        size = ts << blocks[b,2]
+        y0, x0 = blocks[b,0]*ts, blocks[b,1]*ts
+        v = blockT[b]
+        for y in range(y0,min(h,y0+size)):
+            for x in range(x0,min(w,x0+size)):
+                T[y,x] = v
+
+@njit(parallel=True, nogil=True, cache=True)
+def _blockFluxKernel(mat, T, condLUT, blocks, blockT, ts, out):
+    # 블록 테두리 셀마다 _diffusePoint와 같은 가중치로 바깥 이웃 쪽 변화만 더한다 (안쪽 이웃은 같은 값)
+    h,w = T.shape
+    for b in prange(len(blocks)):
+        size = ts << blocks[b,2]
+        y0, x0 = blocks[b,0]*ts, blocks[b,1]*ts
+        y1, x1 = min(h,y0+size), min(w,x0+size)
+        Tb = blockT[b]
+        delta = 0.0
+        for y in range(y0,y1):
+            edgeRow = y == y0 or y == y1-1
+            x = x0
+            while x < x1:
+                kc = condLUT[mat[y,x]]
+                flux = 0.0
+                weightSum = 0.0
+                for dy in range(-1,2):
+                    for dx in range(-1,2):
+                        nx, ny = x+dx, y+dy
+                        if 0<=nx<w and 0<=ny<h:
+                            cond = (kc+condLUT[mat[ny,nx]])*0.5
+                            weightSum += cond
+                            if not (y0<=ny<y1 and x0<=nx<x1):
+                                flux += (T[ny,nx]-Tb)*cond
+                if weightSum>0:
+                    delta += flux/weightSum
+                # 가운데 행은 양 끝 칸만
+                x = x+1 if edgeRow or x == x1-1 else x1-1
+        out[b] = Tb + delta/((y1-y0)*(x1-x0))
+
+# Philox4x32-10 카운터 기반 난수: (seed, step, 키, lane) → [0,1) 실수 하나
+# 상태가 없어서 어느 스레드/프로세스가 어떤 순서로 뽑아도 같은 키에는 같은 값이 나온다
+# 카운터 = (키 하위 32비트, 키 상위 32비트, step, lane), 열쇠 = seed 64비트
+PHILOX_M0, PHILOX_M1 = 0xD2511F53, 0xCD9E8D57
+PHILOX_W0, PHILOX_W1 = 0x9E3779B9, 0xBB67AE85
+PHILOX_ROUNDS = 10
+
+@njit(parallel=True, nogil=True, cache=True)
+def _philoxKernel(keys, k0, k1, step, lane, out):
+    mask = np.uint64(0xFFFFFFFF)
+    s32 = np.uint64(32)
+    m0 = np.uint64(PHILOX_M0)
+    m1 = np.uint64(PHILOX_M1)
+    w0 = np.uint64(PHILOX_W0)
+    w1 = np.uint64(PHILOX_W1)
+    for i in prange(len(keys)):
+        key = np.uint64(keys[i])
+        c0 = key & mask
+        c1 = key >> s32
+        c2 = step & mask
+        c3 = lane & mask
+        a = k0
+        b = k1
+        for r in range(PHILOX_ROUNDS):
+            p0 = m0*c0
+            p1 = m1*c2
+            c0, c1, c2, c3 = ((p1 >> s32) ^ c1 ^ a) & mask, p1 & mask, ((p0 >> s32) ^ c3 ^ b) & mask, p0 & mask
+            a = (a+w0) & mask
+            b = (b+w1) & mask
+        out[i] = ((c0 >> np.uint64(5))*67108864.0+(c1 >> np.uint64(6)))*(1.0/9007199254740992.0)
+
+def PhiloxUniform(seed, step, keys, lane=0, parallel=True):
+    # parallel: numba 병렬 커널, 아니면 numpy 벡터 연산. 두 경로는 비트 단위로 같은 값을 낸다
+    seed = int(seed) & 0xFFFFFFFFFFFFFFFF
+    keys = np.ascontiguousarray(keys, dtype=np.int64)
+    k0, k1 = np.uint64(seed & 0xFFFFFFFF), np.uint64(seed >> 32)
+    if parallel:
+        out = np.empty(len(keys), dtype=np.float64)
+        _philoxKernel(keys, k0, k1, np.uint64(step), np.uint64(lane), out)
+        return out
+    mask = np.uint64(0xFFFFFFFF)
+    s32 = np.uint64(32)
+    u = keys.view(np.uint64)
+    c0, c1 = u & mask, u >> s32
+    c2 = np.full(len(keys), np.uint64(int(step) & 0xFFFFFFFF), dtype=np.uint64)
+    c3 = np.full(len(keys), np.uint64(int(lane) & 0xFFFFFFFF), dtype=np.uint64)
+    for r in range(PHILOX_ROUNDS):
+        p0 = np.uint64(PHILOX_M0)*c0
+        p1 = np.uint64(PHILOX_M1)*c2
+        c0, c1, c2, c3 = ((p1 >> s32) ^ c1 ^ k0) & mask, p1 & mask, ((p0 >> s32) ^ c3 ^ k1) & mask, p0 & mask
+        k0 = np.uint64((int(k0)+PHILOX_W0) & 0xFFFFFFFF)
+        k1 = np.uint64((int(k1)+PHILOX_W1) & 0xFFFFFFFF)
+    return ((c0 >> np.uint64(5))*67108864.0+(c1 >> np.uint64(6)))*(1.0/9007199254740992.0)
+
+@njit(nogil=True, cache=True)
+def _swapCells(mat, temp, pres, vx, vy, flags, latent, y1, x1, y2, x2):
+    mat[y1,x1], mat[y2,x2] = mat[y2,x2], mat[y1,x1]
+    temp[y1,x1], temp[y2,x2] = temp[y2,x2], temp[y1,x1]
+    pres[y1,x1], pres[y2,x2] = pres[y2,x2], pres[y1,x1]
+    vx[y1,x1], vx[y2,x2] = vx[y2,x2], vx[y1,x1]
+    vy[y1,x1], vy[y2,x2] = vy[y2,x2], vy[y1,x1]
+    latent[y1,x1], latent[y2,x2] = latent[y2,x2], latent[y1,x1]
+    f1, f2 = flags[y1,x1], flags[y2,x2]
+    flags[y1,x1] = (f1 & ~CELL_BITS) | (f2 & CELL_BITS)
+    flags[y2,x2] = (f2 & ~CELL_BITS) | (f1 & CELL_BITS)
+
+@njit(nogil=True, cache=True)
+def _cellPhase(flags, y, x):
+    return (flags[y,x] >> PHASE_SHIFT) & 3
+
+@njit(parallel=True, nogil=True, cache=True)
+def _settlePhase(mat, temp, pres, vx, vy, flags, latent, density, fluid, proc, ts, touched, phase, iteration):
+    # 행 쌍 (y, y+1), y = 2p+phase 를 스레드 하나가 맡는다. 같은 위상의 쌍끼리는 겹치지 않아 경쟁 없음
+    # 1) 무거운 칸은 아래로 2) 유체는 대각선 아래로 3) 떨어질 수 없는 유체는 옆으로 퍼짐
+    # density/fluid는 [물질, 상] 테이블 (상 변화 단계가 정한 셀별 상으로 조회)
+    h,w = mat.shape
+    npairs = (h-phase)//2
+    moved = np.zeros(npairs, dtype=np.int64)
+    for p in prange(npairs):
+        y = 2*p+phase
+        ty0, ty1 = y//ts, (y+1)//ts
+        # 방향 치우침을 없애려고 스캔 방향을 행/반복마다 번갈아 바꾼다
+        step = 1 if ((iteration+p) & 1)==0 else -1
+        x = 0 if step==1 else w-1
+        n = 0
+        while 0<=x<w:
+            tx = x//ts
+            nextX = x+step
+            if proc[ty0,tx] and proc[ty1,tx]:
+                m = mat[y,x]
+                ph = _cellPhase(flags,y,x)
+                d = density[m,ph]
+                if d > density[mat[y+1,x],_cellPhase(flags,y+1,x)]:
+                    _swapCells(mat,temp,pres,vx,vy,flags,latent,y,x,y+1,x)
+                    touched[ty0,tx] = True
+                    touched[ty1,tx] = True
+                    n += 1
+                elif fluid[m,ph]:
+                    for k in range(2):
+                        nx = x+step if k==0 else x-step
+                        if 0<=nx<w and proc[ty0,nx//ts] and proc[ty1,nx//ts]:
+                            dSide = density[mat[y,nx],_cellPhase(flags,y,nx)]
+                            if d > density[mat[y+1,nx],_cellPhase(flags,y+1,nx)] and d > dSide:
+                                _swapCells(mat,temp,pres,vx,vy,flags,latent,y,x,y+1,nx)
+                            elif d > dSide and fluid[mat[y,nx],_cellPhase(flags,y,nx)]:
+                                _swapCells(mat,temp,pres,vx,vy,flags,latent,y,x,y,nx)
+                            else:
+                                continue
+                            touched[ty0,tx] = True
+                            touched[ty1,nx//ts] = True
+                            touched[ty0,nx//ts] = True
+                            n += 1
+                            # 스캔 방향으로 옮겨 간 칸을 같은 패스에서 또 옮기지 않도록 건너뜀
+                            if nx == x+step:
+                                nextX = x+2*step
+                            break
+            x = nextX
+        moved[p] = n
+    return moved.sum()
+
+@njit(parallel=True, nogil=True, cache=True)
+def _advectVelocityKernel(vx, vy, solid, dt, outX, outY):
+    # 반 라그랑지안 속도 대류 (쌍선형 보간, 역추적 지점은 격자 안으로 제한)
+    h,w = vx.shape
+    for y in prange(h):
+        for x in range(w):
+            if solid[y,x]:
+                outX[y,x] = 0.0
+                outY[y,x] = 0.0
+                continue
+            px = min(max(x - vx[y,x]*dt, 0.0), w-1.0)
+            py = min(max(y - vy[y,x]*dt, 0.0), h-1.0)
+            x0 = min(int(px), w-2) if w>1 else 0
+            y0 = min(int(py), h-2) if h>1 else 0
+            x1 = min(x0+1, w-1)
+            y1 = min(y0+1, h-1)
+            fx = px-x0
+            fy = py-y0
+            outX[y,x] = ((vx[y0,x0]*(1-fx)+vx[y0,x1]*fx)*(1-fy) + (vx[y1,x0]*(1-fx)+vx[y1,x1]*fx)*fy)
+            outY[y,x] = ((vy[y0,x0]*(1-fx)+vy[y0,x1]*fx)*(1-fy) + (vy[y1,x0]*(1-fx)+vy[y1,x1]*fx)*fy)
+
+@njit(parallel=True, nogil=True, cache=True)
+def _buoyancyKernel(rho, solid, g, dt, vy):
+    # 주변 3x3 유체 평균 밀도 대비 앳우드 수로 부력 가속도를 준다 (밀도 차가 커도 |a| <= g)
+    h,w = rho.shape
+    for y in prange(h):
+        for x in range(w):
+            if solid[y,x]:
+                continue
+            s = 0.0
+            n = 0
+            for dy in range(-1,2):
+                for dx in range(-1,2):
+                    nx, ny = x+dx, y+dy
+                    if 0<=nx<w and 0<=ny<h and not solid[ny,nx]:
+                        s += rho[ny,nx]
+                        n += 1
+            mean = s/n
+            r = rho[y,x]
+            vy[y,x] += g*dt*(r-mean)/(r+mean)
+
+@njit(parallel=True, nogil=True, cache=True)
+def _divergenceKernel(vx, vy, kx, ky, out):
+    # 면 속도 = 양쪽 셀 평균 (닫힌 면은 kx/ky = 0), 바깥 방향 플럭스 합
+    h,w = vx.shape
+    for y in prange(h):
+        for x in range(w):
+            d = 0.0
+            if x<w-1:
+                d += kx[y,x]*(vx[y,x]+vx[y,x+1])*0.5
+            if x>0:
+                d -= kx[y,x-1]*(vx[y,x-1]+vx[y,x])*0.5
+            if y<h-1:
+                d += ky[y,x]*(vy[y,x]+vy[y+1,x])*0.5
+            if y>0:
+                d -= ky[y-1,x]*(vy[y-1,x]+vy[y,x])*0.5
+            out[y,x] = d
+
+@njit(parallel=True, nogil=True, cache=True)
+def _subtractGradientKernel(vx, vy, p, kx, ky):
+    # 셀 중심 속도에서 열린 면 압력 기울기의 평균을 뺀다
+    h,w = vx.shape
+    for y in prange(h):
+        for x in range(w):
+            gx = 0.0
+            gy = 0.0
+            if x<w-1:
+                gx += kx[y,x]*(p[y,x+1]-p[y,x])
+            if x>0:
+                gx += kx[y,x-1]*(p[y,x]-p[y,x-1])
+            if y<h-1:
+                gy += ky[y,x]*(p[y+1,x]-p[y,x])
+            if y>0:
+                gy += ky[y-1,x]*(p[y,x]-p[y-1,x])
+            vx[y,x] -= 0.5*gx
+            vy[y,x] -= 0.5*gy
+
+@njit(parallel=True, nogil=True, cache=True)
+def _quantizeDeltaKernel(T, invQuantum, qT, dq):
+    # qT(양자화 온도)를 T로 갱신하고 변화량을 dq에, 바뀐 셀 수 반환
+    h,w = T.shape
+    counts = np.zeros(h, dtype=np.int64)
+    for y in prange(h):
+        c = 0
+        for x in range(w):
+            q = np.int64(math.floor(T[y,x]*invQuantum+0.5))
+            d = q-qT[y,x]
+            dq[y,x] = d
+            if d != 0:
+                qT[y,x] = q
+                c += 1
+        counts[y] = c
+    return counts.sum()
+
+@njit(parallel=True, nogil=True, cache=True)
+def _phaseKernel(mat, T, latent, flags, melt, boil, cp, Lf, Lv, tiles, ts, threshold, touched):
+    # 엔탈피 방식 상 변화. 전이 온도를 넘은 현열은 latent로 옮기고 온도는 전이 온도에 고정,
+    # latent가 잠열을 채우면 상이 바뀌고 남은 열은 다시 온도로. 반대 방향(얼음/응축)은 음수로 쌓인다
+    # 상이 미정인 칸은 온도로 상을 정한다. 반환: 타일별 상이 바뀐 칸 수
+    h,w = T.shape
+    changed = np.zeros(len(tiles), dtype=np.int64)
+    for i in prange(len(tiles)):
+        y0, x0 = tiles[i,0]*ts, tiles[i,1]*ts
+        n = 0
+        wake = False
+        for y in range(y0,min(h,y0+ts)):
+            for x in range(x0,min(w,x0+ts)):
+                m = mat[y,x]
+                t = T[y,x]
+                tm = melt[m]
+                tb = max(boil[m], tm)
+                p = (flags[y,x] >> PHASE_SHIFT) & 3
+                L = np.float64(latent[y,x])
+                if p == PHASE_UNSET:
+                    p = PHASE_SOLID if t < tm else (PHASE_LIQUID if t < tb else PHASE_GAS)
+                    L = 0.0
+                    wake = True
+                c = max(cp[m], 1e-9)
+                newP = p
+                newT = t
+                if p < PHASE_GAS and (L > 0.0 or t > (tm if p == PHASE_SOLID else tb)):
+                    hi = tm if p == PHASE_SOLID else tb
+                    Lup = Lf[m] if p == PHASE_SOLID else Lv[m]
+                    L += (t-hi)*c
+                    newT = hi
+                    if L >= Lup:
+                        newP = p+1
+                        newT = hi+(L-Lup)/c
+                        L = 0.0
+                    elif L < 0.0:
+                        newT = hi+L/c
+                        L = 0.0
+                elif p > PHASE_SOLID and (L < 0.0 or t < (tm if p == PHASE_LIQUID else tb)):
+                    lo = tm if p == PHASE_LIQUID else tb
+                    Ldown = Lf[m] if p == PHASE_LIQUID else Lv[m]
+                    L += (t-lo)*c
+                    newT = lo
+                    if L <= -Ldown:
+                        newP = p-1
+                        newT = lo+(L+Ldown)/c
+                        L = 0.0
+                    elif L > 0.0:
+                        newT = lo+L/c
+                        L = 0.0
+                if newP != p:
+                    n += 1
+                    wake = True
+                if abs(newT-t) > threshold:
+                    wake = True
+                T[y,x] = newT
+                latent[y,x] = L
+                flags[y,x] = (flags[y,x] & NO_PHASE_BITS) | (np.uint32(newP) << PHASE_SHIFT)
+        changed[i] = n
+        if wake:
+            touched[tiles[i,0],tiles[i,1]] = True
+    return changed
+
+#--------------------------------------------
+# Engines: ReactionEngine, FluidSolver, ThermalSolver, PhaseSolver
+#--------------------------------------------
+ARRHENIUS_BIN = 0.1  # exp(-Ea/RT) 표의 온도 구간 [K]
+ARRHENIUS_TMAX = 6000.0  # 이보다 뜨거우면 마지막 구간 값
+
+class ReactionClock:
+    # 사건 기반 반응 표본(reactionSampling="event")의 격자별 상태
+    # 계면 id = c1 셀 인덱스*2 + (0 오른쪽, 1 아래)
+    # fireAt: 다음 반응 시각 [s], rate: 그 시각을 정할 때 쓴 반응률 [1/s]
+    # tileNext: 타일 안 계면 중 가장 이른 시각. heap에는 (시각, ty, tx)가 늦게 무효화되는 방식으로 쌓인다
+    def __init__(self, grid):
+        n = grid.width*grid.height*2
+        act = grid.activity
+        self.time = 0.0
+        self.fireAt = np.full(n, np.inf)
+        self.rate = np.zeros(n)
+        self.tileNext = np.full((act.tilesY,act.tilesX), np.inf)
+        self.heap = []
+
+    def Schedule(self, act, ys, xs, fireAt):
+        # 계면을 찾은 타일의 가장 이른 예정 시각을 갱신. 값이 바뀐 타일은 새 시각으로 힙에 넣는다
+        # (옛 항목은 꺼낼 때 tileNext와 다르면 버린다)
+        pt = act.stencilList
+        ts = act.tileSize
+        old = self.tileNext[pt[:,0],pt[:,1]]
+        self.tileNext[pt[:,0],pt[:,1]] = np.inf
+        np.minimum.at(self.tileNext, (ys//ts,xs//ts), fireAt)
+        new = self.tileNext[pt[:,0],pt[:,1]]
+        changed = np.nonzero((new != old) & np.isfinite(new))[0]
+        if len(self.heap)+len(changed) > 2*self.tileNext.size+1024:
+            self.Rebuild()
+            return
+        for i in changed:
+            heapq.heappush(self.heap, (float(new[i]), int(pt[i,0]), int(pt[i,1])))
+
+    def Rebuild(self):
+        ty, tx = np.nonzero(np.isfinite(self.tileNext))
+        self.heap = list(zip(self.tileNext[ty,tx].tolist(), ty.tolist(), tx.tolist()))
+        heapq.heapify(self.heap)
+
+    def WakeDue(self, act, horizon):
+        # 깨운 타일은 현재 시각으로 다시 넣어 둔다: 처리 뒤 값이 바뀌면 Schedule이 새 항목을 넣고 이것은 버려진다
+        heap = self.heap
+        due = []
+        while heap and heap[0][0] <= horizon:
+            t, ty, tx = heapq.heappop(heap)
+            if self.tileNext[ty,tx] == t:
+                act.touched[ty,tx] = True
+                due.append((t, ty, tx))
+        for entry in due:
+            heapq.heappush(heap, entry)
+
+class ReactionEngine:
+    def __init__(self, matDB, rxDB, config):
+        self.matDB = matDB
+        self.rxDB = rxDB
+        self.config = config
+        self.R = 8.314
+        self.step = 0  # 난수 키의 스텝 번호 (SimulationManager가 매 스텝 설정)
+        self.substep = 0  # 한 스텝을 나눠 돌릴 때 하위 스텝 번호 (난수 lane을 가른다)
+        self.maxRate = 0.0  # 마지막 실행의 가장 큰 계면 반응률 [1/s]
+        self.firedCount = 0
+        self._clocks = weakref.WeakKeyDictionary()
+        self.wakeByHeap = True  # 사건 모드에서 잠든 타일을 시계 힙으로 깨우는지 (분산 작업자는 False)
+        self._arrhenius = None
+        self._arrheniusKey = None
+
+    def FindInterfaces(self, grid):
+        # 반응 가능한 이웃 쌍(오른쪽, 아래)을 전체 격자에서 한 번에 찾는다
+        # 반환: c1 좌표, c2 좌표, 반응 인덱스
+        table = self.rxDB.GetPairTable(len(self.matDB.materials))
+        act = grid.activity
+        return _findInterfacesKernel(grid.materialID, table, act.stencilList, act.tileSize)
+
+    def ArrheniusFactor(self, Ea, rxIdx, T):
+        # exp(-Ea/RT)를 반응별 온도 구간 표에서 조회 (구간 중앙값). 두 표본 방식이 같이 쓴다
+        # 계면마다 exp를 부르지 않고, 사건 모드에서는 구간 안의 작은 온도 변화가 반응률을 바꾸지 않는다
+        key = Ea.tobytes()
+        if self._arrheniusKey != key:
+            Tk = (np.arange(int(ARRHENIUS_TMAX/ARRHENIUS_BIN))+0.5)*ARRHENIUS_BIN
+            self._arrhenius = np.exp(-Ea[:,None]/(self.R*Tk[None,:]))
+            self._arrheniusKey = key
+        bins = np.minimum((np.maximum(T,0.0)*(1.0/ARRHENIUS_BIN)).astype(np.int64), self._arrhenius.shape[1]-1)
+        return self._arrhenius[rxIdx,bins]
+
+    #--------------------------------------------
+    # 사건 기반 표본 추출 (reactionSampling="event")
+    #--------------------------------------------
+    # 계면(c1 셀, 오른쪽/아래)마다 다음 반응 시각을 들고 있다 (next reaction method)
+    # 반응률이 바뀌면 남은 지수 시계를 새 반응률로 다시 재고, 반응률이 그대로면 시각도 그대로다
+    # 그래서 난수는 계면이 새로 생기거나 반응할 때만 뽑는다
+    # 처리 타일(온도나 이웃이 바뀌는 곳)만 반응률을 다시 계산하고, 잠든 타일은 예정 시각이
+    # 가장 이른 계면 기준으로 힙에 들어가 있다가 그 시각이 되면 WakeDue가 깨운다
+    # 분산 모드에서는 작업자가 띠마다 시계를 따로 들고 힙은 쓰지 않는다. 대신 베르누이 표본처럼
+    # 반응률이 있는 계면이 든 타일을 깨어 있게 둔다 (wakeByHeap)
+    def Uniform(self, keys, lane):
+        # (config.seed, step, 키, lane)로 정해지는 [0,1) 난수. lane은 같은 스텝에서 같은 키를 여러 번 쓸 때 구분
+        return PhiloxUniform(self.config.seed, self.step, keys, lane+4*self.substep, self.config.reactionBackend == "numba")
+
+    def StableDt(self):
+        # 계면 하나의 스텝당 반응 확률이 maxReactionProbability를 넘지 않는 dt (직전 실행의 반응률 기준)
+        if self.maxRate <= 0.0:
+            return None
+        return self.config.maxReactionProbability/self.maxRate
+
+    def InterfaceKeys(self, grid, ys, xs, ys2):
+        # 계면 id = c1 셀 인덱스*2 + (0 오른쪽, 1 아래). 분산 모드 띠 그리드도 전체 격자 기준 (originY)
+        return ((ys.astype(np.int64)+grid.originY)*grid.width+xs)*2+(ys2 != ys)
+
+    def GetClock(self, grid):
+        clock = self._clocks.get(grid)
+        if clock is None:
+            clock = ReactionClock(grid)
+            self._clocks[grid] = clock
+        return clock
+
+    def WakeDue(self, grid, dt):
+        # 이번 스텝 안에 반응이 예정된 잠든 타일을 깨운다 (BeginStep 전에 호출)
+        clock = self._clocks.get(grid)
+        if clock is not None and self.config.reactionSampling == "event" and self.rxDB.reactions:
+            clock.WakeDue(grid.activity, clock.time+dt)
+
+    def SampleEvents(self, grid, ys, xs, ys2, rate, dt):
+        # 이번 스텝 [now, now+dt] 안에 예정 시각이 든 계면의 인덱스
+        clock = self.GetClock(grid)
+        now, horizon = clock.time, clock.time+dt
+        keys = self.InterfaceKeys(grid, ys, xs, ys2)
+        ids = keys-grid.originY*grid.width*2
+        oldRate = clock.rate[ids]
+        fireAt = clock.fireAt[ids]
+        with np.errstate(invalid="ignore", over="ignore"):
+            remaining = (fireAt-now)*oldRate
+            # 새 계면, 반응률이 0이던 계면, 지난 시각이 남은 (사라졌던) 계면은 새로 뽑는다
+            fresh = ~(remaining >= 0.0) | (oldRate <= 0.0) | ~np.isfinite(remaining)
+            remaining[fresh] = -np.log1p(-self.Uniform(keys[fresh], 1))
+            rescaled = np.where(rate > 0.0, now+remaining/np.where(rate > 0.0, rate, 1.0), np.inf)
+            # 반응률이 그대로인 계면은 시각도 그대로 (다시 재면 반올림 오차가 스텝마다 쌓인다)
+            fireAt = np.where(fresh | (rate != oldRate), rescaled, fireAt)
+            fired = np.nonzero(fireAt <= horizon)[0]
+            if len(fired):
+                fireAt[fired] = horizon-np.log1p(-self.Uniform(keys[fired], 2))/rate[fired]
+        clock.rate[ids] = rate
+        clock.fireAt[ids] = fireAt
+        clock.Schedule(grid.activity, ys, xs, fireAt)
+        return fired
+
+    def ProcessReactions(self, grid, dt):
+        self.firedCount = 0
+        self.maxRate = 0.0
+        if self.config.reactionSampling == "event":
+            clock = self.GetClock(grid)
+            try:
+                self._ProcessReactions(grid, dt)
+            finally:
+                clock.time += dt
+        else:
+            self._ProcessReactions(grid, dt)
+
+    def _ProcessReactions(self, grid, dt):
+        if not self.rxDB.reactions:
+            return
+        ys, xs, ys2, xs2, rxIdx = self.FindInterfaces(grid)
+        event = self.config.reactionSampling == "event"
+        if len(rxIdx) == 0:
+            if event:
+                # 계면이 모두 사라진 타일의 예정 시각을 지운다
+                self.GetClock(grid).Schedule(grid.activity, ys, xs, np.empty(0))
+            return
+        A, Ea, deltaH, product = self.rxDB.GetParameterArrays()
+        temp = grid.temperature
+        if not self.config.expertMode:
+            # 단순 반응
+            rate = np.full(len(rxIdx), 0.1)
+            heatScale = dt
+        else:
+            # 전문 모드: Arrhenius 식
+            T = (temp[ys,xs]+temp[ys2,xs2])*0.5+273.15
+            scale = self.config.reactionPrecision*self.config.simulationSpeed
+            rate = A[rxIdx]*self.ArrheniusFactor(Ea, rxIdx, T)*scale
+            heatScale = dt*scale
+        self.maxRate = float(rate.max())
+        if not event or not self.wakeByHeap:
+            # 반응률이 있는 계면이 든 타일은 잠들지 않게 (잠든 타일은 계면을 다시 찾지 않아 반응이 멈춘다)
+            # 사건 모드는 힙이 예정 시각에 깨우므로 힙이 없는 분산 작업자만
+            live = rate > 0.0
+            grid.activity.WakeCells(ys[live], xs[live])
+        if event:
+            fired = self.SampleEvents(grid, ys, xs, ys2, rate, dt)
+        else:
+            # 베르누이 표본을 한 번에 추출
+            fired = np.nonzero(self.Uniform(self.InterfaceKeys(grid, ys, xs, ys2), 0)<rate*dt)[0]
+        if len(fired) == 0:
+            return
+        # c1은 한 번만 바뀐다: 오른쪽 쌍에서 이미 반응했으면 아래 쌍은 버림 (순차 처리와 같은 우선순위)
+        c1 = ys[fired]*grid.width+xs[fired]
+        keep = np.ones(len(fired), dtype=bool)
+        keep[1:] = c1[1:] != c1[:-1]
+        fired = fired[keep]
+        y1, x1, y2, x2, r = ys[fired], xs[fired], ys2[fired], xs2[fired], rxIdx[fired]
+        prod = product[r]
+        hasProduct = prod>=0
+        grid.materialID[y1[hasProduct],x1[hasProduct]] = prod[hasProduct]
+        grid.ResetPhase((y1[hasProduct],x1[hasProduct]))
+        dH = deltaH[r]*heatScale
+        np.add.at(temp, (y1,x1), dH)
+        np.add.at(temp, (y2,x2), dH)
+        grid.activity.WakeCells(y1,x1)
+        grid.activity.WakeCells(y2,x2)
+        self.firedCount = len(fired)
+
+def _CFLStableDt(grid, config):
+    # 속도 단위는 셀/초, 대류 커널은 simulationSpeed를 한 번 더 곱한다
+    vmax = max(float(np.abs(grid.velocityX).max()), float(np.abs(grid.velocityY).max()))*config.simulationSpeed
+    return config.cflNumber/vmax if vmax > 0.0 else None
+
+class FluidSolver:
+    def __init__(self, matDB, config):
+        self.matDB = matDB
+        self.config = config
+        self.viscosity = 1e-5
+        self.swappedCount = 0
+        self._projection = MultigridPCG()
+        self._p = None
+        self.lastIterations = 0
+        self._phaseTables = None
+        self._phaseKey = None
+
+    def GetPhaseTables(self):
+        # [matID, 상] → (밀도, 흐를 수 있는지). 상 미정(0) 열은 상온(20°C) 기준 (상 변화를 끄면 이것만 쓰인다)
+        # 표의 밀도는 상온 상태의 값이라 응축상↔기체 전이는 gasExpansion 배로 늘이거나 줄인다
+        key = (self.matDB.version, self.config.gasExpansion)
+        if self._phaseKey != key:
+            rho = self.matDB.GetPropertyTable("density")
+            melt = self.matDB.GetPropertyTable("meltingPoint")
+            boil = self.matDB.GetPropertyTable("boilingPoint")
+            gasAt20 = np.maximum(boil, melt) <= 20.0
+            condensed = np.where(gasAt20, rho*self.config.gasExpansion, rho)
+            gas = np.where(gasAt20, rho, rho/self.config.gasExpansion)
+            density = np.stack([rho, condensed, condensed, gas], axis=1)
+            fluid = np.stack([melt <= 20.0, np.zeros_like(gasAt20), np.ones_like(gasAt20), np.ones_like(gasAt20)], axis=1)
+            self._phaseTables = (np.ascontiguousarray(density), np.ascontiguousarray(fluid))
+            self._phaseKey = key
+        return self._phaseTables
+
+    def StableDt(self, grid):
+        # 오일러 모드만: 스텝당 이동이 cflNumber 셀 이하 (정렬 모드는 dt와 무관)
+        if self.config.fluidMode != "eulerian":
+            return None
+        return _CFLStableDt(grid, self.config)
+
+    def Solve(self, grid, dt):
+        density, fluid = self.GetPhaseTables()
+        if self.config.fluidMode == "eulerian" and dt > 0:
+            self.SolveVelocity(grid, dt, density, fluid)
+        self.Settle(grid, density, fluid)
+
+    def SolveVelocity(self, grid, dt, density, fluid):
+        # 오일러 유체: 대류 → 부력 → 압력 투영. 속도 단위는 셀/초, 고체 칸은 벽
+        g = 9.81*self.config.simulationSpeed
+        h,w = grid.height, grid.width
+        mat = grid.materialID
+        phase = (grid.flags >> PHASE_SHIFT) & 3
+        cellDensity = density[mat,phase]
+        solid = ~fluid[mat,phase]
+        vx = grid.velocityX.astype(np.float64)
+        vy = grid.velocityY.astype(np.float64)
+        advX = np.empty_like(vx)
+        advY = np.empty_like(vy)
+        _advectVelocityKernel(vx, vy, solid, dt, advX, advY)
+
+        # 부력: 온도에 따른 유효 밀도 (밀도 곡선이 없으면 열팽창 계수로)
+        if self.matDB.GetPropertyCurves("density") is None:
+            rho = cellDensity/(1.0+self.config.thermalExpansion*(grid.temperature-20.0))
+        else:
+            rho = self.matDB.EvaluateProperty("density", mat, grid.temperature)*(cellDensity/density[mat,0])
+        _buoyancyKernel(rho, solid, g, dt, advY)
+
+        # 투영: 열린 면(양쪽 다 유체)만 플럭스가 흐른다. L p = -div, 작은 a로 노이만 특이성 완화
+        open_ = ~solid
+        kx = (open_[:,:-1] & open_[:,1:]).astype(np.float64)
+        ky = (open_[:-1,:] & open_[1:,:]).astype(np.float64)
+        div = np.empty_like(vx)
+        _divergenceKernel(advX, advY, kx, ky, div)
+        if self._p is None or self._p.shape != div.shape:
+            self._p = np.zeros_like(div)
+        self._projection.Setup(np.full((h,w), 1e-6), kx, ky)
+        self.lastIterations = self._projection.Solve(-div, self._p, self.config.projectionTolerance,
+                                                     self.config.projectionMaxIterations)
+        _subtractGradientKernel(advX, advY, self._p, kx, ky)
+        advX[solid] = 0.0
+        advY[solid] = 0.0
+        grid.velocityX[:] = advX
+        grid.velocityY[:] = advY
+
+        # 표시용 압력 [Pa]: 정수압 + 동압 (셀 크기로 물리 단위 환산)
+        dx = self.config.cellSize
+        hydro = np.cumsum(cellDensity*9.81*dx, axis=0)
+        grid.pressure[:] = 101325.0 + hydro + cellDensity*self._p*(dx*dx)/dt
+
+        # 온도를 한 칸 이상 옮길 만한 속도가 있는 타일은 깨움
+        ys, xs = np.nonzero((np.abs(advX)+np.abs(advY))*dt > 0.25)
+        grid.activity.WakeCells(ys, xs)
+
+    def Settle(self, grid, density, fluid):
+        # 밀도 기반 정렬: 짝/홀 행 쌍을 번갈아 처리하는 병렬 커널
+        act = grid.activity
+        self.swappedCount = 0
+        for it in range(self.config.settleIterations):
+            for phase in (0,1):
+                self.swappedCount += _settlePhase(grid.materialID, grid.temperature, grid.pressure,
+                                                  grid.velocityX, grid.velocityY, grid.flags, grid.latent,
+                                                  density, fluid, act.process, act.tileSize,
+                                                  act.touched, phase, it)
+
+class ThermalSolver:
+    def __init__(self, matDB, config):
+        self.matDB = matDB
+        self.config = config
+        self._out = None
+        self._k = None
+        self._cellIndex = None
+        self._lastDelta = None
+        self._implicit = MultigridPCG()
+        self.lastIterations = 0
+
+    def StableDt(self, grid):
+        # 확산은 스텝마다 한 번의 가중 평균이라 dt와 무관, 명시적 대류만 CFL (속도장은 오일러 모드에만 있음)
+        if self.config.thermalMode == "implicit" or self.config.fluidMode != "eulerian":
+            return None
+        return _CFLStableDt(grid, self.config)
+
+    def Solve(self, grid, dt, blocks=None):
+        # blocks: BlockMap (adaptiveBlocks). 셀 스텐실을 건너뛰는 명시적 numba 경로만 블록을 따로 갱신하고,
+        # 전체 격자를 푸는 경로는 블록 셀도 그대로 계산한다
+        if self.config.thermalMode == "implicit":
+            self.SolveImplicit(grid, dt)
+        elif self.config.thermalBackend == "numba":
+            self.SolveNumba(grid, dt, blocks)
+        else:
+            self.SolveNumpy(grid, dt)
+
+    def SolveNumba(self, grid, dt, blocks=None):
+        self.ComputeNumba(grid, dt, blocks)
+        self.CommitNumba(grid, blocks)
+
+    def ComputeNumba(self, grid, dt, blocks=None):
+        # 계산과 반영을 나눠 둔다: 분산 모드에서는 모든 스트립이 계산을 끝낸 뒤에 반영해야 함
+        if self._out is None or self._out.shape != grid.temperature.shape:
+            self._out = np.empty_like(grid.temperature)
+        mat = grid.materialID
+        condLUT = self.matDB.GetPropertyTable("thermalConductivity")
+        if self.matDB.GetPropertyCurves("thermalConductivity") is not None:
+            # 온도에 따라 바뀌는 전도율: 셀 번호 배열을 물질 ID 자리에 넘기면 condLUT가 셀별 필드가 된다
+            if self._k is None or self._k.shape != mat.shape:
+                self._k = np.empty(mat.shape, dtype=np.float64)
+                self._cellIndex = np.arange(mat.size, dtype=np.int32).reshape(mat.shape)
+            condLUT = self.matDB.EvaluateProperty("thermalConductivity", mat, grid.temperature, self._k).ravel()
+            mat = self._cellIndex
+        act = grid.activity
+        _thermalKernel(mat, grid.temperature, grid.velocityX, grid.velocityY,
+                       condLUT, float(dt), float(self.config.simulationSpeed),
+                       act.stencilList, act.tileSize, self._out)
+        if blocks is not None:
+            blocks.Diffuse(mat, grid.temperature, condLUT)
+
+    def CommitNumba(self, grid, blocks=None):
+        act = grid.activity
+        act.WakeChanged(grid.temperature, self._out, self.config.sleepThreshold)
+        # grid 배열은 외부(뷰, 공유 메모리)에서 참조하므로 교체하지 않고 처리 타일만 복사
+        _copyTiles(self._out, grid.temperature, act.stencilList, act.tileSize)
+        if blocks is not None:
+            blocks.Commit(grid, self.config.sleepThreshold)
+
+    def SolveImplicit(self, grid, dt):
+        # 후방 오일러: (rho*cp*dx^2/dt) T' - div(k grad T') dx^2 = (rho*cp*dx^2/dt) T
+        # 어떤 dt에서도 안정. 멀티그리드 전처리 CG, 이전 프레임 증분으로 초기값 외삽
+        if dt <= 0:
+            return
+        mat = grid.materialID
+        T = grid.temperature
+        rho = self.matDB.EvaluateProperty("density", mat, T)
+        cp = self.matDB.EvaluateProperty("specificHeat", mat, T)
+        k = self.matDB.EvaluateProperty("thermalConductivity", mat, T)
+        dx = self.config.cellSize
+        a = rho*cp*(dx*dx/dt)
+        # 면 전도도: 조화 평균 (직렬 열저항)
+        kx = 2*k[:,:-1]*k[:,1:]/np.maximum(k[:,:-1]+k[:,1:],1e-30)
+        ky = 2*k[:-1,:]*k[1:,:]/np.maximum(k[:-1,:]+k[1:,:],1e-30)
+        b = a*T
+        X = T.copy()
+        if self._lastDelta is not None and self._lastDelta.shape == T.shape:
+            X += self._lastDelta
+        self._implicit.Setup(a, kx, ky)
+        self.lastIterations = self._implicit.Solve(b, X, self.config.implicitTolerance,
+                                                   self.config.implicitMaxIterations)
+        self._lastDelta = X - T
+
+        grid.activity.WakeChanged(T, X, self.config.sleepThreshold, allTiles=True)
+
+        # 대류 근사
+        _advectKernel(X, grid.velocityX, grid.velocityY, float(dt), float(self.config.simulationSpeed), T)
+
+    def SolveNumpy(self, grid, dt):
+        # 기준 구현: 컴파일 백엔드 검증용
+        h,w = grid.height,grid.width
+        T = grid.temperature
+        k = self.matDB.EvaluateProperty("thermalConductivity", grid.materialID, T)
+        # 9점 스텐실: 격자 밖 이웃은 가중치 0
+        Tsum = np.zeros((h,w),dtype=float)
+        weightSum = np.zeros((h,w),dtype=float)
+        for dy in [-1,0,1]:
+            for dx in [-1,0,1]:
+                ys, yd = slice(max(0,dy),h+min(0,dy)), slice(max(0,-dy),h+min(0,-dy))
+                xs, xd = slice(max(0,dx),w+min(0,dx)), slice(max(0,-dx),w+min(0,-dx))
+                cond = (k[yd,xd]+k[ys,xs])*0.5
+                Tsum[yd,xd] += T[ys,xs]*cond
+                weightSum[yd,xd] += cond
+        newTemps = np.where(weightSum>0, Tsum/np.where(weightSum>0,weightSum,1.0), T)
+
+        # 대류 근사
+        ys, xs = np.mgrid[0:h,0:w]
+        vx = grid.velocityX.astype(np.float64)*dt*self.config.simulationSpeed
+        vy = grid.velocityY.astype(np.float64)*dt*self.config.simulationSpeed
+        sx = np.rint(xs - vx).astype(np.int64)
+        sy = np.rint(ys - vy).astype(np.int64)
+        valid = (sx>=0)&(sx<w)&(sy>=0)&(sy<h)
+        finalTemps = np.copy(newTemps)
+        finalTemps[valid] = newTemps[sy[valid],sx[valid]]
+        grid.activity.WakeChanged(grid.temperature, finalTemps, self.config.sleepThreshold, allTiles=True)
+        grid.temperature[:] = finalTemps
+
+class PhaseSolver:
+    # 셀별 고체/액체/기체 상과 잠열. 물질별 전이 온도/잠열/비열 배열로 컴파일된 한 번의 패스
+    # 결과 상은 flags에 남아 유체 단계가 [물질, 상] 테이블로 밀도와 흐름 여부를 고른다
+    def __init__(self, matDB, config):
+        self.matDB = matDB
+        self.config = config
+        self.changedCount = 0
+
+    def Solve(self, grid, dt):
+        self.changedCount = 0
+        if not self.config.phaseChanges:
+            return
+        db = self.matDB
+        act = grid.activity
+        changed = _phaseKernel(grid.materialID, grid.temperature, grid.latent, grid.flags,
+                               db.GetPropertyTable("meltingPoint"), db.GetPropertyTable("boilingPoint"),
+                               db.GetPropertyTable("specificHeat"), db.GetPropertyTable("latentHeatFusion"),
+                               db.GetPropertyTable("latentHeatVaporization"), act.processList, act.tileSize,
+                               float(self.config.sleepThreshold), act.touched)
+        self.changedCount = int(changed.sum())
+
+#--------------------------------------------
+# Recorder: 키프레임 + 프레임별 압축 델타로 타임라인 기록 (되감기/탐색)
+#--------------------------------------------
+# 키프레임: 모든 필드 원본
+# 델타: 직전 프레임 대비 바뀐 셀의 materialID/flags 새 값, 온도는 temperatureQuantum 단위 정수 변화량
+#       (바뀐 셀이 많으면 격자 전체 변화량). pressure/velocity는 키프레임에만 있다
+# 압축(zlib, GIL 해제)은 작업 스레드 하나에서 하고 스텝은 차분 계산과 복사만 한다
+# 메모리 예산을 넘으면 가장 오래된 키프레임 묶음(키프레임 + 뒤따르는 델타)부터 버린다
+def _Pack(a):
+    return zlib.compress(np.ascontiguousarray(a).tobytes(), 1)
+
+def _Unpack(b, dtype):
+    return np.frombuffer(zlib.decompress(b), dtype=dtype)
+
+def _PackArrays(arrays):
+    # 이름이 ...Index인 배열은 정렬된 평탄 인덱스: 차분(uint32)으로 압축이 잘 되게
+    return {name: _Pack(np.diff(a, prepend=0).astype(np.uint32) if name.endswith("Index") else a)
+            for name,a in arrays.items()}
+
+def _UnpackIndex(b):
+    return np.cumsum(_Unpack(b, np.uint32), dtype=np.int64)
+
+class TimelineFrame:
+    __slots__ = ("step","key","nbytes","_data","_pending")
+
+    def __init__(self, step, key, data=None, pending=None, rawBytes=0):
+        self.step = step
+        self.key = key
+        self._data = data  # {이름: 압축 bytes}
+        self._pending = pending  # 압축 중이면 Future
+        self.nbytes = sum(len(b) for b in data.values()) if data is not None else rawBytes
+
+    @property
+    def data(self):
+        if self._pending is not None:
+            self._data = self._pending.result()
+            self._pending = None
+            self.nbytes = sum(len(b) for b in self._data.values())
+        return self._data
+
+    def Settle(self):
+        # 압축이 끝났으면 실제 크기로 갱신, 변화량 반환
+        if self._pending is None or not self._pending.done():
+            return 0
+        before = self.nbytes
+        self.data
+        return self.nbytes-before
+
+class Recorder:
+    FIELD_DTYPES = {"materialID": np.int16, "temperature": np.float64, "pressure": np.float32,
+                    "velocityX": np.float32, "velocityY": np.float32, "flags": np.uint32, "latent": np.float32}
+
+    def __init__(self, config):
+        self.config = config
+        self.frames = []
+        self.nbytes = 0
+        self.evictedFrames = 0
+        self.cursor = None  # Seek로 보고 있는 프레임. 다시 기록하면 그 뒤 기록은 버려진다
+        self.shape = None
+        self.quantum = config.temperatureQuantum
+        self._mat = None  # 직전 기록 상태 (델타 기준)
+        self._flags = None
+        self._qT = None
+        self._dq = None
+        self._executor = None
+
+    def Clear(self):
+        self.frames = []
+        self.nbytes = 0
+        self.cursor = None
+        self.shape = None
+        self._mat = self._flags = self._qT = self._dq = None
+
+    def _Submit(self, step, key, arrays):
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="Recorder")
+        raw = sum(a.nbytes for a in arrays.values())
+        return TimelineFrame(step, key, pending=self._executor.submit(_PackArrays, arrays), rawBytes=raw)
+
+    def Record(self, grid, step):
+        if self.shape != grid.materialID.shape:
+            self.Clear()
+        if self.cursor is not None:
+            self.Truncate(self.cursor)
+        if self._qT is None or not self.frames or step-self._KeyStep() >= self.config.keyframeInterval:
+            frame = self._Keyframe(grid, step)
+        else:
+            frame = self._Delta(grid, step)
+        self.frames.append(frame)
+        self.nbytes += frame.nbytes
+        for f in self.frames[-8:]:
+            self.nbytes += f.Settle()
+        self.Evict(self.config.timelineBudgetMB*1024*1024)
+
+    def _KeyStep(self):
+        for f in reversed(self.frames):
+            if f.key:
+                return f.step
+        return -1
+
+    def _ResetBase(self, fields):
+        self._mat = fields["materialID"].copy()
+        self._flags = fields["flags"].copy()
+        self._qT = np.rint(fields["temperature"]/self.quantum).astype(np.int64)
+        self._dq = np.empty(self._qT.shape, dtype=np.int32)
+
+    def _Keyframe(self, grid, step):
+        if not self.frames:
+            # 양자화 단위는 기록 전체에서 하나
+            self.quantum = self.config.temperatureQuantum
+        self.shape = grid.materialID.shape
+        fields = {name: getattr(grid,name).copy() for name in self.FIELD_DTYPES}
+        self._ResetBase(fields)
+        return self._Submit(step, True, fields)
+
+    def _Delta(self, grid, step):
+        arrays = {}
+        mat = grid.materialID.ravel()
+        idx = np.flatnonzero(mat != self._mat.ravel())
+        arrays["matIndex"], arrays["matValue"] = idx, mat[idx]
+        self._mat.ravel()[idx] = mat[idx]
+
+        flags = grid.flags.ravel()
+        idx = np.flatnonzero(flags != self._flags.ravel())
+        arrays["flagIndex"], arrays["flagValue"] = idx, flags[idx]
+        self._flags.ravel()[idx] = flags[idx]
+
+        changed = _quantizeDeltaKernel(grid.temperature, 1.0/self.quantum, self._qT, self._dq)
+        dq = self._dq.ravel()
+        if changed*4 > dq.size:
+            arrays["tDense"] = dq.copy()
+        elif changed:
+            idx = np.flatnonzero(dq)
+            arrays["tIndex"], arrays["tDelta"] = idx, dq[idx]
+        return self._Submit(step, False, arrays)
+
+    def Evict(self, budget):
+        # 가장 오래된 키프레임 묶음부터 버림. 마지막 묶음은 남긴다
+        while self.nbytes > budget:
+            nextKey = next((i for i in range(1,len(self.frames)) if self.frames[i].key), None)
+            if nextKey is None:
+                break
+            for f in self.frames[:nextKey]:
+                self.nbytes -= f.nbytes
+            del self.frames[:nextKey]
+            self.evictedFrames += nextKey
+            if self.cursor is not None:
+                self.cursor = max(0, self.cursor-nextKey)
+
+    def Truncate(self, index):
+        # index 프레임까지만 남기고 델타 기준 상태를 그 프레임으로 되돌린다
+        fields = self.Reconstruct(index)
+        for f in self.frames[index+1:]:
+            self.nbytes -= f.nbytes
+        del self.frames[index+1:]
+        self._ResetBase(fields)
+        self.cursor = None
+
+    def Reconstruct(self, index, frames=None):
+        # index 프레임 시점의 필드 배열 dict (새 배열)
+        frames = self.frames if frames is None else frames
+        k = index
+        while not frames[k].key:
+            k -= 1
+        shape = self.shape
+        data = frames[k].data
+        # latent가 없는 예전 타임라인 파일은 0으로
+        fields = {name: _Unpack(data[name], dtype).reshape(shape).copy() if name in data else np.zeros(shape, dtype=dtype)
+                  for name,dtype in self.FIELD_DTYPES.items()}
+        if k == index:
+            return fields
+        mat, flags = fields["materialID"].ravel(), fields["flags"].ravel()
+        qT = np.rint(fields["temperature"]/self.quantum).astype(np.int64).ravel()
+        for f in frames[k+1:index+1]:
+            d = f.data
+            mat[_UnpackIndex(d["matIndex"])] = _Unpack(d["matValue"], np.int16)
+            flags[_UnpackIndex(d["flagIndex"])] = _Unpack(d["flagValue"], np.uint32)
+            if "tDense" in d:
+                qT += _Unpack(d["tDense"], np.int32)
+            elif "tIndex" in d:
+                qT[_UnpackIndex(d["tIndex"])] += _Unpack(d["tDelta"], np.int32)
+        fields["temperature"] = (qT*self.quantum).reshape(shape)
+        return fields
+
+    def Seek(self, simManager, index):
+        # 기록된 프레임을 그리드에 적용. 일시정지 상태에서 Post로 호출
+        if not self.frames:
+            return
+        index = max(0, min(index, len(self.frames)-1))
+        fields = self.Reconstruct(index)
+        grid = simManager.grid
+        if grid.materialID.shape != self.shape:
+            simManager.SetGrid(CellGrid(self.shape[1], self.shape[0], self.config.tileSize, fields=fields))
+        else:
+            for name,a in fields.items():
+                np.copyto(getattr(grid,name), a)
+            grid.InvalidateSpawners()
+            grid.activity.WakeAll()
+        simManager.stepCount = self.frames[index].step
+        self.cursor = index
+
+    def Export(self, path, start=0, end=None):
+        # [start, end] 구간을 파일로. 첫 프레임이 델타면 키프레임으로 바꿔 넣는다
+        frames = list(self.frames)
+        end = len(frames)-1 if end is None else min(end, len(frames)-1)
+        out = frames[start:end+1]
+        if out and not out[0].key:
+            fields = self.Reconstruct(start, frames)
+            out[0] = TimelineFrame(out[0].step, True, _PackArrays(fields))
+        meta = {"shape": list(self.shape), "quantum": self.quantum,
+                "frames": [{"step": f.step, "key": f.key, "data": sorted(f.data)} for f in out]}
+        arrays = {"meta": np.array(json.dumps(meta))}
+        for i,f in enumerate(out):
+            for name,b in f.data.items():
+                arrays["%d_%s" % (i,name)] = np.frombuffer(b, dtype=np.uint8)
+        np.savez(path, **arrays)
+        return len(out)
+
+    def Import(self, path):
+        # Export한 파일을 기록으로 불러온다 (기존 기록은 버림). 이후 Seek로 재생
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            frames = [TimelineFrame(f["step"], f["key"], {name: data["%d_%s" % (i,name)].tobytes() for name in f["data"]})
+                      for i,f in enumerate(meta["frames"])]
+        self.Clear()
+        self.frames = frames
+        self.nbytes = sum(f.nbytes for f in frames)
+        self.shape = tuple(meta["shape"])
+        self.quantum = meta["quantum"]
+        return len(frames)
+
+#--------------------------------------------
+# Profiler: 단계별 시간과 카운터를 고정 크기 링 버퍼에 기록
+#--------------------------------------------
+class Profiler:
+    STAGES = ("spawners","reactions","fluid","thermal","tools","phase")
+    COUNTERS = ("reactionsFired","cellsSwapped","activeTiles","phaseChanges")
+
+    def __init__(self, capacity=600):
+        # 꺼져 있으면 Begin/Lap/End는 플래그 확인만 하고 돌아간다
+        self.enabled = False
+        self.capacity = capacity
+        self.origin = time.perf_counter()
+        self.stepIndex = np.zeros(capacity, dtype=np.int64)
+        self.stepStart = np.zeros(capacity, dtype=np.float64)  # origin 기준 [s]
+        self.durations = np.zeros((capacity,len(self.STAGES)), dtype=np.float64)  # [s]
+        self.counters = np.zeros((capacity,len(self.COUNTERS)), dtype=np.int64)
+        self.count = 0  # 지금까지 끝난 스텝 수 (링 위치 = count % capacity)
+        # 렌더링은 GUI 스레드에서 스텝과 따로 일어나므로 별도의 링
+        self.renderStart = np.zeros(capacity, dtype=np.float64)
+        self.renderDuration = np.zeros(capacity, dtype=np.float64)
+        self.renderCount = 0
+        self._row = 0
+        self._t = 0.0
+
+    def Begin(self, step):
+        if not self.enabled:
+            return
+        row = self._row = self.count % self.capacity
+        self._t = time.perf_counter()
+        self.stepIndex[row] = step
+        self.stepStart[row] = self._t-self.origin
+        self.durations[row] = 0.0
+
+    def Lap(self, stage):
+        # 직전 Begin/Lap 이후 시간을 stage(STAGES 인덱스)에 기록
+        if not self.enabled:
+            return
+        t = time.perf_counter()
+        self.durations[self._row,stage] = t-self._t
+        self._t = t
+
+    def End(self, *counters):
+        if not self.enabled:
+            return
+        self.counters[self._row] = counters
+        self.count += 1
+
+    def RecordRender(self, t0, t1):
+        # perf_counter 구간
+        if not self.enabled:
+            return
+        row = self.renderCount % self.capacity
+        self.renderStart[row] = t0-self.origin
+        self.renderDuration[row] = t1-t0
+        self.renderCount += 1
+
+    def _Order(self, count):
+        # 링에 남아 있는 표본의 인덱스, 오래된 것부터
+        n = min(count, self.capacity)
+        return (np.arange(count-n, count) % self.capacity) if n else np.zeros(0, dtype=np.int64)
+
+    def Summary(self, last=60):
+        # 최근 last 스텝 평균: {"steps", "stepsPerSecond", "stageMs": {..}, "renderMs", "fps", 카운터...}
+        idx = self._Order(self.count)[-last:]
+        ridx = self._Order(self.renderCount)[-last:]
+        out = {"steps": len(idx), "stepsPerSecond": 0.0, "stageMs": {}, "renderMs": 0.0, "fps": 0.0}
+        if len(idx):
+            mean = self.durations[idx].mean(axis=0)*1000.0
+            out["stageMs"] = dict(zip(self.STAGES, mean.tolist()))
+            for name,value in zip(self.COUNTERS, self.counters[idx[-1]].tolist()):
+                out[name] = value
+            span = self.stepStart[idx[-1]]-self.stepStart[idx[0]]
+            if len(idx) > 1 and span > 0:
+                out["stepsPerSecond"] = float((len(idx)-1)/span)
+        if len(ridx):
+            out["renderMs"] = float(self.renderDuration[ridx].mean()*1000.0)
+            span = self.renderStart[ridx[-1]]-self.renderStart[ridx[0]]
+            if len(ridx) > 1 and span > 0:
+                out["fps"] = float((len(ridx)-1)/span)
+        return out
+
+    def TraceEvents(self):
+        # Chrome/Perfetto trace 형식 ("X" 구간, "C" 카운터), 시간 단위 us
+        events = [{"name":"process_name","ph":"M","pid":1,"args":{"name":"PowerCUBE"}},
+                  {"name":"thread_name","ph":"M","pid":1,"tid":1,"args":{"name":"simulation"}},
+                  {"name":"thread_name","ph":"M","pid":1,"tid":2,"args":{"name":"render"}}]
+        for row in self._Order(self.count).tolist():
+            ts = self.stepStart[row]*1e6
+            step = int(self.stepIndex[row])
+            total = self.durations[row].sum()*1e6
+            events.append({"name":"step","cat":"step","ph":"X","pid":1,"tid":1,"ts":ts,"dur":total,"args":{"step":step}})
+            t = ts
+            for name,d in zip(self.STAGES, self.durations[row].tolist()):
+                events.append({"name":name,"cat":"stage","ph":"X","pid":1,"tid":1,"ts":t,"dur":d*1e6})
+                t += d*1e6
+            events.append({"name":"counters","ph":"C","pid":1,"ts":ts,
+                           "args":dict(zip(self.COUNTERS, self.counters[row].tolist()))})
+        for row in self._Order(self.renderCount).tolist():
+            events.append({"name":"render","cat":"render","ph":"X","pid":1,"tid":2,
+                           "ts":self.renderStart[row]*1e6,"dur":self.renderDuration[row]*1e6})
+        return events
+
+    def ExportTrace(self, path):
+        with open(path,"w",encoding="utf-8") as f:
+            json.dump({"traceEvents": self.TraceEvents(), "displayTimeUnit": "ms"}, f)
+
+#--------------------------------------------
+# StepScheduler: 고정 스텝 누산기 + 단계별 주기/하위 스텝
+#--------------------------------------------
+# 화면 틱의 벽시계 시간을 누산해서 fixedTimeStep 단위로만 Update를 부른다
+# (GC 멈춤이나 느린 프레임이 커다란 dt 한 번이 되지 않게)
+# 한 프레임에 maxStepsPerFrame 스텝 또는 그 프레임 시간만큼 돌고도 남은 시간은 버린다:
+# 시뮬레이션이 실제 시간보다 느려질 뿐 스텝이 터지지는 않는다
+# 단계마다 config.<단계>Interval 스텝에 한 번, 그동안 쌓인 시간을 한꺼번에 진행한다
+# 그 시간이 안정 한계(반응 확률, 대류 CFL)를 넘으면 하위 스텝으로 나눈다 (최대 maxSubsteps)
+class StageBudget:
+    def __init__(self):
+        self.runs = 0
+        self.substeps = 0  # 마지막 실행의 하위 스텝 수
+        self.limited = 0  # 하위 스텝 상한에 걸려 안정 한계를 못 지킨 횟수
+        self.lastMs = 0.0
+        self.meanMs = 0.0  # 지수 이동 평균
+
+    def Record(self, substeps, limited, ms):
+        self.runs += 1
+        self.substeps = substeps
+        self.limited += limited
+        self.lastMs = ms
+        self.meanMs = ms if self.runs == 1 else self.meanMs+0.1*(ms-self.meanMs)
+
+class StepScheduler:
+    # 단계 → 주기 설정 이름
+    STAGES = {"reactions": "reactionInterval", "fluid": "fluidInterval", "thermal": "thermalInterval"}
+
+    def __init__(self, config):
+        self.config = config
+        self.accumulator = 0.0  # 아직 진행하지 않은 벽시계 시간 [s]
+        self.pending = dict.fromkeys(self.STAGES, 0.0)  # 단계별로 아직 적용하지 않은 시뮬레이션 시간
+        self.budgets = {name: StageBudget() for name in self.STAGES}
+        self.frames = 0
+        self.lastFrameSteps = 0
+        self.droppedSteps = 0
+        self.droppedTime = 0.0
+
+    def Advance(self, simManager, elapsed):
+        # 한 화면 틱. 돌린 스텝 수를 돌려준다
+        config = self.config
+        h = config.fixedTimeStep
+        self.frames += 1
+        if config.paused:
+            # 멈춤: 명령만 적용 (Update가 처리). 멈춘 동안의 시간은 쌓지 않는다
+            self.accumulator = 0.0
+            self.lastFrameSteps = 0
+            simManager.Update(0.0)
+            return 0
+        if h <= 0:
+            self.lastFrameSteps = 1
+            simManager.Update(elapsed)
+            return 1
+        self.accumulator += max(0.0, elapsed)
+        due = int(self.accumulator/h)
+        steps = 0
+        t0 = time.perf_counter()
+        while steps < min(due, max(1,config.maxStepsPerFrame)):
+            simManager.Update(h)
+            steps += 1
+            # 스텝이 실제 시간보다 오래 걸리면 이번 프레임은 여기까지
+            if time.perf_counter()-t0 > max(elapsed, h):
+                break
+        self.accumulator -= steps*h
+        if self.accumulator >= h:
+            dropped = int(self.accumulator/h)
+            self.droppedSteps += dropped
+            self.droppedTime += dropped*h
+            self.accumulator -= dropped*h
+        if steps == 0:
+            # 스텝이 없는 프레임에도 브러시/스크립트 명령은 적용
+            simManager.ApplyCommands()
+        self.lastFrameSteps = steps
+        return steps
+
+    def Run(self, stage, step, dt, stableDt, solve):
+        # 주기가 된 스텝이면 쌓인 시간을 하위 스텝으로 나눠 solve(dt, substep), 하위 스텝 수를 돌려준다
+        self.pending[stage] += dt
+        interval = self.Interval(stage)
+        if step % interval:
+            return 0
+        total = self.pending[stage]
+        self.pending[stage] = 0.0
+        n = 1
+        if stableDt is not None and 0.0 < stableDt < total:
+            n = int(math.ceil(total/stableDt))
+        maxSubsteps = max(1, self.config.maxSubsteps)
+        limited = n > maxSubsteps
+        n = min(n, maxSubsteps)
+        t0 = time.perf_counter()
+        for i in range(n):
+            solve(total/n, i)
+        self.budgets[stage].Record(n, limited, (time.perf_counter()-t0)*1000.0)
+        return n
+
+    def Interval(self, stage):
+        return max(1, int(getattr(self.config, self.STAGES[stage])))
+
+    def Stats(self):
+        # 단계별 예산: budgetShare = 평균 시간 / 스텝 하나의 실시간 예산 (fixedTimeStep)
+        budgetMs = self.config.fixedTimeStep*1000.0
+        stages = {}
+        for name,b in self.budgets.items():
+            stages[name] = {"interval": self.Interval(name), "runs": b.runs,
+                            "substeps": b.substeps, "limited": b.limited, "lastMs": b.lastMs, "meanMs": b.meanMs,
+                            "budgetShare": b.meanMs/budgetMs if budgetMs > 0 else 0.0}
+        return {"frames": self.frames, "lastFrameSteps": self.lastFrameSteps, "droppedSteps": self.droppedSteps,
+                "droppedTime": self.droppedTime, "lag": self.accumulator, "stages": stages}
+
+#--------------------------------------------
+# SimulationManager
+#--------------------------------------------
+class Config:
+    def __init__(self):
+        self.expertMode = True
+        self.reactionPrecision = 1.0
+        self.gridWidth = 100
+        self.gridHeight = 100
+        self.spawnRate = 1.0
+        self.updateIntervalMs = 16
+        self.selectedMaterialID = 0
+        self.brushSize = 3
+        self.screenWidth = 1280
+        self.screenHeight = 800
+        self.viewZoom = 1.0
+        self.viewOffsetX = 0
+        self.viewOffsetY = 0
+        self.displayMode = "Material"
+        self.paused = False
+        self.simulationSpeed = 1.0
+        self.showTools = True
+        self.thermalBackend = "numba"  # "numba" | "numpy"
+        self.reactionBackend = "numba"  # 반응 난수: "numba" (병렬) | "numpy". 결과는 비트 단위로 같다
+        self.seed = None  # 반응 난수 시드. None이면 SimulationManager가 만들 때 무작위로 정해 기록한다
+        self.thermalMode = "explicit"  # "explicit" | "implicit" (후방 오일러, 실제 물성 사용)
+        self.cellSize = 0.001  # 셀 한 변 길이 [m]
+        self.implicitTolerance = 1e-8
+        self.implicitMaxIterations = 200
+        self.activeTiles = True  # 잠든 타일 건너뛰기
+        self.tileSize = 16
+        self.sleepSteps = 30  # 이만큼 조용하면 타일이 잠듦
+        self.sleepThreshold = 0.01  # 스텝당 온도 변화가 이보다 크면 깨어 있음 [°C]
+        self.showActiveTiles = False
+        self.settleIterations = 2  # 스텝당 밀도 정렬 반복 수 (짝/홀 두 위상이 1회)
+        self.fluidMode = "settle"  # "settle" | "eulerian" (속도/압력장 계산)
+        self.thermalExpansion = 3.4e-3  # 부력용 열팽창 계수 [1/K]
+        self.projectionTolerance = 1e-4
+        self.projectionMaxIterations = 50
+        self.threadedSimulation = True  # GUI에서 시뮬레이션을 작업 스레드로 실행
+        self.distributedWorkers = 0  # >0이면 격자를 가로 띠로 나눠 작업 프로세스들이 계산
+        self.profiling = False  # 단계별 시간 기록 (Profiler)
+        self.profileCapacity = 600  # 링 버퍼 스텝 수
+        self.showProfiler = False  # 화면에 FPS/단계 시간 표시
+        self.recordTimeline = False  # 스텝마다 타임라인 기록 (Recorder)
+        self.timelineBudgetMB = 256  # 기록 메모리 상한, 넘으면 오래된 것부터 버림
+        self.keyframeInterval = 60  # 키프레임 간격 [스텝]
+        self.temperatureQuantum = 0.01  # 델타의 온도 양자화 단위 [°C]
+        self.brushShape = "square"  # "square" | "circle"
+        self.materialLibraries = []  # 기본 물질 뒤에 불러올 외부 물질 라이브러리 JSON 경로
+        self.undoLimit = 50  # 되돌리기 가능한 획 수
+        self.phaseChanges = True  # 녹음/끓음/얼음/응축 (meltingPoint, boilingPoint, 잠열)
+        self.gasExpansion = 1000.0  # 응축상 → 기체가 될 때 밀도가 줄어드는 배수
+        self.fixedTimeStep = 0.016  # Advance가 쓰는 고정 스텝 [s] (0이면 벽시계 dt 그대로)
+        self.maxStepsPerFrame = 4  # 한 틱에 따라잡는 최대 스텝 수, 넘는 시간은 버린다
+        self.maxSubsteps = 8  # 단계 하나를 안정 한계에 맞춰 나누는 최대 하위 스텝 수
+        self.reactionInterval = 1  # 반응을 몇 스텝마다 (그동안의 시간을 한꺼번에)
+        self.fluidInterval = 1
+        self.thermalInterval = 1
+        self.maxReactionProbability = 0.5  # 하위 스텝당 계면 반응 확률 상한
+        self.cflNumber = 1.0  # 하위 스텝당 대류 이동 상한 [셀]
+        self.adaptiveBlocks = False  # 균일한 영역을 4분 트리 블록으로 묶어 한 덩어리로 갱신 (BlockMap)
+        self.blockTolerance = 0.01  # 균일로 보는 온도 폭 [°C]
+        self.showBlocks = False  # 화면에 균일 블록 테두리 표시
+        self.reactionSampling = "bernoulli"  # "bernoulli" (쌍마다 매 스텝 추첨) | "event" (계면별 다음 사건 시각)
+
+    def Apply(self, values):
+        # 이름으로 설정 덮어쓰기 (씬 파일, 명령줄). 오타는 조용히 무시하지 않는다
+        for key,value in values.items():
+            if not hasattr(self,key):
+                raise KeyError("unknown config key: %s" % key)
+            setattr(self,key,value)
+
+    def ApplyScene(self, scene):
+        # 그리드를 만들기 전에 적용해야 하는 씬 항목: 격자 크기와 설정값
+        if "grid" in scene:
+            self.gridWidth, self.gridHeight = ParseGridSize(scene["grid"])
+        self.Apply(scene.get("config",{}))
+
+def ParseGridSize(value):
+    # "512x512" 또는 [512,512]
+    if isinstance(value,str):
+        w,h = value.lower().split("x")
+        return int(w), int(h)
+    w,h = value
+    return int(w), int(h)
+
+def LoadSceneFile(path):
+    with open(path,"r",encoding="utf-8") as f:
+        return json.load(f)
+
+TOOL_TYPES = {"Beaker": Beaker, "Heater": Heater, "Cooler": Cooler}
+
+class SimulationManager:
+    def __init__(self, config):
+        self.config = config
+        self.matDB = MaterialDatabase()
+        self.matDB.LoadFromJSON(MATERIALS_JSON)
+        for path in config.materialLibraries:
+            self.matDB.LoadLibrary(path)
+        self.rxDB = ReactionDatabase()
+
+        self.grid = CellGrid(config.gridWidth,config.gridHeight,config.tileSize)
+        if config.seed is None:
+            # 저장한 상태/설정에 남아서 같은 실행을 다시 만들 수 있게
+            config.seed = int(np.random.SeedSequence().entropy % (1 << 63))
+        self.reactionEngine = ReactionEngine(self.matDB, self.rxDB, config)
+        self.fluidSolver = FluidSolver(self.matDB, config)
+        self.thermalSolver = ThermalSolver(self.matDB, config)
+        self.phaseSolver = PhaseSolver(self.matDB, config)
+        self.running = True
+        self.tools = []
+        self.toolIndex = ToolIndex()
+        self.commands = deque()
+        self.strokes = []  # 칠하는 중인 획
+        self.undoStack = deque()
+        self.stepCount = 0
+        self.profiler = Profiler(config.profileCapacity)
+        self.blockMap = BlockMap(self.grid.activity)
+        self.scheduler = StepScheduler(config)
+        self.recorder = Recorder(config)
+        self.distributed = None
+        self.initialized = False  # Initialize/LoadScene 중 하나로 초기 배치가 끝났는지
+        # 바뀐 타일: pendingDirty는 시뮬레이션 쪽에서만, dirtyTiles는 GUI와 공유 (잠금)
+        # 게시된 프레임에 반영된 뒤에 CommitDirty로 넘겨야 화면이 옛 프레임으로 남지 않는다
+        self.pendingDirty = np.zeros_like(self.grid.activity.touched)
+        self.dirtyTiles = np.zeros_like(self.grid.activity.touched)
+        self._dirtyLock = threading.Lock()
+        # 간단한 반응 추가: NaOH + H2SO4 -> Water
+        NaOH = self.matDB.nameToID["NaOH"]
+        H2SO4 = self.matDB.nameToID["H2SO4"]
+        Water = self.matDB.nameToID["Water"]
+        rx = Reaction(NaOH,H2SO4,[Water],0.01,50000,-500)
+        self.rxDB.AddReaction(rx)
+
+        # Ethanol + O2 -> CO2 (단순)
+        Ethanol = self.matDB.nameToID["Ethanol"]
+        O2 = self.matDB.nameToID["O2"]
+        CO2 = self.matDB.nameToID["CO2"]
+        rx2 = Reaction(Ethanol,O2,[CO2],0.05,80000,-800)
+        self.rxDB.AddReaction(rx2)
+
+    def Initialize(self):
+        # 스포너 설치: 맵 상단에 O2 공급
+        O2 = self.matDB.nameToID["O2"]
+        self.grid.SetSpawner(self.config.gridWidth//2,0,O2)
+
+        # 툴 설치: Heater 왼쪽 아래
+        self.tools.append(Heater("Heater",10,10,5,5))
+        self.tools.append(Cooler("Cooler",70,70,5,5))
+        self.tools.append(Beaker("Beaker",40,40,10,10))
+        self.initialized = True
+
+    def LoadScene(self, scene):
+        # 씬(dict)으로 초기 배치. 격자 크기/설정은 Config.ApplyScene으로 먼저 적용되어 있어야 함
+        # {"defaults": bool, "fill": 물질, "temperature": °C,
+        #  "regions": [{"material", "rect": [x,y,w,h], "temperature"}],
+        #  "spawners": [{"material", "x", "y"}], "tools": [{"type", "name", "rect"}],
+        #  "reactions": [{"reactants": [a,b], "products": [..], "A", "Ea", "deltaH"}]}
+        ids = self.matDB.nameToID
+        grid = self.grid
+        if scene.get("defaults",False):
+            self.Initialize()
+        if "fill" in scene:
+            grid.materialID[:] = ids[scene["fill"]]
+        if "temperature" in scene:
+            grid.temperature[:] = scene["temperature"]
+        for region in scene.get("regions",[]):
+            x,y,w,h = region["rect"]
+            x0, x1 = max(0,x), min(grid.width,x+w)
+            y0, y1 = max(0,y), min(grid.height,y+h)
+            if x0<x1 and y0<y1:
+                if "material" in region:
+                    grid.materialID[y0:y1,x0:x1] = ids[region["material"]]
+                grid.temperature[y0:y1,x0:x1] = region.get("temperature",20.0)
+        for sp in scene.get("spawners",[]):
+            grid.SetSpawner(sp["x"],sp["y"],ids[sp["material"]])
+        # 초기 배치의 상은 첫 스텝에서 온도로 정한다
+        grid.ResetPhase(np.s_[:,:])
+        for t in scene.get("tools",[]):
+            x,y,w,h = t["rect"]
+            self.tools.append(TOOL_TYPES[t["type"]](t.get("name",t["type"]),x,y,w,h))
+        for rx in scene.get("reactions",[]):
+            r1,r2 = [ids[n] for n in rx["reactants"]]
+            products = [ids[n] for n in rx.get("products",[])]
+            self.rxDB.AddReaction(Reaction(r1,r2,products,rx["A"],rx["Ea"],rx["deltaH"]))
+        grid.activity.WakeAll()
+        self.initialized = True
+
+    def SetGrid(self, grid):
+        # 그리드 교체 (상태 불러오기). 스텝 사이에서만 호출. 분산 모드면 새 그리드로 다시 시작
+        dist = self.distributed
+        if dist is not None:
+            self.distributed = None
+            dist.Close(copyBack=False)
+        self.grid = grid
+        self.blockMap = BlockMap(grid.activity)
+        # 되돌리기 항목은 옛 그리드의 셀 좌표라 버린다
+        self.strokes = []
+        self.undoStack.clear()
+        with self._dirtyLock:
+            self.pendingDirty = np.ones_like(grid.activity.touched)
+            self.dirtyTiles = np.zeros_like(grid.activity.touched)
+        grid.activity.WakeAll()
+        if dist is not None:
+            self.StartDistributed(dist.workers)
+
+    def StartDistributed(self, workers):
+        # 그리드를 공유 메모리로 옮기고 작업 프로세스 시작 (반응/유체 정렬/열 전도를 띠별로 계산)
+        from .distributed import DistributedSimulation
+        self.StopDistributed()
+        self.distributed = DistributedSimulation(self, workers)
+
+    def StopDistributed(self):
+        dist = self.distributed
+        if dist is not None:
+            self.distributed = None
+            dist.Close()
+
+    def Post(self, fn, *args):
+        # 그리드를 바꾸는 외부 요청(브러시, 스크립트)은 큐에 넣고 스텝 사이에 적용 (스레드 안전)
+        self.commands.append((fn,args))
+
+    def ApplyCommands(self):
+        while self.commands:
+            fn, args = self.commands.popleft()
+            fn(*args)
+        self.FlushStrokes()
+
+    def BeginStroke(self, stroke):
+        self.strokes.append(stroke)
+
+    def EndStroke(self, stroke):
+        stroke.finished = True
+
+    def FlushStrokes(self):
+        # 이번 스텝 경계까지 들어온 샘플을 획마다 한 번에 칠하고, 끝난 획은 되돌리기 스택으로
+        if not self.strokes:
+            return
+        remaining = []
+        for stroke in self.strokes:
+            stroke.Rasterize(self.grid)
+            if not stroke.finished:
+                remaining.append(stroke)
+            elif stroke.undo:
+                self.undoStack.append(stroke)
+                while len(self.undoStack) > max(0,self.config.undoLimit):
+                    self.undoStack.popleft()
+        self.strokes = remaining
+
+    def Undo(self):
+        if self.undoStack:
+            self.undoStack.pop().Undo(self.grid)
+
+    def TakeDirtyRects(self):
+        # 바뀐 타일을 행별 연속 구간으로 묶은 셀 사각형 (x0,y0,x1,y1) 목록, 호출 후 초기화
+        with self._dirtyLock:
+            dirty = self.dirtyTiles
+            self.dirtyTiles = np.zeros_like(dirty)
+        ts = self.grid.activity.tileSize
+        rects = []
+        for ty in np.nonzero(dirty.any(axis=1))[0]:
+            row = np.concatenate(([False],dirty[ty],[False]))
+            edges = np.nonzero(row[1:] != row[:-1])[0]
+            for tx0,tx1 in zip(edges[::2].tolist(),edges[1::2].tolist()):
+                rects.append((tx0*ts, int(ty)*ts, min(self.grid.width,tx1*ts), min(self.grid.height,(int(ty)+1)*ts)))
+        return rects
+
+    def CommitDirty(self):
+        with self._dirtyLock:
+            self.dirtyTiles |= self.pendingDirty
+        self.pendingDirty[:] = False
+
+    def Advance(self, elapsed):
+        # 화면/작업 스레드 틱: 벽시계 경과 시간을 고정 스텝으로 (StepScheduler)
+        return self.scheduler.Advance(self, elapsed)
+
+    def StepReactions(self, dt, substep):
+        engine = self.reactionEngine
+        fired = engine.firedCount if substep else 0
+        engine.substep = substep
+        engine.ProcessReactions(self.grid, dt)
+        engine.firedCount += fired
+
+    def StepFluid(self, dt, substep):
+        swapped = self.fluidSolver.swappedCount if substep else 0
+        self.fluidSolver.Solve(self.grid, dt)
+        self.fluidSolver.swappedCount += swapped
+
+    def StepThermal(self, dt, substep):
+        self.thermalSolver.Solve(self.grid, dt, self.blockMap if self.config.adaptiveBlocks else None)
+
+    def Update(self, dt):
+        self.ApplyCommands()
+        self.toolIndex.Sync(self.tools, self.grid)
+        if self.config.paused:
+            self.pendingDirty |= self.grid.activity.touched
+            return
+        self.stepCount += 1
+        self.reactionEngine.step = self.stepCount
+        dt *= self.config.simulationSpeed
+        activity = self.grid.activity
+        activity.enabled = self.config.activeTiles
+        self.reactionEngine.WakeDue(self.grid, dt)
+        activity.BeginStep()
+        if self.config.adaptiveBlocks and self.distributed is None:
+            self.blockMap.Update(self.grid, self.config.blockTolerance,
+                                 self.rxDB.GetPairTable(len(self.matDB.materials)))
+        else:
+            self.blockMap.collapsedTiles = 0
+        prof = self.profiler
+        prof.enabled = self.config.profiling
+        prof.Begin(self.stepCount)
+        self.grid.UpdateSpawners(self.config.spawnRate)
+        prof.Lap(0)
+        if self.distributed is not None:
+            # 반응/유체/열은 작업 프로세스들이 (단계마다 Lap)
+            self.distributed.Step(dt, prof)
+        else:
+            # 단계별 주기/하위 스텝 (StepScheduler). 건너뛴 스텝의 카운터는 0
+            sched = self.scheduler
+            if not sched.Run("reactions", self.stepCount, dt, self.reactionEngine.StableDt(), self.StepReactions):
+                self.reactionEngine.firedCount = 0
+            prof.Lap(1)
+            if not sched.Run("fluid", self.stepCount, dt, self.fluidSolver.StableDt(self.grid), self.StepFluid):
+                self.fluidSolver.swappedCount = 0
+            if self.config.adaptiveBlocks:
+                # 반응/정렬이 옆 타일을 바꿨으면 열 전도 전에 그 옆 균일 타일을 다시 검사
+                self.blockMap.Refresh(self.grid)
+            prof.Lap(2)
+            sched.Run("thermal", self.stepCount, dt, self.thermalSolver.StableDt(self.grid), self.StepThermal)
+            prof.Lap(3)
+        self.toolIndex.Apply(self.grid, self.matDB, dt, self.config.expertMode)
+        prof.Lap(4)
+        # 툴 가열/냉각까지 반영된 온도로 상 변화
+        self.phaseSolver.Solve(self.grid, dt)
+        prof.Lap(5)
+        prof.End(self.reactionEngine.firedCount, self.fluidSolver.swappedCount, len(activity.processList),
+                 self.phaseSolver.changedCount)
+        if self.config.recordTimeline:
+            self.recorder.Record(self.grid, self.stepCount)
+        self.pendingDirty |= activity.touched
+        activity.EndStep(self.config.sleepSteps)
+
+#--------------------------------------------
+# SimulationRunner: 작업 스레드에서 시뮬레이션, 더블 버퍼로 프레임 게시
+#--------------------------------------------
+class Frame:
+    # 렌더러가 읽는 그리드 스냅샷 (CellGrid와 같은 속성 이름)
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        shape = (height,width)
+        self.materialID = np.zeros(shape, dtype=np.int16)
+        self.temperature = np.zeros(shape, dtype=np.float64)
+        self.pressure = np.zeros(shape, dtype=np.float32)
+        self.processList = np.zeros((0,2), dtype=np.int64)
+        self.blocks = np.zeros((0,3), dtype=np.int64)  # 균일 블록 (BlockMap.blocks)
+        self.tileSize = 16
+        self.step = -1
+
+    def CopyFrom(self, grid, step, blocks=None):
+        np.copyto(self.materialID, grid.materialID)
+        np.copyto(self.temperature, grid.temperature)
+        np.copyto(self.pressure, grid.pressure)
+        self.processList = grid.activity.processList.copy()
+        self.blocks = blocks.copy() if blocks is not None else np.zeros((0,3), dtype=np.int64)
+        self.tileSize = grid.activity.tileSize
+        self.step = step
+
+class SimulationRunner:
+    # GUI 스레드 밖에서 SimulationManager.Update를 돌린다. 커널은 nogil이라 GUI와 병렬로 실행됨
+    # 게시: 뒤 버퍼에 복사 후 front 인덱스 교체. 읽는 쪽은 AcquireFrame/ReleaseFrame으로
+    # 잡고 있는 버퍼를 표시만 하며, 쓰는 쪽은 잡힌 버퍼에는 쓰지 않고 그 프레임 게시를 건너뛴다
+    # held 검사와 front 교체, front 읽기와 held 설정은 같은 잠금 안에서 (복사는 잠금 밖)
+    # 읽는 쪽은 front만 잡을 수 있으므로 검사를 통과한 뒤 복사 중인 뒤 버퍼는 교체 전까지 잡히지 않는다
+    def __init__(self, simManager):
+        self.simManager = simManager
+        grid = simManager.grid
+        self.frames = [Frame(grid.width,grid.height), Frame(grid.width,grid.height)]
+        self.front = 0
+        self.held = None
+        self._frameLock = threading.Lock()
+        self.droppedFrames = 0
+        self.lastStepTime = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        self.frames[0].CopyFrom(grid, simManager.stepCount, simManager.blockMap.blocks)
+
+    def Start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.Run, name="SimulationRunner", daemon=True)
+            self._thread.start()
+
+    def Stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def Run(self):
+        prevTime = time.perf_counter()
+        while not self._stop.is_set():
+            interval = self.simManager.config.updateIntervalMs/1000.0
+            currentTime = time.perf_counter()
+            dt = currentTime - prevTime
+            prevTime = currentTime
+            if self.simManager.running:
+                self.simManager.Advance(dt)
+                self.Publish()
+            self.lastStepTime = time.perf_counter()-currentTime
+            self._stop.wait(max(0.0, interval-self.lastStepTime))
+
+    def Publish(self):
+        with self._frameLock:
+            back = 1-self.front
+            if self.held == back:
+                self.droppedFrames += 1
+                return
+        grid = self.simManager.grid
+        if self.frames[back].width != grid.width or self.frames[back].height != grid.height:
+            self.frames[back] = Frame(grid.width,grid.height)
+        self.frames[back].CopyFrom(self.simManager.grid, self.simManager.stepCount, self.simManager.blockMap.blocks)
+        with self._frameLock:
+            self.front = back
+        self.simManager.CommitDirty()
+
+    def AcquireFrame(self):
+        with self._frameLock:
+            idx = self.front
+            self.held = idx
+        return self.frames[idx]
+
+    def ReleaseFrame(self):
+        with self._frameLock:
+            self.held = None
+
+#--------------------------------------------
+# Rendering: 그리드 배열 → 색 룩업 테이블로 RGB32 버퍼 생성
+#--------------------------------------------
+def _packRGB(r, g, b):
+    # 0~1 실수 → 0xFFRRGGBB (QImage.Format_RGB32 와 같은 배치)
+    r = (np.asarray(r)*255).astype(np.uint32)
+    g = (np.asarray(g)*255).astype(np.uint32)
+    b = (np.asarray(b)*255).astype(np.uint32)
+    return np.uint32(0xFF000000) | (r << 16) | (g << 8) | b
+
+class FrameRenderer:
+    LUT_SIZE = 1024
+
+    def __init__(self, matDB):
+        self.matDB = matDB
+        self._materialLUT = None
+        self._materialVersion = None
+        t = np.linspace(0.0,1.0,self.LUT_SIZE)
+        self.temperatureLUT = _packRGB(t, np.zeros_like(t), 1.0-t)
+        self.pressureLUT = _packRGB(t, t, t)
+        self._buf = None
+        self._idx = None
+
+    def GetMaterialLUT(self):
+        if self._materialVersion != self.matDB.version:
+            colors = np.array([m.color for m in self.matDB.materials], dtype=np.float64).reshape(-1,3)
+            self._materialLUT = _packRGB(colors[:,0], colors[:,1], colors[:,2])
+            self._materialVersion = self.matDB.version
+        return self._materialLUT
+
+    def _ScaleIndex(self, values, lo, span):
+        # (values-lo)/span 을 0~1로 자르고 LUT 인덱스로
+        idx = self._idx
+        if idx is None or idx.shape != values.shape:
+            idx = self._idx = np.empty(values.shape, dtype=np.float64)
+        np.subtract(values, lo, out=idx)
+        idx *= (self.LUT_SIZE-1)/span
+        np.clip(idx, 0, self.LUT_SIZE-1, out=idx)
+        return idx.astype(np.intp)
+
+    def Render(self, grid, displayMode, region=None):
+        # region = (x0,y0,x1,y1) 셀 범위만 그린다. 반환 버퍼는 연속 배열이며 다음 Render 호출까지 유효
+        if region is None:
+            region = (0,0,grid.width,grid.height)
+        x0,y0,x1,y1 = region
+        sel = (slice(y0,y1),slice(x0,x1))
+        shape = (y1-y0,x1-x0)
+        if self._buf is None or self._buf.shape != shape:
+            self._buf = np.empty(shape, dtype=np.uint32)
+        if displayMode == "Temperature":
+            np.take(self.temperatureLUT, self._ScaleIndex(grid.temperature[sel], -200.0, 1200.0), out=self._buf)
+        elif displayMode == "Pressure":
+            np.take(self.pressureLUT, self._ScaleIndex(grid.pressure[sel], 100000.0, 200000.0), out=self._buf)
+        else:
+            np.take(self.GetMaterialLUT(), grid.materialID[sel], out=self._buf)
+        return self._buf
@@ -0,0 +1,186 @@
+import json
+import threading
+import numpy as np
+
+from .simulation import CellGrid, Reaction, TOOL_TYPES
+
+#--------------------------------------------
+# State files: 그리드 필드 + 물질/반응 DB + Config + 툴 저장/불러오기
+#--------------------------------------------
+# 두 형식:
+#  .npz  압축 (np.savez_compressed). 불러올 때 전부 읽는다
+#  .pcs  비압축. [MAGIC][헤더 길이 uint64][JSON 헤더] 뒤에 PAGE 정렬된 배열 원본
+#        불러올 때 np.memmap(copy-on-write)으로 열어서 건드린 페이지만 읽는다
+MAGIC = b"PCUBEST\x01"
+PAGE = 4096
+FORMAT_VERSION = 2
+
+# 불러올 때 되살리는 Config 키: 결과를 정하는 물리/시뮬레이션 설정만
+# 화면/입력/실행 방식 (보기, 멈춤, 스레드/분산, 프로파일러, 기록, 난수 백엔드 등)은 지금 세션 것을 유지한다
+STATE_CONFIG_KEYS = (
+    "expertMode", "reactionPrecision", "spawnRate", "simulationSpeed", "seed",
+    "thermalBackend", "thermalMode", "cellSize", "implicitTolerance", "implicitMaxIterations",
+    "activeTiles", "sleepSteps", "sleepThreshold", "settleIterations", "fluidMode", "thermalExpansion",
+    "projectionTolerance", "projectionMaxIterations", "phaseChanges", "gasExpansion",
+    "fixedTimeStep", "maxSubsteps", "reactionInterval", "fluidInterval", "thermalInterval",
+    "maxReactionProbability", "cflNumber", "adaptiveBlocks", "blockTolerance", "reactionSampling",
+)
+
+def _Align(n):
+    return -(-n//PAGE)*PAGE
+
+def CaptureState(simManager):
+    # 스텝 사이에 호출. 배열은 복사본이라 이후 저장은 다른 스레드에서 해도 된다
+    grid = simManager.grid
+    meta = {
+        "version": FORMAT_VERSION,
+        "step": simManager.stepCount,
+        "grid": {"width": grid.width, "height": grid.height, "tileSize": grid.activity.tileSize},
+        "config": dict(vars(simManager.config)),
+        "materials": simManager.matDB.ToJSON(),
+        "reactions": [{"reactants": [r.reactant1,r.reactant2], "products": list(r.products),
+                       "A": r.A, "Ea": r.Ea, "deltaH": r.deltaH} for r in simManager.rxDB.reactions],
+        "tools": [{"type": type(t).__name__, "name": t.name, "rect": [t.x,t.y,t.w,t.h]} for t in simManager.tools],
+    }
+    arrays = {name: getattr(grid,name).copy() for name in grid.FIELDS}
+    meta["runtime"], runtime = _CaptureRuntime(simManager)
+    arrays.update(runtime)
+    return meta, arrays
+
+# 필드 밖에서 다음 스텝 결과를 바꾸는 상태 (버전 2부터). 이어 돌린 실행이 끊지 않은 실행과 같아지게
+#  활성 타일 잠 카운터, 스포너 소수 누적, 스텝 스케줄러 누적 시간, 직전 반응률 (하위 스텝 수),
+#  사건 모드 반응 시계 (힙은 tileNext로 다시 만든다), 반복 솔버의 초기값 (오일러 압력, 암시적 열 증분)
+# 분산 모드 작업자가 띠마다 들고 있는 시계는 저장하지 않는다
+def _CaptureRuntime(simManager):
+    grid = simManager.grid
+    act = grid.activity
+    sched = simManager.scheduler
+    engine = simManager.reactionEngine
+    meta = {"spawnCredit": grid.spawnCredit, "accumulator": sched.accumulator, "pending": dict(sched.pending),
+            "maxRate": engine.maxRate}
+    arrays = {"activity.quiet": act.quiet.copy(), "activity.active": act.active.copy(),
+              "activity.touched": act.touched.copy()}
+    clock = engine._clocks.get(grid)
+    if clock is not None:
+        meta["clockTime"] = clock.time
+        arrays.update({"clock.fireAt": clock.fireAt.copy(), "clock.rate": clock.rate.copy(),
+                       "clock.tileNext": clock.tileNext.copy()})
+    if simManager.fluidSolver._p is not None:
+        arrays["fluid.pressure"] = simManager.fluidSolver._p.copy()
+    if simManager.thermalSolver._lastDelta is not None:
+        arrays["thermal.delta"] = simManager.thermalSolver._lastDelta.copy()
+    return meta, arrays
+
+def _RestoreRuntime(simManager, meta, arrays):
+    # SetGrid 뒤에 호출 (새 그리드의 활성 맵/시계에 덮어쓴다)
+    grid = simManager.grid
+    act = grid.activity
+    sched = simManager.scheduler
+    engine = simManager.reactionEngine
+    grid.spawnCredit = meta["spawnCredit"]
+    sched.accumulator = meta["accumulator"]
+    sched.pending.update(meta["pending"])
+    engine.maxRate = meta["maxRate"]
+    act.quiet[:] = arrays["activity.quiet"]
+    act.active[:] = arrays["activity.active"]
+    act.touched[:] = arrays["activity.touched"]
+    if "clockTime" in meta:
+        clock = engine.GetClock(grid)
+        clock.time = meta["clockTime"]
+        clock.fireAt[:] = arrays["clock.fireAt"]
+        clock.rate[:] = arrays["clock.rate"]
+        clock.tileNext[:] = arrays["clock.tileNext"]
+        clock.Rebuild()
+    simManager.fluidSolver._p = np.array(arrays["fluid.pressure"]) if "fluid.pressure" in arrays else None
+    simManager.thermalSolver._lastDelta = np.array(arrays["thermal.delta"]) if "thermal.delta" in arrays else None
+
+def WriteState(path, meta, arrays, compressed=None):
+    if compressed is None:
+        compressed = path.endswith(".npz")
+    if compressed:
+        np.savez_compressed(path, meta=np.array(json.dumps(meta)), **arrays)
+        return
+    header = {"meta": meta, "arrays": {}}
+    offset = 0
+    for name,a in arrays.items():
+        header["arrays"][name] = {"dtype": a.dtype.str, "shape": list(a.shape), "offset": offset}
+        offset = _Align(offset+a.nbytes)
+    headerBytes = json.dumps(header).encode("utf-8")
+    dataStart = _Align(len(MAGIC)+8+len(headerBytes))
+    with open(path,"wb") as f:
+        f.write(MAGIC)
+        f.write(np.uint64(len(headerBytes)).tobytes())
+        f.write(headerBytes)
+        for name,a in arrays.items():
+            f.seek(dataStart+header["arrays"][name]["offset"])
+            f.write(memoryview(np.ascontiguousarray(a)).cast("B"))
+        f.truncate(dataStart+offset)
+
+def ReadState(path):
+    # (meta, arrays). .pcs는 copy-on-write memmap이라 여는 비용이 크기와 무관
+    meta, arrays = _ReadState(path)
+    g = meta["grid"]
+    if "latent" not in arrays:
+        # 상 변화 이전에 저장된 파일: 잠열 저장 없음
+        arrays["latent"] = np.zeros((g["height"],g["width"]), dtype=np.float32)
+    for name in CellGrid.FIELDS:
+        if name not in arrays or arrays[name].shape != (g["height"],g["width"]):
+            raise ValueError("state file %s: field %s is missing or has the wrong shape" % (path, name))
+    return meta, arrays
+
+def _ReadState(path):
+    with open(path,"rb") as f:
+        magic = f.read(len(MAGIC))
+        if magic == MAGIC:
+            n = int(np.frombuffer(f.read(8), dtype=np.uint64)[0])
+            header = json.loads(f.read(n).decode("utf-8"))
+            dataStart = _Align(len(MAGIC)+8+n)
+        else:
+            header = None
+    if header is None:
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            arrays = {name: data[name] for name in data.files if name != "meta"}
+        return meta, arrays
+    arrays = {}
+    for name,info in header["arrays"].items():
+        mm = np.memmap(path, dtype=np.dtype(info["dtype"]), mode="c",
+                       offset=dataStart+info["offset"], shape=tuple(info["shape"]))
+        arrays[name] = mm.view(np.ndarray)
+    return header["meta"], arrays
+
+def RestoreState(simManager, meta, arrays):
+    # 기존 SimulationManager에 상태를 덮어쓴다 (솔버들이 들고 있는 DB 객체는 그대로 유지)
+    if meta.get("version",0) > FORMAT_VERSION:
+        raise ValueError("state file version %s is newer than supported (%d)" % (meta["version"], FORMAT_VERSION))
+    config = simManager.config
+    config.Apply({k: v for k,v in meta["config"].items() if k in STATE_CONFIG_KEYS})
+    simManager.matDB.LoadFromJSON(meta["materials"])
+    simManager.rxDB.Clear()
+    for rx in meta["reactions"]:
+        r1,r2 = rx["reactants"]
+        simManager.rxDB.AddReaction(Reaction(r1,r2,rx["products"],rx["A"],rx["Ea"],rx["deltaH"]))
+    simManager.tools = [TOOL_TYPES[t["type"]](t["name"],*t["rect"]) for t in meta["tools"]]
+    g = meta["grid"]
+    grid = CellGrid(g["width"], g["height"], g["tileSize"], fields={name: arrays[name] for name in CellGrid.FIELDS})
+    config.gridWidth, config.gridHeight, config.tileSize = g["width"], g["height"], g["tileSize"]
+    simManager.SetGrid(grid)
+    simManager.recorder.Clear()
+    simManager.stepCount = meta["step"]  # 반응 난수는 config.seed와 이 스텝 번호로 정해진다
+    if "runtime" in meta:
+        _RestoreRuntime(simManager, meta["runtime"], arrays)
+    simManager.initialized = True
+
+def SaveState(simManager, path, compressed=None, background=True):
+    # 캡처(메모리 복사)만 호출한 스레드에서 하고 파일 쓰기는 백그라운드 스레드에서
+    meta, arrays = CaptureState(simManager)
+    if not background:
+        WriteState(path, meta, arrays, compressed)
+        return None
+    thread = threading.Thread(target=WriteState, args=(path, meta, arrays, compressed), name="SaveState", daemon=False)
+    thread.start()
+    return thread
+
+def LoadState(simManager, path):
+    meta, arrays = ReadState(path)
+    RestoreState(simManager, meta, arrays)
@@ -0,0 +1,217 @@
+import os
+import json
+import time
+import hashlib
+import itertools
+import multiprocessing
+import concurrent.futures
+import numpy as np
+
+from .simulation import Config, SimulationManager, CellGrid, ParseGridSize, LoadSceneFile
+from .shared import SharedArrays
+
+#--------------------------------------------
+# Parameter sweep: 매개변수 격자의 각 조합을 프로세스 풀에서 독립 실행
+#--------------------------------------------
+# 명세(JSON):
+#  {"scene": 파일 경로 또는 씬 dict, "grid": "256x256", "steps": 500, "dt": 0.016,
+#   "seed": 0, "replicates": 1, "product": "Water",
+#   "parameters": {"reaction.0.A": [..], "reaction.1.Ea": [..], "config.reactionPrecision": [..],
+#                  "temperature": [..], "region.0.temperature": [..]}}
+# reaction.N: SimulationManager 기본 반응 뒤에 씬 반응이 이어지는 rxDB.reactions 인덱스
+# temperature / region.N.temperature: 씬의 초기 온도를 덮어쓴다
+#
+# 씬으로 만든 초기 그리드와 물성 테이블은 부모가 한 번 만들어 공유 메모리에 올리고
+# 작업자는 읽기 전용으로 붙어서 자기 그리드로 복사만 한다
+# 결과는 실행마다 한 줄씩 JSONL로 즉시 기록, 같은 파일로 다시 실행하면 끝난 조합은 건너뛴다
+# 행마다 명세 해시(SpecHash)를 남겨서, 조합 밖의 설정이 바뀐 명세로는 이어 돌리지 않는다
+def SpecHash(spec):
+    # 실행 결과를 정하는 조합 밖의 모든 것: 풀어낸 기본 Config, 씬 내용, steps, dt, product
+    scene = _LoadSpecScene(spec)
+    resolved = {"config": vars(_BaseConfig(spec, scene)), "scene": scene, "steps": spec.get("steps",500),
+                "dt": spec.get("dt",0.016), "product": spec.get("product")}
+    text = json.dumps(resolved, sort_keys=True, default=str)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+def ExpandRuns(spec):
+    params = spec.get("parameters",{})
+    names = sorted(params)
+    specHash = SpecHash(spec)
+    runs = []
+    for values in itertools.product(*[params[n] for n in names]):
+        for rep in range(spec.get("replicates",1)):
+            runs.append({"params": dict(zip(names,values)), "seed": spec.get("seed",0)+rep, "spec": specHash})
+    return runs
+
+def RunKey(run):
+    return json.dumps([run["spec"], run["params"], run["seed"]], sort_keys=True)
+
+def _BaseConfig(spec, scene):
+    config = Config()
+    config.ApplyScene(scene)
+    if "grid" in spec:
+        config.gridWidth, config.gridHeight = ParseGridSize(spec["grid"])
+    config.Apply(spec.get("config",{}))
+    return config
+
+def _LoadSpecScene(spec):
+    scene = spec.get("scene",{})
+    return LoadSceneFile(scene) if isinstance(scene,str) else scene
+
+TABLES = ("density","specificHeat","thermalConductivity","meltingPoint","boilingPoint")
+
+def BuildSharedBase(spec):
+    # 부모에서 씬을 한 번 적용한 초기 그리드 + 물성 테이블
+    scene = _LoadSpecScene(spec)
+    sim = SimulationManager(_BaseConfig(spec, scene))
+    sim.LoadScene(scene)
+    arrays = {name: getattr(sim.grid,name) for name in sim.grid.FIELDS}
+    for attr in TABLES:
+        arrays["table."+attr] = sim.matDB.GetPropertyTable(attr)
+    return SharedArrays.Create(arrays)
+
+#--------------------------------------------
+# 작업자
+#--------------------------------------------
+_worker = {}
+
+def _InitWorker(shmName, layout, spec, threads):
+    if threads:
+        import numba
+        numba.set_num_threads(threads)
+    _worker["shared"] = SharedArrays.Attach(shmName, layout)
+    _worker["spec"] = spec
+    _worker["scene"] = _LoadSpecScene(spec)
+
+def MakeRunSimulation(spec, scene, shared, run):
+    params = run["params"]
+    config = _BaseConfig(spec, scene)
+    config.Apply({k[len("config."):]: v for k,v in params.items() if k.startswith("config.")})
+    config.seed = run["seed"]
+    sim = SimulationManager(config)
+    # 스포너/툴/반응은 씬 그대로, 그리드는 공유 초기 상태의 복사본
+    sim.LoadScene({k: v for k,v in scene.items() if k in ("spawners","tools","reactions","defaults")})
+    fields = {name: shared.arrays[name].copy() for name in CellGrid.FIELDS}
+    sim.SetGrid(CellGrid(config.gridWidth, config.gridHeight, config.tileSize, fields=fields))
+    sim.matDB.SetPropertyTables({attr: shared.arrays["table."+attr] for attr in TABLES})
+    grid = sim.grid
+    if "temperature" in params:
+        grid.temperature[:] = params["temperature"]
+        for region in scene.get("regions",[]):
+            x,y,w,h = region["rect"]
+            grid.temperature[max(0,y):y+h,max(0,x):x+w] = region.get("temperature",20.0)
+    for i,region in enumerate(scene.get("regions",[])):
+        key = "region.%d.temperature" % i
+        if key in params:
+            x,y,w,h = region["rect"]
+            grid.temperature[max(0,y):y+h,max(0,x):x+w] = params[key]
+    for key,value in params.items():
+        if key.startswith("reaction."):
+            _, index, attr = key.split(".")
+            if attr not in ("A","Ea","deltaH"):
+                raise KeyError("unknown reaction parameter: %s" % key)
+            setattr(sim.rxDB.reactions[int(index)], attr, value)
+    return sim
+
+def RunOne(spec, scene, shared, run):
+    # 요약 지표: 생성물 수율, 최고 온도, 완료 시간(최종 수율의 95%에 도달한 시점)
+    sim = MakeRunSimulation(spec, scene, shared, run)
+    steps, dt = spec.get("steps",500), spec.get("dt",0.016)
+    product = sim.matDB.nameToID[spec["product"]] if "product" in spec else None
+    grid = sim.grid
+    initial = int(np.count_nonzero(grid.materialID == product)) if product is not None else 0
+    produced = np.zeros(steps, dtype=np.int64)
+    peak = float(grid.temperature.max())
+    fired = 0
+    t0 = time.perf_counter()
+    for i in range(steps):
+        sim.Update(dt)
+        sim.pendingDirty[:] = False
+        fired += sim.reactionEngine.firedCount
+        peak = max(peak, float(grid.temperature.max()))
+        if product is not None:
+            produced[i] = np.count_nonzero(grid.materialID == product)-initial
+    finalYield = int(produced[-1]) if steps else 0
+    completion = None
+    if finalYield > 0:
+        completion = (int(np.argmax(produced >= 0.95*finalYield))+1)*dt*sim.config.simulationSpeed
+    return {"key": RunKey(run), "spec": run["spec"], "params": run["params"], "seed": run["seed"],
+            "productYield": finalYield, "yieldFraction": finalYield/grid.materialID.size,
+            "peakTemperature": peak, "completionTime": completion, "reactionsFired": fired,
+            "finalMeanTemperature": float(grid.temperature.mean()), "wallTime": time.perf_counter()-t0}
+
+def _RunInWorker(run):
+    return RunOne(_worker["spec"], _worker["scene"], _worker["shared"], run)
+
+#--------------------------------------------
+# 실행
+#--------------------------------------------
+def LoadResults(path):
+    rows = []
+    if os.path.exists(path):
+        with open(path,"r",encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    try:
+                        rows.append(json.loads(line))
+                    except ValueError:
+                        pass  # 중단될 때 잘린 마지막 줄
+    return rows
+
+def RunSweep(spec, out, workers=None, resume=True, log=None):
+    runs = ExpandRuns(spec)
+    done = set()
+    if resume:
+        rows = LoadResults(out)
+        specHash = runs[0]["spec"] if runs else SpecHash(spec)
+        stale = [r for r in rows if r.get("spec") != specHash]
+        if stale:
+            raise ValueError("%s has %d rows from a different sweep spec (steps, dt, grid, scene or config changed); "
+                             "write to another file or start fresh (--fresh)" % (out, len(stale)))
+        done = {r["key"] for r in rows}
+    elif os.path.exists(out):
+        os.remove(out)
+    pending = [r for r in runs if RunKey(r) not in done]
+    if log is not None:
+        log.write("%d runs, %d already done, %d to run\n" % (len(runs), len(runs)-len(pending), len(pending)))
+    if not pending:
+        return LoadResults(out)
+    if os.path.exists(out) and os.path.getsize(out):
+        # 중단으로 잘린 마지막 줄 뒤에 이어 쓰지 않게
+        with open(out,"rb+") as f:
+            f.seek(-1,2)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+    workers = workers or os.cpu_count() or 1
+    shared = BuildSharedBase(spec)
+    try:
+        ctx = multiprocessing.get_context("spawn")
+        # 작업자 여럿이면 각자 numba 스레드 하나 (코어 과점 방지)
+        threads = 1 if workers > 1 else 0
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_InitWorker,
+                                                    initargs=(shared.shm.name, shared.layout, spec, threads)) as pool, \
+             open(out,"a",encoding="utf-8") as f:
+            futures = [pool.submit(_RunInWorker, run) for run in pending]
+            for n,future in enumerate(concurrent.futures.as_completed(futures),1):
+                row = future.result()
+                f.write(json.dumps(row)+"\n")
+                f.flush()
+                if log is not None:
+                    log.write("[%d/%d] %s yield=%d peak=%.1f\n" % (n, len(pending), row["params"], row["productYield"], row["peakTemperature"]))
+                    log.flush()
+    finally:
+        shared.Close(unlink=True)
+    return LoadResults(out)
+
+def WriteTable(rows, path):
+    # 한 행에 한 실행: 매개변수 열 + 지표 열 (CSV)
+    import csv
+    paramNames = sorted({k for r in rows for k in r["params"]})
+    metrics = ["seed","productYield","yieldFraction","peakTemperature","completionTime","reactionsFired",
+               "finalMeanTemperature","wallTime"]
+    with open(path,"w",encoding="utf-8",newline="") as f:
+        w = csv.writer(f)
+        w.writerow(paramNames+metrics)
+        for r in sorted(rows, key=lambda r: (json.dumps(r["params"],sort_keys=True), r["seed"])):
+            w.writerow([r["params"].get(n) for n in paramNames]+[r.get(m) for m in metrics])
@@ -0,0 +1,57 @@
+from powercube.simulation import Config, SimulationManager, Reaction
+
+#--------------------------------------------
+# 잠든 타일 건너뛰기 (activeTiles)
+#--------------------------------------------
+def _FiredPerWindow(activeTiles, sampling, windows=4, steps=300):
+    # 64x64: 위 절반 Au, 아래 절반 SiO2. 생성물 없는 반응이라 계면이 계속 남는다
+    config = Config()
+    config.gridWidth = config.gridHeight = 64
+    config.seed = 11
+    config.expertMode = False
+    config.activeTiles = activeTiles
+    config.reactionSampling = sampling
+    sim = SimulationManager(config)
+    grid = sim.grid
+    ids = sim.matDB.nameToID
+    grid.materialID[:] = ids["SiO2"]
+    grid.materialID[:32] = ids["Au"]
+    grid.ResetPhase(Ellipsis)
+    grid.temperature[:] = 20.0
+    sim.rxDB.AddReaction(Reaction(ids["Au"], ids["SiO2"], [], 1.0, 0.0, -0.1))
+    sim.initialized = True
+    grid.activity.WakeAll()
+    out = []
+    for w in range(windows):
+        fired = 0
+        for i in range(steps):
+            sim.Update(1/60)
+            fired += sim.reactionEngine.firedCount
+        out.append(fired)
+    return out
+
+def test_ReactiveTilesStayAwake():
+    # 반응 계면이 있는 타일이 잠들면 반응이 멈춘다: 켜고 끈 결과가 같아야 함
+    assert _FiredPerWindow(True, "bernoulli") == _FiredPerWindow(False, "bernoulli")
+
+def test_EventHeapWakesSleepingTiles():
+    # 사건 모드: 잠든 타일은 예정 시각에 힙이 깨운다
+    assert _FiredPerWindow(True, "event") == _FiredPerWindow(False, "event")
+
+def test_CellEditWakesSleepingTile():
+    # Cell 뷰로 쓴 값은 잠든 타일에서도 다음 스텝에 계산된다
+    config = Config()
+    config.gridWidth = config.gridHeight = 64
+    config.seed = 1
+    sim = SimulationManager(config)
+    grid = sim.grid
+    grid.materialID[:] = sim.matDB.nameToID["Fe"]
+    grid.ResetPhase(Ellipsis)
+    grid.temperature[:] = 20.0
+    sim.initialized = True
+    for i in range(config.sleepSteps+2):
+        sim.Update(1/60)
+    assert len(grid.activity.processList) == 0
+    grid.GetCell(40,40).temperature = 500.0
+    sim.Update(1/60)
+    assert grid.temperature[40,41] > 20.0
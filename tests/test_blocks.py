@@ -0,0 +1,54 @@
+import numpy as np
+from powercube.simulation import Config, SimulationManager, Reaction
+
+#--------------------------------------------
+# 균일 블록 (adaptiveBlocks)
+#--------------------------------------------
+def _Slab(adaptive, tolerance=0.05, width=128):
+    # Fe 한 덩어리에 허용치보다 작은 기울기 + 왼쪽 뜨거운 띠
+    config = Config()
+    config.gridWidth = config.gridHeight = width
+    config.seed = 3
+    config.activeTiles = False
+    config.adaptiveBlocks = adaptive
+    config.blockTolerance = tolerance
+    sim = SimulationManager(config)
+    grid = sim.grid
+    grid.materialID[:] = sim.matDB.nameToID["Fe"]
+    grid.ResetPhase(Ellipsis)
+    grid.temperature[:] = 20.0+0.001*np.arange(width)[None,:]
+    grid.temperature[:,:8] = 60.0
+    sim.initialized = True
+    return sim
+
+def test_BlocksFollowFineSolution():
+    # 블록은 한 덩어리로 갱신되지만 작은 기울기도 풀린다: 셀 단위 결과와 허용치 안에서 같아야 함
+    coarse, fine = _Slab(True), _Slab(False)
+    levels = 0
+    for i in range(200):
+        coarse.Update(1/60)
+        fine.Update(1/60)
+        if len(coarse.blockMap.blocks):
+            levels = max(levels, int(coarse.blockMap.blocks[:,2].max()))
+    assert levels >= 1
+    assert np.abs(coarse.grid.temperature-fine.grid.temperature).max() <= coarse.config.blockTolerance
+
+def test_BlocksRefineWhenPainted():
+    sim = _Slab(True)
+    for i in range(5):
+        sim.Update(1/60)
+    assert sim.blockMap.collapsedTiles > 0
+    # 칠한 타일은 다음 스텝에 블록에서 빠진다
+    sim.grid.materialID[70:74,70:74] = sim.matDB.nameToID["Cu"]
+    sim.grid.activity.Wake(70,70,74,74)
+    sim.Update(1/60)
+    ts = sim.grid.activity.tileSize
+    assert sim.blockMap.owner[70//ts,70//ts] < 0
+
+def test_SelfReactionNotCollapsed():
+    sim = _Slab(True)
+    Fe = sim.matDB.nameToID["Fe"]
+    sim.rxDB.AddReaction(Reaction(Fe, Fe, [], 1.0, 0.0, 0.0))
+    for i in range(5):
+        sim.Update(1/60)
+    assert sim.blockMap.collapsedTiles == 0
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+from powercube.simulation import MultigridPCG, _implicitApply
+
+#--------------------------------------------
+# 멀티그리드 전처리 CG (암시적 열 모드)
+#--------------------------------------------
+def _Poisson(n):
+    # 알려진 해 X로 B = (a + L) X를 만든다. a가 작아 거의 순수 포아송 (단열 경계)
+    y, x = np.mgrid[0:n,0:n]/n
+    X = np.sin(3*np.pi*x)*np.cos(2*np.pi*y)+x*y
+    a = np.full((n,n), 1e-3)
+    kx = np.ones((n,n-1))
+    ky = np.ones((n-1,n))
+    B = np.empty_like(X)
+    _implicitApply(a, kx, ky, X, B)
+    return a, kx, ky, B, X
+
+@pytest.mark.parametrize("n", [63, 128, 255])
+def test_MultigridPCGConverges(n):
+    a, kx, ky, B, expected = _Poisson(n)
+    solver = MultigridPCG()
+    solver.Setup(a, kx, ky)
+    X = np.zeros_like(B)
+    iterations = solver.Solve(B, X, 1e-10, 200)
+    # 전처리 덕분에 반복 횟수는 격자 크기에 거의 무관
+    assert iterations < 60
+    assert np.abs(X-expected).max() < 1e-8
+
+def test_MultigridPCGWarmStart():
+    a, kx, ky, B, expected = _Poisson(64)
+    solver = MultigridPCG()
+    solver.Setup(a, kx, ky)
+    X = expected.copy()
+    assert solver.Solve(B, X, 1e-10, 200) == 0
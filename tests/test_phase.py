@@ -0,0 +1,50 @@
+import numpy as np
+from powercube.simulation import Config, SimulationManager, PHASE_SHIFT, PHASE_SOLID, PHASE_LIQUID, PHASE_GAS
+
+#--------------------------------------------
+# 상 변화 (엔탈피 방식)
+#--------------------------------------------
+def _Ice():
+    # 물만 있는 격자, 녹는점 아래에서 시작
+    config = Config()
+    config.gridWidth = config.gridHeight = 32
+    config.activeTiles = False
+    sim = SimulationManager(config)
+    grid = sim.grid
+    water = sim.matDB.nameToID["Water"]
+    grid.materialID[:] = water
+    grid.ResetPhase(Ellipsis)
+    grid.temperature[:] = np.linspace(-30.0, -1.0, grid.temperature.size).reshape(grid.temperature.shape)
+    sim.phaseSolver.Solve(grid, 0.05)
+    return sim, sim.matDB.GetMaterial(water)
+
+def _Phase(grid):
+    return (grid.flags >> PHASE_SHIFT) & 3
+
+def _Enthalpy(grid, m):
+    # 고체 기준 비엔탈피 [J/kg]: 현열 + 쌓인 잠열 + 지나온 상의 잠열
+    p = _Phase(grid)
+    return (m.specificHeat*grid.temperature+grid.latent.astype(np.float64)
+            +m.latentHeatFusion*(p>=PHASE_LIQUID)+m.latentHeatVaporization*(p>=PHASE_GAS))
+
+def test_LatentHeatConserved():
+    # 열을 조금씩 넣어 녹이고 끓인 뒤 같은 열을 빼면 원래 상태로: 넣은 열은 모두 엔탈피로
+    sim, m = _Ice()
+    grid = sim.grid
+    assert (_Phase(grid) == PHASE_SOLID).all()
+    start = _Enthalpy(grid, m)
+    startT = grid.temperature.copy()
+    heat = np.random.default_rng(0).uniform(0.0, 2e5, grid.temperature.shape)
+    for i in range(30):
+        grid.temperature += heat/m.specificHeat
+        sim.phaseSolver.Solve(grid, 0.05)
+        # latent는 float32라 그만큼의 반올림만 허용
+        assert np.allclose(_Enthalpy(grid, m), start+(i+1)*heat, rtol=1e-6, atol=1.0)
+    phases = _Phase(grid)
+    assert (phases == PHASE_LIQUID).any() and (phases == PHASE_GAS).any()
+    for i in range(30):
+        grid.temperature -= heat/m.specificHeat
+        sim.phaseSolver.Solve(grid, 0.05)
+    assert (_Phase(grid) == PHASE_SOLID).all()
+    assert np.allclose(_Enthalpy(grid, m), start, rtol=0.0, atol=1.0)
+    assert np.allclose(grid.temperature, startT, rtol=0.0, atol=1e-3)
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+from powercube.simulation import PhiloxUniform
+
+#--------------------------------------------
+# Philox4x32-10 (Random123 기지 답 벡터)
+#--------------------------------------------
+# (카운터 4워드, 열쇠 2워드, 출력 앞 2워드). PhiloxUniform은 출력 0,1번 워드로 실수를 만든다
+KNOWN_ANSWERS = [
+    ((0x00000000,0x00000000,0x00000000,0x00000000), (0x00000000,0x00000000), (0x6627e8d5,0xe169c58d)),
+    ((0xffffffff,0xffffffff,0xffffffff,0xffffffff), (0xffffffff,0xffffffff), (0x408f276d,0x41c83b0e)),
+    ((0x243f6a88,0x85a308d3,0x13198a2e,0x03707344), (0xa4093822,0x299f31d0), (0xd16cfe09,0x94fdcceb)),
+]
+
+def _Uniform(w0, w1):
+    return ((w0 >> 5)*67108864.0+(w1 >> 6))/9007199254740992.0
+
+@pytest.mark.parametrize("parallel", [True, False])
+@pytest.mark.parametrize("counter,key,expected", KNOWN_ANSWERS)
+def test_PhiloxKnownAnswers(counter, key, expected, parallel):
+    # 카운터 = (키 하위, 키 상위, step, lane), 열쇠 = seed 하위/상위 32비트
+    keys = np.array([counter[1] << 32 | counter[0]], dtype=np.uint64).view(np.int64)
+    seed = key[1] << 32 | key[0]
+    out = PhiloxUniform(seed, counter[2], keys, counter[3], parallel=parallel)
+    assert out[0] == _Uniform(*expected)
+
+def test_PhiloxPathsAgree():
+    keys = np.random.default_rng(0).integers(-2**63, 2**63-1, 4096, dtype=np.int64)
+    assert np.array_equal(PhiloxUniform(12345, 77, keys, 2, parallel=True),
+                          PhiloxUniform(12345, 77, keys, 2, parallel=False))
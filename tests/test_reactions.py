@@ -0,0 +1,38 @@
+import numpy as np
+from powercube.simulation import Config, SimulationManager
+
+#--------------------------------------------
+# 계면 찾기 (반응 쌍 표)
+#--------------------------------------------
+def _Mixed():
+    # 반응물 몇 가지를 무작위로 섞은 격자 (타일 크기로 나누어떨어지지 않는 크기)
+    config = Config()
+    config.gridWidth, config.gridHeight = 70, 45
+    config.activeTiles = False
+    sim = SimulationManager(config)
+    sim.Initialize()
+    ids = sim.matDB.nameToID
+    choices = [ids[name] for name in ("NaOH","H2SO4","Water","Fe","Cu")]
+    sim.grid.materialID[:] = np.random.default_rng(5).choice(choices, size=sim.grid.materialID.shape)
+    sim.grid.activity.WakeAll()
+    sim.grid.activity.BeginStep()
+    return sim
+
+def test_FindInterfacesMatchesPairs():
+    # 오른쪽/아래 이웃 쌍을 하나씩 표에서 찾은 결과와 같은 집합
+    sim = _Mixed()
+    grid = sim.grid
+    engine = sim.reactionEngine
+    table = sim.rxDB.GetPairTable(len(sim.matDB.materials))
+    expected = set()
+    mat = grid.materialID
+    for y in range(grid.height):
+        for x in range(grid.width):
+            for y2,x2 in ((y,x+1),(y+1,x)):
+                if y2 < grid.height and x2 < grid.width and table[mat[y,x],mat[y2,x2]] >= 0:
+                    expected.add((y,x,y2,x2,int(table[mat[y,x],mat[y2,x2]])))
+    ys, xs, ys2, xs2, rxIdx = engine.FindInterfaces(grid)
+    found = set(zip(ys.tolist(), xs.tolist(), ys2.tolist(), xs2.tolist(), rxIdx.tolist()))
+    assert len(expected) > 0
+    assert len(found) == len(ys)
+    assert found == expected
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from powercube.simulation import Config, SimulationManager, FrameRenderer
+
+#--------------------------------------------
+# 프레임 렌더러 (색 룩업 테이블)
+#--------------------------------------------
+def _Scene():
+    config = Config()
+    config.gridWidth, config.gridHeight = 48, 40
+    sim = SimulationManager(config)
+    sim.Initialize()
+    grid = sim.grid
+    rng = np.random.default_rng(9)
+    grid.materialID[:] = rng.integers(0, len(sim.matDB.materials), grid.materialID.shape)
+    grid.temperature[:] = rng.uniform(-300.0, 1200.0, grid.temperature.shape)
+    return sim
+
+def _Pixel(r, g, b):
+    # 셀 하나를 직접 QImage RGB32 값으로
+    return 0xFF000000 | int(r*255) << 16 | int(g*255) << 8 | int(b*255)
+
+def test_RenderMaterialColors():
+    sim = _Scene()
+    grid = sim.grid
+    buf = FrameRenderer(sim.matDB).Render(grid, "Material")
+    assert buf.dtype == np.uint32 and buf.shape == (grid.height, grid.width)
+    for y,x in [(0,0), (7,31), (39,47), (20,5)]:
+        m = sim.matDB.GetMaterial(grid.materialID[y,x])
+        assert buf[y,x] == _Pixel(*m.color)
+
+def test_RenderTemperatureScale():
+    # -200 ~ 1000 °C를 파랑 → 빨강으로, 범위 밖은 끝 색
+    sim = _Scene()
+    grid = sim.grid
+    renderer = FrameRenderer(sim.matDB)
+    buf = renderer.Render(grid, "Temperature")
+    n = renderer.LUT_SIZE
+    for y,x in [(0,0), (7,31), (39,47), (20,5)]:
+        i = int(np.clip((grid.temperature[y,x]+200.0)*(n-1)/1200.0, 0, n-1))
+        t = i/(n-1)
+        assert buf[y,x] == _Pixel(t, 0.0, 1.0-t)
+
+@pytest.mark.parametrize("mode", ["Material", "Temperature", "Pressure"])
+def test_RenderRegionMatchesFull(mode):
+    sim = _Scene()
+    full = FrameRenderer(sim.matDB).Render(sim.grid, mode).copy()
+    part = FrameRenderer(sim.matDB).Render(sim.grid, mode, (5,3,30,22))
+    assert np.array_equal(part, full[3:22,5:30])
+
+def test_MaterialColorFollowsLibrary():
+    # 물질 색이 바뀌면 (version 증가) 룩업 테이블도 다시 만든다
+    sim = _Scene()
+    renderer = FrameRenderer(sim.matDB)
+    renderer.Render(sim.grid, "Material")
+    m = sim.grid.materialID[0,0]
+    sim.matDB.GetMaterial(m).color = (0.0, 1.0, 0.0)
+    sim.matDB.Invalidate()
+    assert renderer.Render(sim.grid, "Material")[0,0] == _Pixel(0.0, 1.0, 0.0)
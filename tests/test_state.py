@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from powercube.simulation import Config, SimulationManager, CellGrid
+from powercube.state import SaveState, LoadState
+
+#--------------------------------------------
+# 상태 파일 (.pcs / .npz)
+#--------------------------------------------
+def _Scene(sampling="bernoulli", expert=False):
+    config = Config()
+    config.gridWidth = config.gridHeight = 96
+    config.seed = 7
+    config.expertMode = expert
+    config.reactionSampling = sampling
+    config.spawnRate = 0.3
+    sim = SimulationManager(config)
+    sim.Initialize()
+    ids = sim.matDB.nameToID
+    sim.grid.AddMaterial(30,60,ids["NaOH"],6)
+    sim.grid.AddMaterial(38,60,ids["H2SO4"],6)
+    return sim
+
+@pytest.mark.parametrize("ext", [".pcs", ".npz"])
+@pytest.mark.parametrize("sampling,expert", [("bernoulli", False), ("event", True)])
+def test_SaveLoadContinue(tmp_path, ext, sampling, expert):
+    # 저장 후 이어 돌린 결과가 끊지 않고 돌린 결과와 비트 단위로 같아야 함
+    sim = _Scene(sampling, expert)
+    for i in range(40):
+        sim.Update(0.05)
+    path = str(tmp_path/("state"+ext))
+    SaveState(sim, path, background=False)
+    loaded = SimulationManager(Config())
+    LoadState(loaded, path)
+    assert loaded.stepCount == sim.stepCount
+    for name in CellGrid.FIELDS:
+        assert np.array_equal(getattr(loaded.grid,name), getattr(sim.grid,name))
+    for i in range(40):
+        sim.Update(0.05)
+        loaded.Update(0.05)
+    for name in CellGrid.FIELDS:
+        assert np.array_equal(getattr(loaded.grid,name), getattr(sim.grid,name)), name
+    assert loaded.grid.spawnCredit == sim.grid.spawnCredit
+
+def test_LoadKeepsSessionSettings(tmp_path):
+    # 화면/실행 방식 설정은 파일이 아니라 지금 세션 것
+    sim = _Scene()
+    sim.config.paused = True
+    sim.config.viewZoom = 4.0
+    sim.config.showProfiler = True
+    path = str(tmp_path/"state.pcs")
+    SaveState(sim, path, background=False)
+    config = Config()
+    config.threadedSimulation = False
+    loaded = SimulationManager(config)
+    LoadState(loaded, path)
+    assert not config.paused and config.viewZoom == 1.0 and not config.showProfiler
+    assert not config.threadedSimulation
+    assert config.seed == 7 and config.spawnRate == 0.3
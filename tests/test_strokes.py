@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+from powercube.simulation import Config, SimulationManager, Stroke, StrokeMask, CELL_BITS
+
+#--------------------------------------------
+# 붓질 (StrokeMask / 획 단위 되돌리기)
+#--------------------------------------------
+def _Scene():
+    config = Config()
+    config.gridWidth = config.gridHeight = 64
+    config.seed = 4
+    sim = SimulationManager(config)
+    sim.Initialize()
+    rng = np.random.default_rng(1)
+    grid = sim.grid
+    grid.temperature[:] = rng.uniform(0.0, 100.0, grid.temperature.shape)
+    grid.latent[:] = rng.uniform(0.0, 1.0, grid.latent.shape).astype(grid.latent.dtype)
+    return sim
+
+def _Fields(grid):
+    return {name: getattr(grid,name).copy() for name in ("materialID","temperature","flags","latent")}
+
+def test_CircleMaskMatchesDistance():
+    # 캡슐: 선분까지 거리가 r+0.5 이하인 셀
+    points = [(10.0,12.0), (30.0,20.0), (31.0,40.0)]
+    r = StrokeMask(points, 3, "circle", 64, 64)
+    x0, y0, mask = r
+    full = np.zeros((64,64), dtype=bool)
+    full[y0:y0+mask.shape[0],x0:x0+mask.shape[1]] = mask
+    ys, xs = np.mgrid[0:64,0:64]
+    expected = np.zeros_like(full)
+    pts = np.array(points)
+    for a,b in zip(pts[:-1],pts[1:]):
+        d = b-a
+        t = np.clip(((xs-a[0])*d[0]+(ys-a[1])*d[1])/(d @ d), 0.0, 1.0)
+        expected |= (xs-(a[0]+t*d[0]))**2+(ys-(a[1]+t*d[1]))**2 <= 3.5**2
+    assert np.array_equal(full, expected)
+
+def test_SquareMaskCoversEverySample():
+    # 사각 붓은 선분 위 점마다 (2r+1)² 사각형을 찍은 것과 같다
+    x0, y0, mask = StrokeMask([(5,5), (20,9)], 2, "square", 64, 64)
+    full = np.zeros((64,64), dtype=bool)
+    full[y0:y0+mask.shape[0],x0:x0+mask.shape[1]] = mask
+    expected = np.zeros_like(full)
+    for t in np.linspace(0.0, 1.0, 16):
+        cx, cy = np.rint(5+15*t).astype(int), np.rint(5+4*t).astype(int)
+        expected[cy-2:cy+3,cx-2:cx+3] = True
+    assert np.array_equal(full, expected)
+
+def test_StrokeMaskOutside():
+    assert StrokeMask([(-20,-20), (-10,-15)], 2, "circle", 64, 64) is None
+
+@pytest.mark.parametrize("shape", ["square", "circle"])
+def test_UndoRestoresStroke(shape):
+    # 여러 스텝에 걸쳐 같은 셀을 다시 칠해도 되돌리면 획 이전 값으로 (스포너 비트는 유지)
+    sim = _Scene()
+    grid = sim.grid
+    grid.flags[30:34,:] |= ~CELL_BITS
+    before = _Fields(grid)
+    stroke = Stroke(sim.matDB.nameToID["Cu"], 3, shape, temperature=500.0)
+    sim.BeginStroke(stroke)
+    for points in ([(10,10), (40,30)], [(40,30), (12,12)], [(12,40)]):
+        for x,y in points:
+            stroke.AddPoint(x, y)
+        sim.ApplyCommands()
+    sim.EndStroke(stroke)
+    sim.ApplyCommands()
+    assert len(stroke.undo) == 3
+    assert (grid.materialID == sim.matDB.nameToID["Cu"]).sum() > 0
+    assert list(sim.undoStack) == [stroke]
+    spawnerBits = grid.flags & ~CELL_BITS
+    sim.Undo()
+    after = _Fields(grid)
+    for name in ("materialID","temperature","latent"):
+        assert np.array_equal(after[name], before[name])
+    assert np.array_equal(after["flags"] & CELL_BITS, before["flags"] & CELL_BITS)
+    assert np.array_equal(after["flags"] & ~CELL_BITS, spawnerBits)
+    assert not sim.undoStack
@@ -0,0 +1,43 @@
+import json
+import pytest
+from powercube import sweep
+
+#--------------------------------------------
+# 매개변수 스윕 이어 돌리기
+#--------------------------------------------
+def _Spec():
+    return {"grid": "32x32", "steps": 5, "dt": 0.016, "seed": 1, "product": "Water",
+            "scene": {"regions": [{"material": "NaOH", "rect": [4,4,8,8]}, {"material": "H2SO4", "rect": [12,4,8,8]}]},
+            "parameters": {"reaction.0.A": [0.01, 0.02], "config.reactionPrecision": [1.0, 2.0]}}
+
+def _Keys(path):
+    return [r["key"] for r in sweep.LoadResults(path)]
+
+def test_ResumeSkipsCompletedRuns(tmp_path):
+    out = str(tmp_path/"results.jsonl")
+    spec = _Spec()
+    runs = sweep.ExpandRuns(spec)
+    # 중단된 스윕: 두 실행만 끝남
+    shared = sweep.BuildSharedBase(spec)
+    try:
+        with open(out,"w",encoding="utf-8") as f:
+            for run in runs[:2]:
+                f.write(json.dumps(sweep.RunOne(spec, sweep._LoadSpecScene(spec), shared, run))+"\n")
+    finally:
+        shared.Close(unlink=True)
+    done = _Keys(out)
+    rows = sweep.RunSweep(spec, out, workers=1)
+    assert len(rows) == len(runs)
+    assert sorted(r["key"] for r in rows) == sorted(sweep.RunKey(r) for r in runs)
+    # 끝난 두 행은 다시 돌지 않고 그대로 (파일 앞부분)
+    assert [r["key"] for r in rows[:2]] == done
+
+def test_ResumeRefusesChangedSpec(tmp_path):
+    out = str(tmp_path/"results.jsonl")
+    spec = _Spec()
+    sweep.RunSweep(spec, out, workers=1)
+    spec["steps"] = 6
+    with pytest.raises(ValueError):
+        sweep.RunSweep(spec, out, workers=1)
+    # 처음부터 다시 돌리면 된다
+    assert len(sweep.RunSweep(spec, out, workers=1, resume=False)) == len(sweep.ExpandRuns(spec))
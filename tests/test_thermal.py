@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+from powercube.simulation import Config, SimulationManager
+
+#--------------------------------------------
+# 열 커널 (numba / numpy 기준 구현)
+#--------------------------------------------
+def _Scene(backend, flowing):
+    # 물질과 온도를 무작위로 섞은 격자. flowing이면 대류도 같이 검사
+    config = Config()
+    config.gridWidth = config.gridHeight = 64
+    config.seed = 1
+    config.thermalBackend = backend
+    config.activeTiles = False
+    sim = SimulationManager(config)
+    sim.Initialize()
+    grid = sim.grid
+    rng = np.random.default_rng(0)
+    ids = list(sim.matDB.nameToID.values())[:6]
+    grid.materialID[:] = rng.choice(ids, size=grid.materialID.shape)
+    grid.temperature[:] = rng.uniform(0.0, 500.0, grid.temperature.shape)
+    if flowing:
+        grid.velocityX[:] = rng.uniform(-20.0, 20.0, grid.velocityX.shape)
+        grid.velocityY[:] = rng.uniform(-20.0, 20.0, grid.velocityY.shape)
+    return sim
+
+@pytest.mark.parametrize("flowing", [False, True])
+def test_NumbaMatchesNumpy(flowing):
+    compiled, reference = _Scene("numba", flowing), _Scene("numpy", flowing)
+    start = compiled.grid.temperature.copy()
+    for i in range(10):
+        compiled.thermalSolver.Solve(compiled.grid, 0.05)
+        reference.thermalSolver.Solve(reference.grid, 0.05)
+    assert not np.array_equal(compiled.grid.temperature, start)
+    assert np.allclose(compiled.grid.temperature, reference.grid.temperature, rtol=0.0, atol=1e-9)